@@ -1,15 +1,47 @@
-from fastapi import FastAPI
+import os
+from typing import List, Optional
+
+import numpy as np
+from fastapi import FastAPI, HTTPException, Response
 from pydantic import BaseModel
-import webbrowser
-import threading
-import time
+
+from api.metrics import CONTENT_TYPE, RISK_LEVELS, MetricsMiddleware, StageClock, render_metrics
 from scripts.inference_logic import (
     compute_risk_score,
     get_risk_level,
     compute_confidence,
+    compute_risk_score_batch,
+    get_risk_level_batch,
+    compute_confidence_batch,
+    round_like_python,
 )
+from scripts.model_artifacts import load_artifacts, score_hybrid
+from scripts.risk_calibration import TREND_FEATURES, risk_components, risk_level
 
 app = FastAPI(title="Gray Mobility Anomaly API")
+app.add_middleware(MetricsMiddleware)
+
+
+def load_hybrid_models():
+    """Load the latest hybrid artifacts and build their fast scorers.
+
+    Runs at import time, so under ``api/server.py`` the models (and the
+    flattened IF / fused PCA scorers) are built once in the parent and
+    shared copy-on-write by the forked workers. Returns None (readiness
+    fails, ``/predict/hybrid`` answers 503) when nothing is trained yet.
+    """
+    try:
+        models = load_artifacts()
+    except FileNotFoundError as exc:
+        print(f"⚠️ {exc}")
+        return None
+    # Warm-up: builds the cached scorers before any worker is forked
+    score_hybrid(models, np.zeros((1, len(models.feature_cols))))
+    return models
+
+
+# Pre-fitted hybrid IF + PCA models, loaded once per server (before fork)
+HYBRID_MODELS = load_hybrid_models()
 
 # =========================================================
 # INPUT SCHEMA
@@ -18,39 +50,155 @@ class VitalsInput(BaseModel):
     heart_rate_bpm: float
     spo2_percent: float
 
+
+class AmbulanceReadings(BaseModel):
+    ambulance_id: Optional[str] = None
+    heart_rate_bpm: List[float]
+    spo2_percent: List[float]
+
+
+class BatchVitalsInput(BaseModel):
+    ambulances: List[AmbulanceReadings]
+
+
+class HybridFeaturesInput(BaseModel):
+    hr_mean_30s: float
+    hr_slope_30s: float
+    hr_std_30s: float
+    spo2_mean_30s: float
+    spo2_delta_from_baseline: float
+    spo2_seconds_below_94: float
+    sys_bp_mean_60s: float
+    sys_bp_slope_60s: float
+    motion_mean_10s: float
+    # Not a model feature: the calibrated trend averages all TREND_FEATURES
+    spo2_slope_60s: float
+
 # =========================================================
 # CORE LOGIC (imported from scripts/inference_logic.py)
 # =========================================================
 
+# =========================================================
+# HEALTH CHECKS
+# =========================================================
+@app.get("/healthz")
+def healthz():
+    """Liveness: the worker process is up and serving requests."""
+    return {"status": "ok", "pid": os.getpid()}
+
+@app.get("/readyz")
+def readyz():
+    """Readiness: every scoring endpoint can answer (hybrid models loaded)."""
+    if HYBRID_MODELS is None:
+        raise HTTPException(status_code=503, detail="Hybrid models not loaded")
+    return {"status": "ready", "model_version": HYBRID_MODELS.version, "pid": os.getpid()}
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus scrape endpoint (merged over all workers; see api/metrics.py)."""
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
+
 # =========================================================
 # API ENDPOINT
 # =========================================================
 @app.post("/predict")
 def predict(vitals: VitalsInput):
+    clock = StageClock("/predict")
+    clock.lap("validation")
 
     risk_score = compute_risk_score(
         vitals.heart_rate_bpm,
         vitals.spo2_percent
     )
 
-    risk_level = get_risk_level(risk_score)
-    anomaly_flag = 1 if risk_level in ["AMBER", "RED"] else 0
+    level = get_risk_level(risk_score)
+    anomaly_flag = 1 if level in ["AMBER", "RED"] else 0
     confidence = compute_confidence(risk_score)
+    clock.lap("risk_computation")
+    RISK_LEVELS.inc(("/predict", level))
 
     return {
         "anomaly_flag": anomaly_flag,
         "risk_score": round(risk_score, 2),
-        "risk_level": risk_level,
+        "risk_level": level,
         "confidence": confidence
     }
 
-# =========================================================
-# AUTO-OPEN SWAGGER UI ON STARTUP
-# =========================================================
-def open_browser():
-    time.sleep(1)  # wait for server to start
-    webbrowser.open("http://127.0.0.1:8000/docs")
+@app.post("/predict/batch")
+def predict_batch(batch: BatchVitalsInput):
+    clock = StageClock("/predict/batch")
+
+    for idx, readings in enumerate(batch.ambulances):
+        if len(readings.heart_rate_bpm) != len(readings.spo2_percent):
+            raise HTTPException(
+                status_code=422,
+                detail=f"ambulances[{idx}]: heart_rate_bpm and spo2_percent lengths differ"
+            )
+
+    # Score every reading of every ambulance in one vectorized pass
+    hr = np.array([v for r in batch.ambulances for v in r.heart_rate_bpm], dtype=float)
+    spo2 = np.array([v for r in batch.ambulances for v in r.spo2_percent], dtype=float)
+    clock.lap("validation")
+
+    risk_score = compute_risk_score_batch(hr, spo2)
+    levels = get_risk_level_batch(risk_score)
+    anomaly_flag = (levels != "GREEN").astype(int)
+    confidence = compute_confidence_batch(risk_score)
+    risk_score = round_like_python(risk_score, 2)
+    clock.lap("risk_computation")
+    for level, count in zip(*np.unique(levels, return_counts=True)):
+        RISK_LEVELS.inc(("/predict/batch", str(level)), int(count))
+
+    results = []
+    start = 0
+    for readings in batch.ambulances:
+        end = start + len(readings.heart_rate_bpm)
+        results.append({
+            "ambulance_id": readings.ambulance_id,
+            "anomaly_flag": anomaly_flag[start:end].tolist(),
+            "risk_score": risk_score[start:end].tolist(),
+            "risk_level": levels[start:end].tolist(),
+            "confidence": confidence[start:end].tolist()
+        })
+        start = end
+
+    return {"results": results}
+
+@app.post("/predict/hybrid")
+def predict_hybrid(features: HybridFeaturesInput):
+    clock = StageClock("/predict/hybrid")
+
+    if HYBRID_MODELS is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Hybrid models not loaded. Run train_anomaly_model.py first."
+        )
+
+    values = features.model_dump()
+    X = np.array([[values[col] for col in HYBRID_MODELS.feature_cols]])
+    clock.lap("validation")
+    scores = score_hybrid(HYBRID_MODELS, X)
+    clock.lap("model_scoring")
+
+    response = {
+        "model_version": HYBRID_MODELS.version,
+        "if_score": float(scores["if_score"][0]),
+        "pca_error": float(scores["pca_error"][0]),
+        "hybrid_risk_score": round(float(scores["hybrid_risk_score"][0]), 4),
+        "hybrid_anomaly": int(scores["hybrid_anomaly"][0])
+    }
+
+    # Same frozen calibration as coding_scripts/risk_scoring.py
+    calibration = HYBRID_MODELS.manifest.get("risk_calibration")
+    if calibration is not None:
+        trend = float(np.mean([abs(values[c]) for c in TREND_FEATURES]))
+        components = risk_components(float(scores["hybrid_risk_score"][0]), trend, calibration)
+        response.update({
+            "risk_score": round(float(components["risk_score"]), 2),
+            "risk_level": risk_level(components["risk_score"]),
+            "confidence": round(float(components["confidence"]), 3)
+        })
+        clock.lap("risk_computation")
+        RISK_LEVELS.inc(("/predict/hybrid", response["risk_level"]))
 
-@app.on_event("startup")
-def startup_event():
-    threading.Thread(target=open_browser).start()
+    return response
@@ -0,0 +1,345 @@
+"""Prometheus-format request and stage metrics for the anomaly API.
+
+Counters and histograms are sharded per thread: each request-handling
+thread increments its own dict (no locks on the hot path) and ``/metrics``
+sums the shards when scraped.
+
+Under ``api/server.py`` every worker process has its own registry, and a
+scrape reaches whichever worker accepts it. The server therefore sets
+``GRAY_METRICS_DIR``: each worker writes a snapshot of its totals to
+``<dir>/worker-<pid>-<token>.json`` every ``FLUSH_INTERVAL_SEC`` (and right
+before it answers a scrape), and ``/metrics`` merges the snapshots of all
+workers. The random token keeps a replacement worker that reuses a dead
+worker's pid from overwriting its totals; the supervisor folds each dead
+worker's snapshot into ``retired.json`` (``retire_snapshots``), so
+counters never go backwards when a worker is replaced. Other workers'
+counts may lag by up to one flush interval.
+
+Per-stage timing splits a request into
+
+* ``validation``: routing, body parsing and schema validation, up to the
+  handler's first line (plus the handler's own input checks),
+* ``model_scoring``: IF / PCA scoring (``/predict/hybrid``),
+* ``risk_computation``: risk score, level and confidence.
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+# Seconds; finer at the low end where /predict lives
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+METRICS_DIR_ENV = "GRAY_METRICS_DIR"
+FLUSH_INTERVAL_SEC = 1.0
+WORKER_PREFIX = "worker-"
+RETIRED_FILE = "retired.json"
+
+_request_start = ContextVar("request_start", default=None)
+
+
+class _Family:
+    """One metric name; values live in per-thread shards keyed by label values."""
+
+    kind = None
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()  # only taken when a new thread registers its shard
+
+    def _values(self) -> dict:
+        try:
+            return self._local.values
+        except AttributeError:
+            values = {}
+            with self._lock:
+                self._shards.append(values)
+            self._local.values = values
+            return values
+
+    def _labels(self, labels: tuple, extra="") -> str:
+        pairs = [f'{k}="{v}"' for k, v in zip(self.labelnames, labels)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}"
+
+
+class Counter(_Family):
+    kind = "counter"
+
+    def inc(self, labels: tuple, value=1) -> None:
+        values = self._values()
+        values[labels] = values.get(labels, 0) + value
+
+    def collect(self) -> dict:
+        totals = {}
+        for shard in list(self._shards):
+            for labels, value in list(shard.items()):
+                totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+    @staticmethod
+    def merge(totals: dict, labels: tuple, value) -> None:
+        totals[labels] = totals.get(labels, 0) + value
+
+    def render(self, totals: dict) -> list:
+        return [
+            f"{self.name}{self._labels(labels)} {value}"
+            for labels, value in sorted(totals.items())
+        ]
+
+
+class Histogram(_Family):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames, buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, labels: tuple, value: float) -> None:
+        values = self._values()
+        slots = values.get(labels)
+        if slots is None:
+            # one count per bucket, one for +Inf, then the running sum
+            slots = values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        slots[bisect_left(self.buckets, value)] += 1
+        slots[-1] += value
+
+    def collect(self) -> dict:
+        totals = {}
+        for shard in list(self._shards):
+            for labels, slots in list(shard.items()):
+                self.merge(totals, labels, list(slots))
+        return totals
+
+    @staticmethod
+    def merge(totals: dict, labels: tuple, slots) -> None:
+        total = totals.setdefault(labels, [0] * len(slots))
+        for i, value in enumerate(slots):
+            total[i] += value
+
+    def render(self, totals: dict) -> list:
+        lines = []
+        for labels, slots in sorted(totals.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), slots[:-1]):
+                cumulative += count
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{self._labels(labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(labels)} {slots[-1]}")
+            lines.append(f"{self.name}_count{self._labels(labels)} {cumulative}")
+        return lines
+
+
+REQUESTS = Counter("gray_http_requests_total", "HTTP requests handled", ("endpoint", "method", "status"))
+REQUEST_LATENCY = Histogram("gray_http_request_duration_seconds", "HTTP request latency",
+                            ("endpoint", "method"))
+STAGE_LATENCY = Histogram("gray_stage_duration_seconds", "Scoring time per stage", ("endpoint", "stage"))
+RISK_LEVELS = Counter("gray_risk_levels_total", "Risk levels emitted", ("endpoint", "level"))
+
+FAMILIES = [REQUESTS, REQUEST_LATENCY, STAGE_LATENCY, RISK_LEVELS]
+
+
+# =========================================================
+# CROSS-WORKER SNAPSHOTS
+# =========================================================
+_flusher_pid = None
+_flusher_lock = threading.Lock()
+_snapshot_file = None  # (pid, file name) of this process's snapshot
+
+
+def metrics_dir():
+    return os.environ.get(METRICS_DIR_ENV) or None
+
+
+def snapshot_name() -> str:
+    """This process's snapshot file name (a new token after each fork)."""
+    global _snapshot_file
+    pid = os.getpid()
+    if _snapshot_file is None or _snapshot_file[0] != pid:
+        _snapshot_file = (pid, f"{WORKER_PREFIX}{pid}-{os.urandom(4).hex()}.json")
+    return _snapshot_file[1]
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None  # removed or half-written
+
+
+def _write_json(path, data) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _fold(merged: dict, snapshot: dict) -> None:
+    """Add one snapshot (``{family name: [[labels, value], ...]}``) to ``merged``."""
+    by_name = {family.name: family for family in FAMILIES}
+    for family_name, series in snapshot.items():
+        family = by_name.get(family_name)
+        if family is None:
+            continue
+        for labels, value in series:
+            family.merge(merged.setdefault(family_name, {}), tuple(labels), value)
+
+
+def _as_snapshot(totals: dict) -> dict:
+    return {name: [[list(labels), value] for labels, value in series.items()]
+            for name, series in totals.items()}
+
+
+def write_snapshot(directory=None) -> None:
+    """Atomically write this process's totals to ``<directory>/<snapshot_name()>``."""
+    directory = directory or metrics_dir()
+    if directory is None:
+        return
+    totals = {family.name: family.collect() for family in FAMILIES}
+    _write_json(os.path.join(directory, snapshot_name()), _as_snapshot(totals))
+
+
+def _worker_snapshots(directory, pid=None) -> list:
+    prefix = WORKER_PREFIX if pid is None else f"{WORKER_PREFIX}{pid}-"
+    return sorted(n for n in os.listdir(directory) if n.startswith(prefix) and n.endswith(".json"))
+
+
+def retire_snapshots(pid: int, directory=None) -> None:
+    """Fold an exited worker's snapshots into ``retired.json`` and remove them.
+
+    Supervisor only (single writer). ``retired.json`` lists the snapshots
+    it absorbed, so a scrape between the write and the removal does not
+    count them twice.
+    """
+    directory = directory or metrics_dir()
+    if directory is None:
+        return
+    names = _worker_snapshots(directory, pid)
+    if not names:
+        return
+    retired = _read_json(os.path.join(directory, RETIRED_FILE)) or {"totals": {}}
+    totals = {}
+    _fold(totals, retired["totals"])
+    for name in names:
+        _fold(totals, _read_json(os.path.join(directory, name)) or {})
+    _write_json(os.path.join(directory, RETIRED_FILE),
+                {"absorbed": names, "totals": _as_snapshot(totals)})
+    for name in os.listdir(directory):
+        if name.startswith(f"{WORKER_PREFIX}{pid}-"):
+            os.remove(os.path.join(directory, name))
+
+
+def merged_totals(directory) -> dict:
+    """``{family name: totals}`` summed over retired and live worker snapshots."""
+    merged = {family.name: {} for family in FAMILIES}
+    snapshots = {name: _read_json(os.path.join(directory, name)) for name in _worker_snapshots(directory)}
+    # Read after the live snapshots: a worker retired in between is then
+    # either still read above or already in this file (and not both)
+    retired = _read_json(os.path.join(directory, RETIRED_FILE)) or {"absorbed": [], "totals": {}}
+    _fold(merged, retired["totals"])
+    for name, snapshot in snapshots.items():
+        if snapshot is not None and name not in retired["absorbed"]:
+            _fold(merged, snapshot)
+    return merged
+
+
+def _flush_forever(directory) -> None:
+    while True:
+        time.sleep(FLUSH_INTERVAL_SEC)
+        try:
+            write_snapshot(directory)
+        except OSError:
+            pass  # directory gone during shutdown
+
+
+def ensure_flusher() -> None:
+    """Start this process's snapshot thread (once per pid, so after each fork)."""
+    global _flusher_pid
+    directory = metrics_dir()
+    if directory is None or _flusher_pid == os.getpid():
+        return
+    with _flusher_lock:
+        if _flusher_pid != os.getpid():
+            threading.Thread(target=_flush_forever, args=(directory,), daemon=True).start()
+            _flusher_pid = os.getpid()
+
+
+def render_metrics() -> str:
+    """All workers' metrics in the Prometheus text exposition format."""
+    directory = metrics_dir()
+    if directory is not None:
+        write_snapshot(directory)
+        totals = merged_totals(directory)
+    else:
+        totals = {family.name: family.collect() for family in FAMILIES}
+
+    lines = []
+    for family in FAMILIES:
+        lines.append(f"# HELP {family.name} {family.documentation}")
+        lines.append(f"# TYPE {family.name} {family.kind}")
+        lines.extend(family.render(totals[family.name]))
+    return "\n".join(lines) + "\n"
+
+
+class StageClock:
+    """Consecutive stage timings for one request.
+
+    Starts when the middleware saw the request (or now, when a handler is
+    called directly), so the first ``lap`` includes routing and body
+    validation. Each ``lap`` records the time since the previous mark.
+    """
+
+    __slots__ = ("endpoint", "last")
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        start = _request_start.get()
+        self.last = start if start is not None else time.perf_counter()
+
+    def lap(self, stage: str) -> None:
+        now = time.perf_counter()
+        STAGE_LATENCY.observe((self.endpoint, stage), now - self.last)
+        self.last = now
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: request count and latency per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        ensure_flusher()
+        start = time.perf_counter()
+        token = _request_start.set(start)
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _request_start.reset(token)
+            # Route template, not the raw path, keeps label cardinality bounded
+            route = scope.get("route")
+            endpoint = getattr(route, "path", "unmatched")
+            REQUEST_LATENCY.observe((endpoint, scope["method"]), time.perf_counter() - start)
+            REQUESTS.inc((endpoint, scope["method"], str(status[0])))
@@ -0,0 +1,150 @@
+"""Pre-fork production server for the anomaly API.
+
+The parent imports ``api.app`` (which loads and warms the hybrid models and
+the frozen risk calibration), binds one listening socket and forks
+``--workers`` uvicorn processes that accept on it. Workers inherit the
+models copy-on-write, so memory stays flat and there is no per-worker load
+time. The parent only supervises: a worker that dies is replaced, and
+SIGTERM / SIGINT shut every worker down gracefully.
+
+    python -m api.server --host 0.0.0.0 --port 8000 --workers 4
+
+Health checks: ``GET /healthz`` (liveness) and ``GET /readyz`` (readiness,
+503 until hybrid models are trained). ``GET /metrics`` covers all workers:
+they share a snapshot directory (``GRAY_METRICS_DIR``, a temporary one
+unless set) that the answering worker merges, and the parent folds each
+exited worker's snapshot into a retired total, see ``api/metrics.py``.
+"""
+import argparse
+import gc
+import os
+import shutil
+import signal
+import socket
+import tempfile
+import time
+import traceback
+
+# One BLAS thread per worker: throughput comes from processes, not threads
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+os.environ.setdefault("OPENBLAS_NUM_THREADS", "1")
+
+import uvicorn  # noqa: E402
+
+from api.app import app  # noqa: E402  (loads models in the parent, before fork)
+from api.metrics import METRICS_DIR_ENV, retire_snapshots, write_snapshot  # noqa: E402
+
+RESTART_DELAY_SEC = 1.0  # back-off before replacing a crashed worker
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def serve_worker(sock: socket.socket, args) -> None:
+    """Run one uvicorn server on the shared socket (blocks until shutdown)."""
+    config = uvicorn.Config(
+        app,
+        host=args.host,
+        port=args.port,
+        backlog=args.backlog,
+        log_level=args.log_level,
+        access_log=args.access_log,
+    )
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def spawn_worker(sock: socket.socket, args) -> int:
+    pid = os.fork()
+    if pid == 0:
+        # Child: uvicorn installs its own graceful-shutdown handlers
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        code = 0
+        try:
+            serve_worker(sock, args)
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            try:
+                write_snapshot()  # last counts, for the merged /metrics
+            except OSError:
+                pass
+            # Never fall back into the parent's supervision loop
+            os._exit(code)
+    return pid
+
+
+def run(args) -> None:
+    sock = bind_socket(args.host, args.port, args.backlog)
+
+    if args.workers == 1 or not hasattr(os, "fork"):
+        serve_worker(sock, args)
+        return
+
+    # Workers merge each other's metric snapshots from one directory
+    own_metrics_dir = not os.environ.get(METRICS_DIR_ENV)
+    if own_metrics_dir:
+        os.environ[METRICS_DIR_ENV] = tempfile.mkdtemp(prefix="gray_metrics_")
+
+    # Preloaded objects are never collected; keeping them out of GC passes
+    # stops the collector from touching (and un-sharing) their pages
+    gc.freeze()
+
+    workers = {spawn_worker(sock, args) for _ in range(args.workers)}
+    print(f"Serving on {args.host}:{args.port} with {len(workers)} workers (parent pid {os.getpid()})")
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        workers.discard(pid)
+        try:
+            # Its counts move to the retired total before any replacement can reuse the pid
+            retire_snapshots(pid)
+        except OSError:
+            pass
+        if not stopping:
+            print(f"⚠️ Worker {pid} exited (status {status}); restarting")
+            time.sleep(RESTART_DELAY_SEC)
+            # A shutdown signal during the back-off must not fork a worker it never stops
+            if not stopping:
+                workers.add(spawn_worker(sock, args))
+
+    sock.close()
+    if own_metrics_dir:
+        shutil.rmtree(os.environ[METRICS_DIR_ENV], ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the anomaly API with pre-forked workers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: all CPUs)")
+    parser.add_argument("--backlog", type=int, default=2048, help="listen queue length")
+    parser.add_argument("--log-level", default="warning")
+    parser.add_argument("--access-log", action="store_true", help="log every request")
+    run(parser.parse_args())
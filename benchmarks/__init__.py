@@ -0,0 +1,5 @@
+"""
+Performance benchmarks for the Gray Mobility pipeline and API.
+
+Run from the project root: python -m benchmarks.run_benchmarks
+"""
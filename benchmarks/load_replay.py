@@ -0,0 +1,245 @@
+"""Open-loop replay load generator for the anomaly API.
+
+Replays ``/predict`` payloads from a JSONL file (default: ``requests.jsonl``
+at the project root) against a running server at a fixed target rate.
+Each line is either
+
+* ``{"path": "/predict/hybrid", "method": "POST", "body": {...}}``, or
+* a bare request body, routed by its keys (vitals -> ``/predict``,
+  ``ambulances`` -> ``/predict/batch``, hybrid features -> ``/predict/hybrid``).
+
+Other lines are skipped; when no line is a payload, ``--synthesize``
+payloads are generated instead (same ranges as ``run_benchmarks``).
+
+Scheduling is open-loop: request ``i`` is due at ``start + i / rps`` (or
+after Poisson gaps) whether or not earlier requests have finished, and its
+latency is measured from that due time. A slow server therefore shows up
+as latency instead of silently lowering the offered load (coordinated
+omission). ``--concurrency`` caps in-flight connections; requests waiting
+for one are still timed from their due time.
+
+    python -m api.server --workers 4 &
+    python -m benchmarks.load_replay --rps 500 --duration 30 --concurrency 64
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+from benchmarks.common import BASE_DIR, RESULTS_DIR, git_commit, latency_summary
+
+DEFAULT_REQUESTS_FILE = BASE_DIR / "requests.jsonl"
+
+VITALS_KEYS = {"heart_rate_bpm", "spo2_percent"}
+HYBRID_KEYS = {
+    "hr_mean_30s", "hr_slope_30s", "hr_std_30s", "spo2_mean_30s",
+    "spo2_delta_from_baseline", "spo2_seconds_below_94", "sys_bp_mean_60s",
+    "sys_bp_slope_60s", "motion_mean_10s",
+}
+
+# Latency histogram bucket upper bounds (ms); the last bucket is open-ended
+HISTOGRAM_EDGES_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+
+# =========================================================
+# PAYLOADS
+# =========================================================
+def route_payload(record) -> tuple:
+    """``(method, path, body)`` for one JSONL record, or None if it is not a payload."""
+    if not isinstance(record, dict):
+        return None
+    if isinstance(record.get("body"), dict) and isinstance(record.get("path"), str):
+        return record.get("method", "POST").upper(), record["path"], record["body"]
+
+    keys = set(record)
+    if HYBRID_KEYS <= keys:
+        return "POST", "/predict/hybrid", record
+    if "ambulances" in keys:
+        return "POST", "/predict/batch", record
+    if VITALS_KEYS <= keys and not isinstance(record["heart_rate_bpm"], list):
+        return "POST", "/predict", record
+    return None
+
+
+def load_payloads(path) -> tuple:
+    """``(payloads, skipped_lines)`` from a JSONL file (missing file: none)."""
+    payloads, skipped = [], 0
+    path = Path(path)
+    if not path.exists():
+        return payloads, skipped
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                routed = route_payload(json.loads(line))
+            except json.JSONDecodeError:
+                routed = None
+            if routed is None:
+                skipped += 1
+            else:
+                payloads.append(routed)
+    return payloads, skipped
+
+
+def synthesize_payloads(n: int, hybrid_share=0.2, seed=0) -> list:
+    """Random ``/predict`` vitals, with ``hybrid_share`` of ``/predict/hybrid`` features."""
+    rng = np.random.default_rng(seed)
+    payloads = []
+    for _ in range(n):
+        if rng.random() < hybrid_share:
+            payloads.append(("POST", "/predict/hybrid", {
+                "hr_mean_30s": float(rng.uniform(60, 150)),
+                "hr_slope_30s": float(rng.normal(0, 0.2)),
+                "hr_std_30s": float(rng.uniform(0, 8)),
+                "spo2_mean_30s": float(rng.uniform(85, 100)),
+                "spo2_delta_from_baseline": float(rng.normal(-1, 2)),
+                "spo2_seconds_below_94": float(rng.integers(0, 120)),
+                "sys_bp_mean_60s": float(rng.uniform(90, 160)),
+                "sys_bp_slope_60s": float(rng.normal(0, 0.1)),
+                "motion_mean_10s": float(rng.uniform(0, 1)),
+                "spo2_slope_60s": float(rng.normal(0, 0.05)),
+            }))
+        else:
+            payloads.append(("POST", "/predict", {
+                "heart_rate_bpm": float(rng.uniform(60, 150)),
+                "spo2_percent": float(rng.uniform(80, 100)),
+            }))
+    return payloads
+
+
+# =========================================================
+# OPEN-LOOP RUNNER
+# =========================================================
+def schedule(n: int, rps: float, poisson: bool, seed=0) -> np.ndarray:
+    """Due time (seconds from start) of each request."""
+    if poisson:
+        return np.cumsum(np.random.default_rng(seed).exponential(1 / rps, n)) - 1 / rps
+    return np.arange(n) / rps
+
+
+async def _replay(base_url, payloads, due, concurrency, timeout) -> tuple:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    slots = asyncio.Semaphore(concurrency)
+    records = []
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+
+        async def fire(i, method, path, body):
+            due_at = start + due[i]
+            async with slots:
+                sent_at = loop.time()
+                try:
+                    response = await client.request(method, path, json=body)
+                    status = response.status_code
+                except httpx.HTTPError as exc:
+                    status = type(exc).__name__
+            done_at = loop.time()
+            records.append({
+                "path": path,
+                "status": status,
+                "latency_s": done_at - due_at,        # includes queueing (open loop)
+                "service_s": done_at - sent_at,       # server + network only
+            })
+
+        tasks = []
+        for i in range(len(due)):
+            delay = start + due[i] - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            method, path, body = payloads[i % len(payloads)]
+            tasks.append(asyncio.create_task(fire(i, method, path, body)))
+        await asyncio.gather(*tasks)
+        wall_s = loop.time() - start
+    return records, wall_s
+
+
+def _histogram(latency_s) -> dict:
+    ms = np.asarray(latency_s) * 1000
+    counts = np.bincount(np.searchsorted(HISTOGRAM_EDGES_MS, ms, side="left"),
+                         minlength=len(HISTOGRAM_EDGES_MS) + 1)
+    labels = [f"<={edge}" for edge in HISTOGRAM_EDGES_MS] + [f">{HISTOGRAM_EDGES_MS[-1]}"]
+    return dict(zip(labels, counts.tolist()))
+
+
+def summarize(records: list, wall_s: float, target_rps: float) -> dict:
+    ok = [r for r in records if isinstance(r["status"], int) and r["status"] < 400]
+    errors = len(records) - len(ok)
+
+    summary = {
+        "requests": len(records),
+        "target_rps": target_rps,
+        "achieved_rps": len(records) / wall_s if wall_s else None,
+        "wall_s": wall_s,
+        "errors": errors,
+        "error_rate": errors / len(records) if records else 0.0,
+        "status_counts": dict(Counter(str(r["status"]) for r in records)),
+    }
+    if ok:
+        summary["latency"] = latency_summary([r["latency_s"] for r in ok])
+        summary["service_time"] = latency_summary([r["service_s"] for r in ok])
+        summary["latency_histogram_ms"] = _histogram([r["latency_s"] for r in ok])
+        summary["by_path"] = {
+            path: latency_summary([r["latency_s"] for r in ok if r["path"] == path])
+            for path in sorted({r["path"] for r in ok})
+        }
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Open-loop replay of /predict payloads against a running API")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="server base URL")
+    parser.add_argument("--requests-file", default=str(DEFAULT_REQUESTS_FILE), help="JSONL payloads to replay")
+    parser.add_argument("--rps", type=float, default=200.0, help="target request rate")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load")
+    parser.add_argument("--concurrency", type=int, default=64, help="max in-flight requests")
+    parser.add_argument("--poisson", action="store_true", help="exponential gaps instead of a fixed interval")
+    parser.add_argument("--synthesize", type=int, default=1000,
+                        help="payloads to generate when the file has none")
+    parser.add_argument("--timeout", type=float, default=10.0, help="per-request timeout (s)")
+    parser.add_argument("--budget-p99-ms", type=float, default=None,
+                        help="exit non-zero if p99 latency (or any error) exceeds the budget")
+    parser.add_argument("--output", default=None, help="JSON file (default: benchmarks/results/load_<timestamp>.json)")
+    args = parser.parse_args()
+
+    payloads, skipped = load_payloads(args.requests_file)
+    source = args.requests_file
+    if not payloads:
+        payloads, source = synthesize_payloads(args.synthesize), "synthesized"
+    print(f"Replaying {len(payloads)} payloads ({source}; {skipped} non-payload lines skipped) "
+          f"at {args.rps:g} rps for {args.duration:g}s")
+
+    due = schedule(int(args.rps * args.duration), args.rps, args.poisson)
+    records, wall_s = asyncio.run(_replay(args.url, payloads, due, args.concurrency, args.timeout))
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_commit": git_commit(),
+            "url": args.url,
+            "payload_source": source,
+            "concurrency": args.concurrency,
+            "poisson": args.poisson,
+        },
+        "results": summarize(records, wall_s, args.rps),
+    }
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"load_{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report["results"], indent=2))
+    print(f"\n📁 Load report saved to {output}")
+
+    if args.budget_p99_ms is not None:
+        latency = report["results"].get("latency")
+        if report["results"]["errors"] or latency is None or latency["p99_ms"] > args.budget_p99_ms:
+            sys.exit(1)
@@ -0,0 +1,247 @@
+"""Time every pipeline stage and the /predict hot path at several input sizes.
+
+Each size gets a scratch working directory seeded with synthetic fleet data
+(``scripts/fleet_generator.py``). The ``coding_scripts`` stages then run in
+pipeline order, one fresh interpreter each (``python -m scripts.profiling``,
+as ``run_pipeline.py --profile`` does), so wall time, CPU time and peak RSS
+are per stage. Kernels without their own script (rolling slope, IF/PCA
+scoring with pre-fitted models, drift detection) are timed in-process with
+tracemalloc peaks. Results are written as JSON for tracking regressions.
+
+    python -m benchmarks.run_benchmarks --sizes 1_patient 100_patients
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+from benchmarks.common import BASE_DIR, RESULTS_DIR, git_commit, latency_summary
+from scripts.fleet_generator import generate_patient
+from scripts.storage import read_table, write_table
+
+
+# name -> (patients, minutes per patient)
+SIZES = {
+    "1_patient": (1, 30),
+    "100_patients": (100, 30),
+    "10k_patient_hours": (10_000, 60),
+}
+DEFAULT_SIZES = ["1_patient", "100_patients"]
+
+# Stage scripts in pipeline order (each reads the previous stages' outputs)
+STAGE_MODULES = [
+    ("artifact_detection", "coding_scripts.artifact_detection"),
+    ("feature_engineering", "coding_scripts.feature_engineering"),
+    ("rule_engine", "coding_scripts.rule_based_anomaly_detection"),
+    ("isolation_forest", "coding_scripts.isolation_forest_anomaly_detection"),
+    ("pca", "coding_scripts.pca_anomaly_detection"),
+    # Fresh GRAY_MODEL_DIR: train on this run's features before scoring
+    ("train_models", "benchmarks.train_models"),
+    ("hybrid_if_pca", "coding_scripts.hybrid_if_pca_anomaly_detection"),
+    ("hybrid_validation", "coding_scripts.hybrid_validation_with_rules"),
+    ("risk_scoring", "coding_scripts.risk_scoring"),
+    ("failure_analysis", "coding_scripts.failure_analysis"),
+]
+
+PREDICT_CALLS = 2000
+
+
+# =========================================================
+# HELPERS
+# =========================================================
+def time_in_process(fn) -> dict:
+    """Wall/CPU time and tracemalloc peak for one call of ``fn``."""
+    tracemalloc.start()
+    try:
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        fn()
+        return {
+            "wall_s": time.perf_counter() - wall_start,
+            "cpu_s": time.process_time() - cpu_start,
+            "peak_traced_mb": tracemalloc.get_traced_memory()[1] / 1e6,
+        }
+    finally:
+        # A failing kernel must not leave tracing on for the next timings
+        tracemalloc.stop()
+
+
+def prepare_workdir(workdir: Path, patients: int, minutes: int, schema=None) -> int:
+    """Seed a scratch project dir with raw vitals; returns the row count."""
+    raw = pd.concat(
+        [generate_patient(pid, minutes * 60) for pid in range(patients)],
+        ignore_index=True
+    )
+    # Stage scripts treat the input as one continuous recording
+    raw = raw.drop(columns="patient_id")
+    write_table(raw, workdir / "data" / "raw" / "synthetic_ambulance_vitals", schema=schema)
+    (workdir / "data" / "risk_scores").mkdir(parents=True, exist_ok=True)
+    (workdir / "analysis" / "metrics").mkdir(parents=True, exist_ok=True)
+    return len(raw)
+
+
+# =========================================================
+# BENCHMARKS
+# =========================================================
+def bench_stage(stage: str, module: str, workdir: Path, env: dict) -> dict:
+    """Run ``module`` through ``scripts.profiling`` (same numbers as ``--profile``)."""
+    probe_dir = workdir / "probe"
+    proc = subprocess.run(
+        [sys.executable, "-m", "scripts.profiling", stage, module],
+        cwd=workdir, env=dict(env, GRAY_PROFILE_DIR=str(probe_dir)), capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr else "failed"}
+    with open(probe_dir / f"{stage}.json") as f:
+        result = json.load(f)
+    return {k: result[k] for k in ("wall_s", "cpu_s", "peak_rss_mb", "baseline_rss_mb", "operation_totals")}
+
+
+def bench_kernels(workdir: Path) -> list:
+    from drift_detection import detect_drift
+    from scripts.model_artifacts import fit_hybrid_models, hybrid_raw_scores, raw_scores
+    from scripts.rolling_features import rolling_slope_array
+
+    features_path = workdir / "data" / "processed" / "features"
+    features = read_table(features_path)
+    hr = read_table(workdir / "data" / "processed" / "synthetic_ambulance_vitals_cleaned",
+                    columns=["heart_rate_bpm"])["heart_rate_bpm"].to_numpy()
+
+    results = [
+        {"stage": "rolling_slope_30s", "rows": len(hr),
+         **time_in_process(lambda: rolling_slope_array(hr, 30))},
+        {"stage": "rolling_slope_60s", "rows": len(hr),
+         **time_in_process(lambda: rolling_slope_array(hr, 60))},
+    ]
+
+    models = fit_hybrid_models(features)
+    X = features[models.feature_cols].to_numpy()
+    results.append({
+        "stage": "if_pca_scoring", "rows": len(X),
+        **time_in_process(lambda: raw_scores(models.scaler, models.iso_forest, models.pca, X))
+    })
+    # Flattened IF + fused PCA; build both scorers outside the timed call
+    models.if_scorer, models.pca_scorer
+    results.append({
+        "stage": "if_pca_scoring_fast", "rows": len(X),
+        **time_in_process(lambda: hybrid_raw_scores(models, X))
+    })
+    results.append({
+        "stage": "detect_drift", "rows": len(features),
+        **time_in_process(lambda: detect_drift(features_path))
+    })
+    return results
+
+
+def bench_predict(calls: int = PREDICT_CALLS) -> list:
+    """Latency of the /predict handler alone and of a full HTTP round trip."""
+    from api.app import VitalsInput, app, predict
+
+    rng = np.random.default_rng(0)
+    payloads = [
+        {"heart_rate_bpm": float(h), "spo2_percent": float(s)}
+        for h, s in zip(rng.uniform(60, 150, calls), rng.uniform(80, 100, calls))
+    ]
+
+    samples = []
+    for payload in payloads:
+        start = time.perf_counter()
+        predict(VitalsInput(**payload))
+        samples.append(time.perf_counter() - start)
+    results = [{"stage": "predict_handler", **latency_summary(samples)}]
+
+    try:
+        from fastapi.testclient import TestClient
+    except ImportError:  # httpx missing
+        return results
+
+    client = TestClient(app)
+    samples = []
+    for payload in payloads:
+        start = time.perf_counter()
+        client.post("/predict", json=payload)
+        samples.append(time.perf_counter() - start)
+    results.append({"stage": "predict_http", **latency_summary(samples)})
+    return results
+
+
+def run_size(name: str, keep: bool = False) -> list:
+    patients, minutes = SIZES[name]
+    workdir = Path(tempfile.mkdtemp(prefix=f"gray_bench_{name}_"))
+    env = dict(
+        os.environ,
+        MPLBACKEND="Agg",
+        PYTHONPATH=os.pathsep.join(filter(None, [str(BASE_DIR), os.environ.get("PYTHONPATH")])),
+        GRAY_MODEL_DIR=str(workdir / "models" / "hybrid"),
+    )
+
+    try:
+        rows = prepare_workdir(workdir, patients, minutes)
+        results = []
+        for stage, module in STAGE_MODULES:
+            print(f"  {name:<18} {stage:<22}", end="", flush=True)
+            result = {"stage": stage, "rows": rows, **bench_stage(stage, module, workdir, env)}
+            print(result.get("error") or f"{result['wall_s']:.2f}s  {result['peak_rss_mb']:.0f} MB")
+            results.append(result)
+
+        print(f"  {name:<18} in-process kernels")
+        results.extend(bench_kernels(workdir))
+
+        for result in results:
+            result.update({"size": name, "patients": patients, "minutes": minutes})
+        return results
+    finally:
+        if keep:
+            print(f"  work dir kept: {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark pipeline stages and the /predict hot path")
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES, choices=sorted(SIZES))
+    parser.add_argument("--predict-calls", type=int, default=PREDICT_CALLS)
+    parser.add_argument("--output", default=None, help="JSON file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--keep-workdir", action="store_true")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        results.extend(run_size(size, keep=args.keep_workdir))
+
+    predict_results = bench_predict(args.predict_calls)
+    for result in predict_results:
+        print(f"  {result['stage']:<22} p50 {result['p50_ms']:.3f} ms  p99 {result['p99_ms']:.3f} ms")
+    results.extend(predict_results)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "sklearn": sklearn.__version__,
+        },
+        "results": results,
+    }
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"bench_{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\n📁 Benchmark report saved to {output}")
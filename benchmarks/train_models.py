@@ -0,0 +1,15 @@
+"""Fit hybrid models on a benchmark work directory's features.
+
+The pipeline's scoring stage only loads trained models, so the benchmarks
+run this between feature engineering and scoring (as a stage of its own,
+timed like the others). Models go to ``GRAY_MODEL_DIR``, never the
+repository's ``models/``.
+
+    python -m benchmarks.train_models
+"""
+from scripts.model_artifacts import fit_hybrid_models, save_artifacts
+from scripts.storage import read_table
+
+if __name__ == "__main__":
+    models = fit_hybrid_models(read_table("data/processed/features"))
+    print(f"Hybrid models saved to {save_artifacts(models)}")
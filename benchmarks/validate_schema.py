@@ -0,0 +1,215 @@
+"""Check the compact table schema against the legacy dtypes.
+
+Runs the ``run_benchmarks`` stage list twice on the same synthetic fleet,
+once with ``GRAY_TABLE_SCHEMA=legacy`` (float64 / int64 / object, as the
+stages produce them) and once with the compact schema of
+``scripts/table_schema.py``, then compares every table column by column:
+
+* flags, levels, labels and other non-float columns must match exactly,
+* float columns must agree within ``--tolerance`` of each column's range
+  (NaN where NaN),
+* in-memory bytes per patient-hour (1 Hz rows) and file sizes are reported
+  for both runs.
+
+Analysis CSVs (metrics, failure tables) are compared the same way. Exits
+non-zero on any mismatch.
+
+    python -m benchmarks.validate_schema --size 100_patients
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import BASE_DIR, RESULTS_DIR, git_commit
+from benchmarks.run_benchmarks import SIZES, STAGE_MODULES, bench_stage, prepare_workdir
+from scripts.storage import read_table
+
+SCHEMAS = ["legacy", "compact"]
+ROWS_PER_HOUR = 3600  # 1 Hz vitals
+
+# Fraction of a column's legacy range. float32 keeps ~7 significant digits,
+# but rounding a feature can move a sample across an Isolation Forest split,
+# which shifts that sample's score (not its flags) by well under 1%
+TOLERANCE = 1e-2
+
+
+# =========================================================
+# RUNS
+# =========================================================
+def run_pipeline(workdir: Path, patients: int, minutes: int, schema: str) -> list:
+    """Seed ``workdir`` and run every stage with ``GRAY_TABLE_SCHEMA=schema``."""
+    env = dict(
+        os.environ,
+        MPLBACKEND="Agg",
+        PYTHONPATH=os.pathsep.join(filter(None, [str(BASE_DIR), os.environ.get("PYTHONPATH")])),
+        GRAY_MODEL_DIR=str(workdir / "models" / "hybrid"),
+        GRAY_TABLE_SCHEMA=schema,
+    )
+    prepare_workdir(workdir, patients, minutes, schema=schema)
+    stages = []
+    for stage, module in STAGE_MODULES:
+        print(f"  {schema:<8} {stage:<22}", end="", flush=True)
+        result = {"stage": stage, **bench_stage(stage, module, workdir, env)}
+        print(result.get("error") or f"{result['wall_s']:.2f}s  {result['peak_rss_mb']:.0f} MB")
+        stages.append(result)
+    return stages
+
+
+def output_tables(workdir: Path) -> dict:
+    """``{relative stem: path}`` of every table and analysis CSV a run left behind."""
+    found = {}
+    for path in sorted((workdir / "data").rglob("*.parquet")) + sorted((workdir / "data").rglob("*.csv")):
+        found.setdefault(str(path.relative_to(workdir).with_suffix("")), path)
+    for path in sorted((workdir / "analysis").rglob("*.csv")):
+        found[str(path.relative_to(workdir))] = path
+    return found
+
+
+def load_as_stored(name: str, path: Path) -> pd.DataFrame:
+    if name.startswith("analysis"):
+        return pd.read_csv(path)
+    return read_table(path, schema="legacy")
+
+
+# =========================================================
+# COMPARISON
+# =========================================================
+def _is_float(series: pd.Series) -> bool:
+    return pd.api.types.is_float_dtype(series.dtype)
+
+
+def compare_column(ref: pd.Series, new: pd.Series, tolerance=TOLERANCE) -> dict:
+    result = {"legacy_dtype": str(ref.dtype), "compact_dtype": str(new.dtype)}
+    if len(ref) != len(new):
+        result["mismatches"] = abs(len(ref) - len(new))
+        return result
+
+    if _is_float(ref) or _is_float(new):
+        a = ref.to_numpy(dtype=float, na_value=np.nan)
+        b = new.to_numpy(dtype=float, na_value=np.nan)
+        both = ~np.isnan(a) & ~np.isnan(b)
+        diff = np.abs(a[both] - b[both])
+        span = float(np.ptp(a[both])) if diff.size else 0.0
+        result["max_abs_diff"] = float(diff.max()) if diff.size else 0.0
+        result["max_range_diff"] = float(diff.max()) / span if span else result["max_abs_diff"]
+        result["mismatches"] = int(
+            (np.isnan(a) != np.isnan(b)).sum()
+            + (diff > tolerance * (span or 1.0)).sum()
+        )
+    elif pd.api.types.is_numeric_dtype(ref.dtype) and pd.api.types.is_numeric_dtype(new.dtype):
+        result["mismatches"] = int((ref.to_numpy() != new.to_numpy()).sum())
+    else:
+        a, b = ref.isna().to_numpy(), new.isna().to_numpy()
+        differ = ref.astype(object).to_numpy() != new.astype(object).to_numpy()
+        result["mismatches"] = int(((a != b) | (differ & ~a & ~b)).sum())
+    return result
+
+
+def compare_tables(ref: pd.DataFrame, new: pd.DataFrame, tolerance=TOLERANCE) -> dict:
+    columns = {
+        col: compare_column(ref[col], new[col], tolerance)
+        for col in ref.columns if col in new.columns
+    }
+    return {
+        "rows": [len(ref), len(new)],
+        "missing_columns": sorted(set(ref.columns) ^ set(new.columns)),
+        "mismatches": sum(c["mismatches"] for c in columns.values()),
+        "columns": columns,
+    }
+
+
+def table_memory(df: pd.DataFrame, path: Path) -> dict:
+    in_memory = int(df.memory_usage(deep=True, index=False).sum())
+    return {
+        "bytes": in_memory,
+        "bytes_per_patient_hour": round(in_memory / len(df) * ROWS_PER_HOUR) if len(df) else None,
+        "file_bytes": sum(p.stat().st_size for p in ([path] if path.is_file() else path.rglob("*"))),
+    }
+
+
+def validate(workdirs: dict, tolerance=TOLERANCE) -> dict:
+    ref_tables = output_tables(workdirs["legacy"])
+    new_tables = output_tables(workdirs["compact"])
+    tables = {}
+    for name, ref_path in ref_tables.items():
+        if name not in new_tables:
+            tables[name] = {"mismatches": 1, "error": "missing in compact run"}
+            continue
+        ref = load_as_stored(name, ref_path)
+        new = load_as_stored(name, new_tables[name])
+        entry = compare_tables(ref, new, tolerance)
+        if not name.startswith("analysis"):
+            entry["memory"] = {
+                "legacy": table_memory(ref, ref_path),
+                "compact": table_memory(new, new_tables[name]),
+            }
+            entry["memory"]["reduction"] = round(
+                entry["memory"]["legacy"]["bytes"] / max(entry["memory"]["compact"]["bytes"], 1), 2
+            )
+        tables[name] = entry
+    return tables
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate the compact table schema against legacy dtypes")
+    parser.add_argument("--size", default="100_patients", choices=sorted(SIZES))
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="allowed float difference, as a fraction of the column's range")
+    parser.add_argument("--output", default=None, help="JSON file (default: benchmarks/results/schema_<timestamp>.json)")
+    parser.add_argument("--keep-workdir", action="store_true")
+    args = parser.parse_args()
+
+    patients, minutes = SIZES[args.size]
+    workdirs = {schema: Path(tempfile.mkdtemp(prefix=f"gray_schema_{schema}_")) for schema in SCHEMAS}
+    try:
+        stages = {
+            schema: run_pipeline(workdir, patients, minutes, schema)
+            for schema, workdir in workdirs.items()
+        }
+        tables = validate(workdirs, args.tolerance)
+    finally:
+        for workdir in workdirs.values():
+            if args.keep_workdir:
+                print(f"  work dir kept: {workdir}")
+            else:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"\n{'table':<64} {'mismatches':>10} {'B/patient-hour':>22} {'x':>6}")
+    for name, entry in tables.items():
+        memory = entry.get("memory")
+        sizes = (f"{memory['legacy']['bytes_per_patient_hour']:>10,} -> {memory['compact']['bytes_per_patient_hour']:<9,}"
+                 if memory else "")
+        reduction = f"{memory['reduction']:.1f}" if memory else ""
+        print(f"{name:<64} {entry['mismatches']:>10} {sizes:>22} {reduction:>6}")
+        for col, result in entry.get("columns", {}).items():
+            if result["mismatches"]:
+                print(f"    {col}: {result}")
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_commit": git_commit(),
+            "size": args.size,
+            "patients": patients,
+            "minutes": minutes,
+            "tolerance": args.tolerance,
+        },
+        "stages": stages,
+        "tables": tables,
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / f"schema_{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📁 Schema validation report saved to {output}")
+
+    if any(entry["mismatches"] for entry in tables.values()):
+        sys.exit(1)
@@ -1,74 +1,64 @@
-import pandas as pd
+import argparse
 import matplotlib.pyplot as plt
 import os
 
+from scripts.patient_cleaning import clean_patients
+from scripts.storage import read_table, write_table
+
 # -------------------------
 # CONFIG
 # -------------------------
-INPUT_PATH = "data/ambulance_vitals_dataset.csv"
-OUTPUT_PATH = "data/cleaned_vitals.csv"
+INPUT_PATH = "data/ambulance_vitals_dataset"
+OUTPUT_PATH = "data/cleaned_vitals"
+WORKERS = 1  # >1 shards patients across processes
 
 os.makedirs("data", exist_ok=True)
 
-# -------------------------
-# LOAD DATA
-# -------------------------
-df = pd.read_csv(INPUT_PATH)
-
-# -------------------------
-# ARTIFACT HANDLING
-# -------------------------
-
-# 1. Interpolate missing HR and SpO2 per patient
-df["HR"] = df.groupby("patient_id")["HR"].transform(lambda x: x.interpolate())
-df["SpO2"] = df.groupby("patient_id")["SpO2"].transform(lambda x: x.interpolate())
-
-# 2. Rolling median smoothing
-df["HR_clean"] = df.groupby("patient_id")["HR"].transform(
-    lambda x: x.rolling(window=5, center=True).median()
-)
-
-df["SpO2_clean"] = df.groupby("patient_id")["SpO2"].transform(
-    lambda x: x.rolling(window=5, center=True).median()
-)
-
-# Fill edges
-df["HR_clean"] = df["HR_clean"].fillna(df["HR"])
-df["SpO2_clean"] = df["SpO2_clean"].fillna(df["SpO2"])
-
-
-# 3. Motion-aware artifact suppression
-high_motion = df["motion"] > 0.9   # 0.6 
-
-df.loc[high_motion, "SpO2_clean"] = (
-    df.groupby("patient_id")["SpO2_clean"]
-    .transform(lambda x: x.rolling(10, min_periods=1).median())
-)
-
-# -------------------------
-# SAVE CLEANED DATA
-# -------------------------
-df.to_csv(OUTPUT_PATH, index=False)
-print("Cleaned dataset saved to:", OUTPUT_PATH)
-
-# -------------------------
-# BEFORE vs AFTER PLOTS
-# -------------------------
-patient = df[df["patient_id"] == 1]
-
-plt.figure(figsize=(12, 6))
-
-plt.subplot(2, 1, 1)
-plt.plot(patient["timestamp"], patient["HR"], label="Raw HR", alpha=0.5)
-plt.plot(patient["timestamp"], patient["HR_clean"], label="Clean HR")
-plt.legend()
-plt.title("HR Artifact Cleaning")
-
-plt.subplot(2, 1, 2)
-plt.plot(patient["timestamp"], patient["SpO2"], label="Raw SpO2", alpha=0.5)
-plt.plot(patient["timestamp"], patient["SpO2_clean"], label="Clean SpO2")
-plt.legend()
-plt.title("SpO2 Artifact Cleaning")
-
-plt.tight_layout()
-plt.show()
+# Guarded: --workers > 1 starts worker processes
+if __name__ == "__main__":
+    # -------------------------
+    # LOAD DATA
+    # -------------------------
+    parser = argparse.ArgumentParser(description="Per-patient artifact cleaning for fleet exports")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="worker processes (0: all cores)")
+    args = parser.parse_args()
+
+    df = read_table(INPUT_PATH)
+
+    # -------------------------
+    # ARTIFACT HANDLING
+    # -------------------------
+    # One sort by (patient_id, timestamp), then segmented passes over all
+    # patients (scripts/patient_cleaning.py):
+    # 1. Interpolate missing HR and SpO2 per patient
+    # 2. Rolling median smoothing (centered, 5 samples), edges keep the raw value
+    # 3. Motion-aware artifact suppression: SpO2 trailing 10-sample median
+    df = clean_patients(df, workers=args.workers or None)
+
+    # -------------------------
+    # SAVE CLEANED DATA
+    # -------------------------
+    out_file = write_table(df, OUTPUT_PATH)
+    print("Cleaned dataset saved to:", out_file)
+
+    # -------------------------
+    # BEFORE vs AFTER PLOTS
+    # -------------------------
+    patient = df[df["patient_id"] == 1]
+
+    plt.figure(figsize=(12, 6))
+
+    plt.subplot(2, 1, 1)
+    plt.plot(patient["timestamp"], patient["HR"], label="Raw HR", alpha=0.5)
+    plt.plot(patient["timestamp"], patient["HR_clean"], label="Clean HR")
+    plt.legend()
+    plt.title("HR Artifact Cleaning")
+
+    plt.subplot(2, 1, 2)
+    plt.plot(patient["timestamp"], patient["SpO2"], label="Raw SpO2", alpha=0.5)
+    plt.plot(patient["timestamp"], patient["SpO2_clean"], label="Clean SpO2")
+    plt.legend()
+    plt.title("SpO2 Artifact Cleaning")
+
+    plt.tight_layout()
+    plt.show()
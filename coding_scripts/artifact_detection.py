@@ -2,10 +2,14 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import os 
+
+from scripts.artifact_filter import clean_vitals
+from scripts.storage import read_table, write_table
+
 # -----------------------------
 # LOAD DATA
 # -----------------------------
-df = pd.read_csv("data/raw/synthetic_ambulance_vitals.csv")
+df = read_table("data/raw/synthetic_ambulance_vitals")
 
 time = df["time_sec"] / 60  # minutes
 
@@ -17,46 +21,11 @@ DISTRESS_END = 20
 raw = df.copy()
 
 # -----------------------------
-# PARAMETERS (EXPLICIT & DEFENSIBLE)
-# -----------------------------
-MOTION_THRESHOLD = 0.7
-SPO2_DROP_THRESHOLD = 3          # %
-HR_SPIKE_THRESHOLD = 15          # bpm
-ROLLING_WINDOW = 5               # seconds
-
-# -----------------------------
-# HANDLE MISSING DATA
-# -----------------------------
-df["heart_rate_bpm"] = df["heart_rate_bpm"].interpolate(limit=5)
-df["spo2_percent"] = df["spo2_percent"].interpolate(limit=5)
-df["bp_systolic"] = df["bp_systolic"].interpolate(limit=5)
-df["bp_diastolic"] = df["bp_diastolic"].interpolate(limit=5)
-
-# -----------------------------
-# ROLLING BASELINES
+# MISSING DATA + ARTIFACT SUPPRESSION
 # -----------------------------
-hr_baseline = df["heart_rate_bpm"].rolling(ROLLING_WINDOW, center=True).median()
-spo2_baseline = df["spo2_percent"].rolling(ROLLING_WINDOW, center=True).median()
-
-# -----------------------------
-# HR SPIKE SUPPRESSION (motion-related)
-# -----------------------------
-hr_spike_mask = (
-    (df["motion"] > MOTION_THRESHOLD) &
-    ((df["heart_rate_bpm"] - hr_baseline).abs() > HR_SPIKE_THRESHOLD)
-)
-
-df.loc[hr_spike_mask, "heart_rate_bpm"] = hr_baseline[hr_spike_mask]
-
-# -----------------------------
-# SpO2 FALSE DROP SUPPRESSION
-# -----------------------------
-spo2_artifact_mask = (
-    (df["motion"] > MOTION_THRESHOLD) &
-    ((spo2_baseline - df["spo2_percent"]) > SPO2_DROP_THRESHOLD)
-)
-
-df.loc[spo2_artifact_mask, "spo2_percent"] = spo2_baseline[spo2_artifact_mask]
+# Retrospective mode (interpolation, centered baselines); the same
+# thresholds drive the causal live filter in scripts/artifact_filter.py
+df = clean_vitals(df, causal=False)
 
 # -----------------------------
 # BEFORE vs AFTER PLOTS
@@ -89,6 +58,5 @@ plt.show()
 # -----------------------------
 # SAVE CLEANED DATA
 # -----------------------------
-os.makedirs("data/processed", exist_ok=True)
-df.to_csv("data/processed/synthetic_ambulance_vitals_cleaned.csv", index=False)
+write_table(df, "data/processed/synthetic_ambulance_vitals_cleaned")
 print("Artifact handling complete. Cleaned dataset saved.")
\ No newline at end of file
@@ -3,13 +3,15 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 
+from scripts.storage import read_table
+
 # -----------------------------
 # SETUP
 # -----------------------------
 os.makedirs("plots/validation/artifacts", exist_ok=True)
 
-raw = pd.read_csv("data/raw/synthetic_ambulance_vitals.csv")
-clean = pd.read_csv("data/processed/synthetic_ambulance_vitals_cleaned.csv")
+raw = read_table("data/raw/synthetic_ambulance_vitals")
+clean = read_table("data/processed/synthetic_ambulance_vitals_cleaned")
 
 time = raw["time_sec"] / 60  # minutes
 
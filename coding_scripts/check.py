@@ -1,6 +1,11 @@
 import pandas as pd
 
-df = pd.read_csv("data/risk_scores/final_decision.csv")
+from scripts.storage import read_table
+
+df = read_table(
+    "data/risk_scores/final_decision",
+    columns=["risk_score", "risk_level", "heart_rate_bpm", "spo2_percent"]
+)
 
 print(df["risk_score"].describe())
 print(df["risk_level"].value_counts(normalize=True) * 100)
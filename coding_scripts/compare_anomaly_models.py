@@ -2,12 +2,14 @@ import pandas as pd
 import numpy as np
 from sklearn.metrics import precision_score, recall_score, f1_score
 
+from scripts.storage import read_table
+
 # -----------------------------
 # LOAD OUTPUTS
 # -----------------------------
-rule_df = pd.read_csv("data/risk_scores/rule_based_anomaly_output.csv")
-if_df = pd.read_csv("data/risk_scores/isolation_forest_output.csv")
-pca_df = pd.read_csv("data/risk_scores/pca_anomaly_output.csv")
+rule_df = read_table("data/risk_scores/rule_based_anomaly_output", columns=["time_sec", "anomaly_level"])
+if_df = read_table("data/risk_scores/isolation_forest_output", columns=["if_anomaly"])
+pca_df = read_table("data/risk_scores/pca_anomaly_output", columns=["pca_anomaly"])
 
 # -----------------------------
 # DEFINE GROUND TRUTH
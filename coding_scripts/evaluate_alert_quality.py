@@ -1,10 +1,25 @@
 import pandas as pd
 import numpy as np
+import os
+
+from scripts.alert_sweep import sweep_alert_policies
+from scripts.storage import read_table, table_columns
+
+SWEEP_OUTPUT = "analysis/metrics/alert_policy_sweep.csv"
 
 # =========================================================
 # LOAD DATA
 # =========================================================
-df = pd.read_csv("data/risk_scores/final_decision.csv")
+INPUT_FILE = "data/risk_scores/final_decision"
+
+# Fleet exports are evaluated per patient; a single recording is one group
+GROUP_COL = "patient_id" if "patient_id" in table_columns(INPUT_FILE) else None
+
+df = read_table(
+    INPUT_FILE,
+    columns=["time_sec", "heart_rate_bpm", "spo2_percent", "risk_score", "risk_level"]
+    + ([GROUP_COL] if GROUP_COL else [])
+)
 
 # =========================================================
 # GROUND TRUTH (PHYSIOLOGY-BASED, REALISTIC)
@@ -92,3 +107,20 @@ print(f"Alert Latency(s) : {alert_latency}")
 
 print("\nAlert Rate (% of time):")
 print(df['predicted_alert'].mean() * 100)
+
+# =========================================================
+# POLICY SWEEP (every threshold x persistence in one pass)
+# =========================================================
+# Alert when risk_score >= threshold for the last `persistence_rows` rows
+sweep = sweep_alert_policies(df, group_col=GROUP_COL)
+
+os.makedirs(os.path.dirname(SWEEP_OUTPUT), exist_ok=True)
+sweep.to_csv(SWEEP_OUTPUT, index=False)
+
+sweep["f1"] = 2 * sweep["precision"] * sweep["recall"] / (sweep["precision"] + sweep["recall"] + 1e-6)
+best = sweep.loc[sweep.groupby("persistence_rows")["f1"].idxmax()]
+
+print(f"\n=== Policy Sweep ({len(sweep)} settings) — best F1 per persistence ===")
+print(best[["persistence_rows", "threshold", "precision", "recall",
+            "false_alert_rate", "alert_latency_sec"]].to_string(index=False))
+print(f"📁 Sweep saved to {SWEEP_OUTPUT}")
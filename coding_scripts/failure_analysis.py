@@ -2,6 +2,9 @@ import pandas as pd
 import numpy as np
 import os
 
+from scripts.event_matching import event_starts, match_onsets
+from scripts.storage import read_table
+
 # =========================================================
 # CONFIG
 # =========================================================
@@ -10,7 +13,7 @@ MAX_ACCEPTABLE_DELAY = 180  # seconds (clinical response window)
 # =========================================================
 # LOAD DATA
 # =========================================================
-df = pd.read_csv("data/risk_scores/final_decision.csv")
+df = read_table("data/risk_scores/final_decision")
 os.makedirs("analysis/failure_cases", exist_ok=True)
 
 # =========================================================
@@ -52,8 +55,17 @@ df["predicted_alert"] = (
 # =========================================================
 # EVENT STARTS
 # =========================================================
-df["gt_start"] = (df["ground_truth"] == 1) & (df["ground_truth"].shift(1) == 0)
-df["alert_start"] = (df["predicted_alert"] == 1) & (df["predicted_alert"].shift(1) == 0)
+# Fleet exports are matched per patient; a single recording is one group
+GROUP_COL = "patient_id" if "patient_id" in df.columns else None
+groups = df[GROUP_COL].to_numpy() if GROUP_COL else None
+
+df["gt_start"] = event_starts(df["ground_truth"].to_numpy(), groups)
+df["alert_start"] = event_starts(df["predicted_alert"].to_numpy(), groups)
+
+# Each onset paired with its first later alert (sorted times + searchsorted)
+late_alert_df, false_negative_df = match_onsets(
+    df, MAX_ACCEPTABLE_DELAY, group_col=GROUP_COL
+)
 
 # =========================================================
 # FAILURE CASE 1: TRANSIENT FALSE POSITIVES
@@ -71,27 +83,7 @@ fp_transient.to_csv(
 # =========================================================
 # FAILURE CASE 2: LATE ALERTS
 # =========================================================
-late_alert_events = []
-
-for gt_idx in df.index[df["gt_start"]]:
-    gt_time = df.loc[gt_idx, "time_sec"]
-
-    future_alerts = df[
-        (df["time_sec"] > gt_time) &
-        (df["predicted_alert"] == 1)
-    ]
-
-    if not future_alerts.empty:
-        first_alert_time = future_alerts.iloc[0]["time_sec"]
-        latency = first_alert_time - gt_time
-
-        if latency > MAX_ACCEPTABLE_DELAY:
-            event = df.loc[gt_idx].copy()
-            event["alert_latency_sec"] = latency
-            late_alert_events.append(event)
-
-late_alert_df = pd.DataFrame(late_alert_events)
-
+# Onsets whose first later alert comes after MAX_ACCEPTABLE_DELAY
 late_alert_df.to_csv(
     "analysis/failure_cases/failure_case_2_late_alert.csv",
     index=False
@@ -100,22 +92,7 @@ late_alert_df.to_csv(
 # =========================================================
 # FAILURE CASE 3: FALSE NEGATIVES (TIME-BOUNDED)
 # =========================================================
-false_negative_events = []
-
-for gt_idx in df.index[df["gt_start"]]:
-    gt_time = df.loc[gt_idx, "time_sec"]
-
-    alerts_in_window = df[
-        (df["time_sec"] > gt_time) &
-        (df["time_sec"] <= gt_time + MAX_ACCEPTABLE_DELAY) &
-        (df["predicted_alert"] == 1)
-    ]
-
-    if alerts_in_window.empty:
-        false_negative_events.append(df.loc[gt_idx])
-
-false_negative_df = pd.DataFrame(false_negative_events)
-
+# Onsets with no alert in (onset, onset + MAX_ACCEPTABLE_DELAY]
 false_negative_df.to_csv(
     "analysis/failure_cases/failure_case_3_false_negative_time_bounded.csv",
     index=False
@@ -1,10 +1,14 @@
 import pandas as pd
 import numpy as np
 
+from scripts.profiling import operation
+from scripts.rolling_features import rolling_slope_array
+from scripts.storage import read_table, write_table
+
 # -----------------------------
 # LOAD CLEANED DATA
 # -----------------------------
-df = pd.read_csv("data/processed/synthetic_ambulance_vitals_cleaned.csv")
+df = read_table("data/processed/synthetic_ambulance_vitals_cleaned")
 
 # -----------------------------
 # WINDOW SIZES (seconds)
@@ -16,12 +20,16 @@ WIN_60 = 60
 # -----------------------------
 # HELPER: SLOPE CALCULATION
 # -----------------------------
+# Closed-form running sums (same result as np.polyfit per window)
 def rolling_slope(series, window):
-    return series.rolling(window).apply(
-        lambda x: np.polyfit(range(len(x)), x, 1)[0] if len(x) == window else np.nan,
-        raw=False
+    return pd.Series(
+        rolling_slope_array(series.to_numpy(dtype=float), window),
+        index=series.index
     )
 
+# Rolling feature block, timed as one operation when profiling
+rolling_op = operation("rolling_features", rows=len(df)).start()
+
 # -----------------------------
 # HEART RATE FEATURES
 # -----------------------------
@@ -69,6 +77,7 @@ df["sys_bp_slope_60s"] = rolling_slope(df["bp_systolic"], WIN_60)
 # -----------------------------
 df["motion_mean_10s"] = df["motion"].rolling(WIN_10).mean()
 df["high_motion_flag"] = (df["motion_mean_10s"] > 0.7).astype(int)
+rolling_op.stop()
 
 # -----------------------------
 # DROP INITIAL NaNs
@@ -78,7 +87,7 @@ feature_df = df.dropna().reset_index(drop=True)
 # -----------------------------
 # SAVE FEATURES
 # -----------------------------
-feature_df.to_csv("data/processed/features.csv", index=False)
+out_file = write_table(feature_df, "data/processed/features")
 
-print("Feature engineering complete. Features saved to data/processed/features.csv")
+print(f"Feature engineering complete. Features saved to {out_file}")
 print(feature_df.head())
@@ -0,0 +1,37 @@
+import argparse
+import time
+
+from scripts.fleet_generator import generate_fleet
+
+# -----------------------------
+# CONFIG (overridable from the command line)
+# -----------------------------
+SEED = 42
+N_PATIENTS = 100
+DURATION_MINUTES = 120
+PATIENTS_PER_CHUNK = 50
+OUTPUT_DIR = "data/raw/fleet_vitals"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic 1 Hz vitals for a fleet of patients")
+    parser.add_argument("--patients", type=int, default=N_PATIENTS)
+    parser.add_argument("--minutes", type=float, default=DURATION_MINUTES, help="transport duration per patient")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--chunk-size", type=int, default=PATIENTS_PER_CHUNK, help="patients per output part file")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--out", default=OUTPUT_DIR)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    parts = generate_fleet(
+        n_patients=args.patients,
+        duration_sec=int(args.minutes * 60),
+        out_dir=args.out,
+        seed=args.seed,
+        patients_per_chunk=args.chunk_size,
+        workers=args.workers
+    )
+
+    print(f"Synthetic fleet generated: {args.patients} patients × {args.minutes:g} min "
+          f"in {len(parts)} parts ({time.perf_counter() - start:.1f}s)")
+    print(f"Output directory: {args.out}")
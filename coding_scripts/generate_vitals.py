@@ -1,6 +1,8 @@
 import numpy as np
 import pandas as pd
 
+from scripts.storage import write_table
+
 # -----------------------------
 # CONFIG
 # -----------------------------
@@ -129,7 +131,7 @@ df = pd.DataFrame({
 # -----------------------------
 # SAVE
 # -----------------------------
-df.to_csv("synthetic_ambulance_vitals.csv", index=False)
+write_table(df, "data/raw/synthetic_ambulance_vitals")
 
 print("Synthetic ambulance vitals dataset generated:")
 print(df.head())
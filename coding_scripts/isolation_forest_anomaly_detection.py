@@ -3,10 +3,13 @@ import numpy as np
 from sklearn.ensemble import IsolationForest
 from sklearn.preprocessing import StandardScaler
 
+from scripts.profiling import operation
+from scripts.storage import read_table, write_table
+
 # -----------------------------
 # LOAD FEATURE DATA
 # -----------------------------
-df = pd.read_csv("data/processed/features.csv")
+df = read_table("data/processed/features")
 
 # -----------------------------
 # SELECT FEATURES FOR IF
@@ -24,7 +27,8 @@ feature_cols = [
     "motion_mean_10s"
 ]
 
-X = df[feature_cols].copy()
+# Fit in float64; the feature table itself is stored as float32
+X = df[feature_cols].astype(float)
 
 # -----------------------------
 # SCALE FEATURES
@@ -41,16 +45,18 @@ iso_forest = IsolationForest(
     random_state=42
 )
 
-iso_forest.fit(X_scaled)
+with operation("model_fit", rows=len(X_scaled)):
+    iso_forest.fit(X_scaled)
 
 # -----------------------------
 # ANOMALY SCORES & FLAGS
 # -----------------------------
 # Higher score = more anomalous (invert sklearn convention)
-df["if_score"] = -iso_forest.score_samples(X_scaled)
+with operation("scoring", rows=len(X_scaled)):
+    df["if_score"] = -iso_forest.score_samples(X_scaled)
 
-# Binary flag (1 = anomaly)
-df["if_anomaly"] = (iso_forest.predict(X_scaled) == -1).astype(int)
+    # Binary flag (1 = anomaly)
+    df["if_anomaly"] = (iso_forest.predict(X_scaled) == -1).astype(int)
 
 # -----------------------------
 # NORMALIZE SCORE (0–1)
@@ -63,7 +69,7 @@ df["if_score_norm"] = (
 # -----------------------------
 # SAVE OUTPUT
 # -----------------------------
-df.to_csv("data/risk_scores/isolation_forest_output.csv", index=False)
+write_table(df, "data/risk_scores/isolation_forest_output")
 
 print("Isolation Forest anomaly detection complete.")
 print(df["if_anomaly"].value_counts())
@@ -3,10 +3,14 @@ import numpy as np
 from sklearn.decomposition import PCA
 from sklearn.preprocessing import StandardScaler
 
+from scripts.pca_scorer import PCAResidualScorer
+from scripts.profiling import operation
+from scripts.storage import read_table, write_table
+
 # -----------------------------
 # LOAD FEATURE DATA
 # -----------------------------
-df = pd.read_csv("data/processed/features.csv")
+df = read_table("data/processed/features")
 
 # -----------------------------
 # SELECT FEATURES
@@ -24,7 +28,8 @@ feature_cols = [
     "motion_mean_10s"
 ]
 
-X = df[feature_cols].copy()
+# Fit in float64; the feature table itself is stored as float32
+X = df[feature_cols].astype(float)
 
 # -----------------------------
 # SCALE FEATURES
@@ -37,26 +42,30 @@ X_scaled = scaler.fit_transform(X)
 # -----------------------------
 # Keep enough components to explain most variance
 pca = PCA(n_components=0.95, random_state=42)
-X_pca = pca.fit_transform(X_scaled)
+with operation("model_fit", rows=len(X_scaled)):
+    pca.fit(X_scaled)
 
 # -----------------------------
-# RECONSTRUCTION ERROR
+# RECONSTRUCTION ERROR + ANOMALY THRESHOLD
 # -----------------------------
-X_reconstructed = pca.inverse_transform(X_pca)
-reconstruction_error = np.mean(
-    (X_scaled - X_reconstructed) ** 2, axis=1
-)
+# Scaler and residual projector fused into one matmul; the same pass gives
+# per-feature contributions for the flagged rows.
+# Use high percentile (unsupervised)
+THRESHOLD_PERCENTILE = 95
+scorer = PCAResidualScorer(scaler, pca, feature_names=feature_cols)
+with operation("scoring", rows=len(X)):
+    reconstruction_error, flagged, contributions = scorer.explain(
+        X.to_numpy(dtype=float), percentile=THRESHOLD_PERCENTILE
+    )
 
 df["pca_reconstruction_error"] = reconstruction_error
 
-# -----------------------------
-# ANOMALY THRESHOLD
-# -----------------------------
-# Use high percentile (unsupervised)
-THRESHOLD_PERCENTILE = 95
-threshold = np.percentile(reconstruction_error, THRESHOLD_PERCENTILE)
+df["pca_anomaly"] = 0
+df.loc[df.index[flagged], "pca_anomaly"] = 1
 
-df["pca_anomaly"] = (reconstruction_error > threshold).astype(int)
+# Feature with the largest residual, for flagged rows only
+df["pca_top_feature"] = None
+df.loc[df.index[flagged], "pca_top_feature"] = scorer.top_features(contributions)
 
 # -----------------------------
 # NORMALIZE SCORE (0–1)
@@ -69,7 +78,7 @@ df["pca_score_norm"] = (
 # -----------------------------
 # SAVE OUTPUT
 # -----------------------------
-df.to_csv("data/risk_scores/pca_anomaly_output.csv", index=False)
+write_table(df, "data/risk_scores/pca_anomaly_output")
 
 print("PCA anomaly detection complete.")
 print("Explained variance ratio:", pca.explained_variance_ratio_)
@@ -2,13 +2,25 @@ import pandas as pd
 import numpy as np
 import os
 
+from scripts.model_artifacts import load_artifacts
+from scripts.risk_calibration import (
+    fit_calibration,
+    risk_components,
+    risk_level_categorical,
+    trend_severity,
+    triage,
+)
+from scripts.storage import find_table, read_table, write_table
+
 # -------------------------
 # FILE PATHS
 # -------------------------
-INPUT_FILE = "data/risk_scores/hybrid_validated_alerts.csv"
-OUTPUT_FILE = "data/risk_scores/final_decision.csv"
+INPUT_FILE = "data/risk_scores/hybrid_validated_alerts"
+OUTPUT_FILE = "data/risk_scores/final_decision"
 
-if not os.path.exists(INPUT_FILE):
+try:
+    find_table(INPUT_FILE)
+except FileNotFoundError:
     raise FileNotFoundError(
         f"{INPUT_FILE} not found.\nFiles in data/risk_scores/: {os.listdir('data/risk_scores') if os.path.exists('data/risk_scores') else 'missing'}"
     )
@@ -16,7 +28,7 @@ if not os.path.exists(INPUT_FILE):
 # -------------------------
 # LOAD DATA
 # -------------------------
-df = pd.read_csv(INPUT_FILE)
+df = read_table(INPUT_FILE)
 
 print("✅ Loaded hybrid validated alerts")
 print("Columns:", df.columns.tolist())
@@ -30,70 +42,52 @@ rule_col = "hybrid_anomaly"           # validated anomaly flag (0/1)
 # -------------------------
 # TREND SEVERITY (early warning)
 # -------------------------
-# Use meaningful trend features (already engineered by you)
-trend_features = [
-    "hr_slope_30s",
-    "spo2_slope_60s",
-    "sys_bp_slope_60s"
-]
-
-# Keep only features that exist
-trend_features = [c for c in trend_features if c in df.columns]
-
-# Aggregate trend severity
-df["trend_severity"] = df[trend_features].abs().mean(axis=1)
+# Mean |slope| of hr_slope_30s, spo2_slope_60s, sys_bp_slope_60s (those present)
+df["trend_severity"] = trend_severity(df)
 
 # -------------------------
-# NORMALIZATION (0–100)
+# FROZEN CALIBRATION
 # -------------------------
-def normalize(series):
-    return 100 * (series - series.min()) / (series.max() - series.min() + 1e-6)
-
-df["anomaly_norm"] = normalize(df[anomaly_col])
-df["trend_norm"] = normalize(df["trend_severity"])
+# Score ranges learned at training time (hybrid model manifest), so a
+# row's risk score does not depend on the rest of this file
+try:
+    models = load_artifacts()
+    calibration = models.manifest.get("risk_calibration")
+except FileNotFoundError:
+    calibration = None
 
-# Confidence proxy:
-# stronger anomaly + consistent trend → higher confidence
-df["confidence"] = (
-    0.6 * df["anomaly_norm"] + 0.4 * df["trend_norm"]
-) / 100
-
-# -------------------------
-# FINAL RISK SCORE (Task 2B)
-# -------------------------
-df["risk_score"] = (
-    0.6 * df["anomaly_norm"] +
-    0.3 * df["trend_norm"] +
-    0.1 * (df["confidence"] * 100)
-)
+if calibration is None:
+    print("⚠️ No frozen risk calibration found (retrain with train_anomaly_model.py); "
+          "falling back to this file's score ranges")
+    calibration = fit_calibration(df[anomaly_col], df["trend_severity"])
 
 # -------------------------
-# TRIAGE LEVELS
+# NORMALIZATION (0–100) + FINAL RISK SCORE (Task 2B)
 # -------------------------
-def risk_level(score):
-    if score >= 70:
-        return "RED"
-    elif score >= 40:
-        return "AMBER"
-    return "GREEN"
+# anomaly / trend normalized to 0–100, confidence = (0.6 anomaly + 0.4 trend) / 100,
+# risk = 0.6 anomaly + 0.3 trend + 0.1 confidence * 100
+components = risk_components(df[anomaly_col], df["trend_severity"], calibration)
 
-df["risk_level"] = df["risk_score"].apply(risk_level)
+df["anomaly_norm"] = components["anomaly_norm"]
+df["trend_norm"] = components["trend_norm"]
+df["confidence"] = components["confidence"]
+df["risk_score"] = components["risk_score"]
 
 # -------------------------
-# FINAL ALERT DECISION
+# TRIAGE LEVELS + FINAL ALERT DECISION
 # -------------------------
-def final_alert(row):
-    if row[rule_col] == 0:
-        return 0
-    return 1 if row["risk_level"] == "RED" else 0
+# RED >= 70, AMBER >= 40, else GREEN; alert only when the validated
+# anomaly flag is set and the level is RED. risk_level is categorical.
+level_codes, final_alert_flag = triage(df["risk_score"].to_numpy(), df[rule_col].to_numpy())
 
-df["final_alert_flag"] = df.apply(final_alert, axis=1)
+df["risk_level"] = risk_level_categorical(level_codes)
+df["final_alert_flag"] = final_alert_flag
 
 # -------------------------
 # SAVE OUTPUT
 # -------------------------
-df.to_csv(OUTPUT_FILE, index=False)
+out_file = write_table(df, OUTPUT_FILE)
 
 print("✅ Risk scoring completed successfully")
 print(df["risk_level"].value_counts())
-print(f"📁 Output saved to {OUTPUT_FILE}")
+print(f"📁 Output saved to {out_file}")
@@ -2,12 +2,14 @@ import os
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from scripts.storage import read_table
+
 # -----------------------------
 # SETUP
 # -----------------------------
 os.makedirs("plots/features", exist_ok=True)
 
-df = pd.read_csv("data/features.csv")
+df = read_table("data/features")
 
 time = df["time_sec"] / 60  # minutes
 
@@ -2,10 +2,12 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import os
 
+from scripts.storage import read_table
+
 # -------------------------
 # PATHS
 # -------------------------
-INPUT_FILE = "data/risk_scores/final_decision.csv"
+INPUT_FILE = "data/risk_scores/final_decision"
 OUTPUT_DIR = "plots/risk_trends"
 OUTPUT_IMAGE = os.path.join(OUTPUT_DIR, "risk_score_over_time.png")
 
@@ -17,7 +19,7 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 # -------------------------
 # LOAD DATA
 # -------------------------
-df = pd.read_csv(INPUT_FILE)
+df = read_table(INPUT_FILE, columns=["time_sec", "risk_score"])
 
 # Sort by time for clean plot
 df = df.sort_values("time_sec")
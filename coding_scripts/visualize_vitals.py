@@ -1,10 +1,12 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from scripts.storage import read_table
+
 # -----------------------------
 # LOAD DATA
 # -----------------------------
-df = pd.read_csv("data/synthetic_ambulance_vitals.csv")
+df = read_table("data/synthetic_ambulance_vitals")
 
 time = df["time_sec"] / 60  # convert to minutes for readability
 
@@ -1,40 +1,63 @@
 import json
+from functools import lru_cache
+
 import pandas as pd
 from pathlib import Path
 
-from pathlib import Path
+from scripts.drift_monitor import DriftMonitor
+from scripts.storage import iter_table, read_table, table_columns, write_table
 
 # -------------------------
 # PATH SETUP (CORRECT)
 # -------------------------
 BASE_DIR = Path(__file__).resolve().parent
 
-DATA_PATH = BASE_DIR / "data" / "features.csv"
+DATA_PATH = BASE_DIR / "data" / "features"
 STATS_PATH = BASE_DIR / "models" / "training_stats.json"
-DRIFT_TEST_PATH = BASE_DIR / "data" / "drift_test.csv"
+DRIFT_TEST_PATH = BASE_DIR / "data" / "drift_test"
 
 
 # -------------------------
-# DRIFT DETECTION FUNCTION
+# TRAINING STATS (loaded once per process)
 # -------------------------
-def detect_drift(data_path, threshold=2.5):
-    df = pd.read_csv(data_path)
+@lru_cache(maxsize=None)
+def _load_stats(stats_path):
+    with open(stats_path, "r") as f:
+        return json.load(f)
+
 
-    with open(STATS_PATH, "r") as f:
-        stats = json.load(f)
+def load_training_stats(stats_path=STATS_PATH) -> dict:
+    return _load_stats(str(stats_path))
 
-    drift_features = []
 
-    for col in df.columns:
-        if col in stats["mean"]:
-            z_score = abs(
-                (df[col].mean() - stats["mean"][col]) /
-                (stats["std"][col] + 1e-8)
-            )
-            if z_score > threshold:
-                drift_features.append(col)
+# -------------------------
+# DRIFT DETECTION FUNCTIONS
+# -------------------------
+def drift_report(data_path, stats_path=STATS_PATH, **thresholds) -> dict:
+    """Stream a stored table through a DriftMonitor; per-feature statistics."""
+    stats = load_training_stats(stats_path)
+
+    # Only load the features we have training stats for, one part at a time
+    columns = [c for c in table_columns(data_path) if c in stats["mean"]]
+    monitor = DriftMonitor.from_training_stats(stats, columns)
+    for chunk in iter_table(data_path, columns=columns):
+        monitor.update(chunk)
 
-    return drift_features
+    return monitor.report(**thresholds)
+
+
+def detect_drift(data_path, threshold=2.5):
+    """Features whose mean moved more than ``threshold`` training stds."""
+    report = drift_report(data_path, z_threshold=threshold)
+    return [col for col, r in report.items() if r["z_score"] > threshold]
+
+
+def print_shape_drift(report):
+    shifted = {c: r for c, r in report.items() if {"psi", "ks"} & set(r["reasons"])}
+    if any(r["reference"] == "normal" for r in report.values()):
+        print("   (no stored histograms: reference approximated as normal from mean/std)")
+    for col, r in shifted.items():
+        print(f"   {col:<26} PSI={r['psi']:.3f}  KS={r['ks']:.3f}  std ratio={r['std_ratio']:.2f}")
 
 
 # -------------------------
@@ -51,16 +74,19 @@ if __name__ == "__main__":
     else:
         print("✅ No significant drift detected")
 
+    print("📊 Distribution shape vs training reference (PSI / KS):")
+    print_shape_drift(drift_report(DATA_PATH))
+
     # 2️⃣ Inject artificial drift for validation
     print("\n🧪 Injecting artificial drift for validation...")
 
-    df = pd.read_csv(DATA_PATH)
+    df = read_table(DATA_PATH)
     df_drifted = df.copy()
 
     # amplify first feature to simulate drift
     df_drifted.iloc[:, 0] = df_drifted.iloc[:, 0] * 3
 
-    df_drifted.to_csv(DRIFT_TEST_PATH, index=False)
+    write_table(df_drifted, DRIFT_TEST_PATH)
 
     drifted_test = detect_drift(DRIFT_TEST_PATH)
 
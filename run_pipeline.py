@@ -0,0 +1,53 @@
+import argparse
+import json
+
+from scripts.pipeline import STAGES, run_pipeline, select_stages, stage_dependencies
+from scripts.profiling import PROFILERS, write_run_report
+
+# -------------------------
+# CLI
+# -------------------------
+parser = argparse.ArgumentParser(
+    description="Run the batch pipeline, skipping stages whose cached outputs are still valid"
+)
+parser.add_argument("targets", nargs="*", help="stages to bring up to date (default: all)")
+parser.add_argument("--force", action="store_true", help="ignore the cache and rerun")
+parser.add_argument("--jobs", type=int, default=None, help="max stages running in parallel")
+parser.add_argument("--list", action="store_true", help="show stages and dependencies, then exit")
+parser.add_argument("--verbose", action="store_true", help="print each stage's console output")
+parser.add_argument("--profile", metavar="DIR", default=None,
+                    help="write per-stage timings (wall/CPU/rows/peak RSS per operation) and report.json to DIR")
+parser.add_argument("--profiler", choices=PROFILERS, default="none",
+                    help="with --profile, also dump a profile per stage (DIR/<stage>.prof)")
+args = parser.parse_args()
+
+if args.list:
+    deps = stage_dependencies(STAGES)
+    for stage in select_stages(args.targets):
+        print(f"{stage.name:<24} <- {', '.join(deps[stage.name]) or '-'}")
+    raise SystemExit(0)
+
+
+# -------------------------
+# RUN
+# -------------------------
+def report(result):
+    icon = {"ran": "✅", "cached": "♻️ ", "failed": "❌", "skipped": "⏭️ "}[result["status"]]
+    print(f"{icon} {result['stage']:<24} {result['status']:<8} {result['seconds']:.2f}s")
+    if args.verbose or result["status"] == "failed":
+        print(result["log"])
+
+
+results = run_pipeline(args.targets, force=args.force, jobs=args.jobs, on_result=report,
+                       profile_dir=args.profile, profiler=args.profiler)
+
+summary = {status: sum(r["status"] == status for r in results)
+           for status in ("ran", "cached", "failed", "skipped")}
+print("\nSummary:", json.dumps(summary))
+
+if args.profile:
+    # Cached stages did not run; --force profiles every selected stage
+    print(f"📁 Timing report saved to {write_run_report(args.profile, results, args.profiler)}")
+
+if summary["failed"]:
+    raise SystemExit(1)
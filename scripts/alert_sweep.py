@@ -0,0 +1,159 @@
+"""Evaluate a whole grid of alert policies in one pass.
+
+A policy ``(threshold, persistence)`` alerts on a row when ``risk_score``
+has been >= ``threshold`` for the last ``persistence`` rows of the same
+patient. Rows are sorted once by (patient, time). For each persistence the
+trailing-window minimum is sorted once and suffix sums of ground-truth rows
+give TP / FP / alert counts for every threshold via ``searchsorted``; a
+per-patient running maximum (kept monotone across patients by offsetting
+ranks with the patient code) gives every patient's first-alert time for
+every threshold with one more ``searchsorted``. Patients are split into
+shards on a thread pool (NumPy sorts release the GIL) and counts are summed.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from scripts.profiling import profiled
+
+DEFAULT_THRESHOLDS = np.arange(0, 101, 1.0)
+DEFAULT_PERSISTENCE = [1, 2, 3, 5, 10, 20, 30]
+
+
+def sustained_min(score: np.ndarray, seg_start: np.ndarray, persistence: int) -> np.ndarray:
+    """Minimum over the last ``persistence`` rows of the same segment.
+
+    Windows that are not yet full (or cross a segment start) are -inf, and
+    NaN scores never count as above a threshold.
+    """
+    score = np.where(np.isnan(score), -np.inf, score)
+    if persistence == 1:
+        return score
+    out = np.full(len(score), -np.inf)
+    if len(score) >= persistence:
+        # Doubling: minima over windows of width 1, 2, 4, ... then two overlapping halves
+        block, width = score, 1
+        while 2 * width <= persistence:
+            block = np.minimum(block[:-width], block[width:])
+            width *= 2
+        shift = persistence - width
+        out[persistence - 1:] = np.minimum(block[:len(block) - shift], block[shift:])
+    out[np.arange(len(score)) - persistence + 1 < seg_start] = -np.inf
+    return out
+
+
+def _shard_counts(score, gt, times, code, thresholds, persistences) -> dict:
+    """Alert / TP counts and latency sums for the patients of one shard.
+
+    Rows are sorted by ``(code, time)``; ``code`` numbers the patients
+    0..k-1 within the shard.
+    """
+    n_rows = len(score)
+    n_patients = int(code[-1]) + 1
+    seg_first = np.flatnonzero(np.r_[True, code[1:] != code[:-1]])
+    seg_start = seg_first[code]
+    first_gt = np.minimum.reduceat(np.where(gt == 1, times, np.inf), seg_first)
+
+    total = {}
+    for p in persistences:
+        level = sustained_min(score, seg_start, p)
+
+        # Counts: rows with level >= t are a suffix of the ascending order
+        order = np.argsort(level)
+        level_asc = level[order]
+        tp_suffix = np.r_[np.cumsum(gt[order][::-1])[::-1], 0]
+        first_row = np.searchsorted(level_asc, thresholds, side="left")
+        alerts = n_rows - first_row
+        tp = tp_suffix[first_row]
+
+        # Latency: first row per patient whose running max level reaches t.
+        # Dense ranks come from the same sort; offsetting them by the patient
+        # code keeps the running max inside each patient and makes the key
+        # non-decreasing over the whole shard.
+        new_value = np.r_[True, level_asc[1:] != level_asc[:-1]]
+        rank = np.empty(n_rows, dtype=np.int64)
+        rank[order] = np.cumsum(new_value) - 1
+        n_ranks = int(rank.max()) + 2
+        threshold_rank = np.searchsorted(level_asc[new_value], thresholds, side="left")
+        key = np.maximum.accumulate(code * n_ranks + rank)
+        queries = np.arange(n_patients)[:, None] * n_ranks + threshold_rank
+        hit = np.minimum(np.searchsorted(key, queries, side="left"), n_rows - 1)
+        found = (key[hit] >= queries) & (code[hit] == np.arange(n_patients)[:, None])
+        # Patients without a ground-truth row have no latency (first_gt is inf)
+        found &= np.isfinite(first_gt)[:, None]
+        latency = np.where(found, times[hit] - first_gt[:, None], np.nan)
+        measured = ~np.isnan(latency)
+
+        total[p] = {
+            "alerts": alerts,
+            "tp": tp,
+            "latency_sum": np.where(measured, latency, 0.0).sum(axis=0),
+            "latency_n": measured.sum(axis=0),
+        }
+    return total
+
+
+@profiled("policy_sweep")
+def sweep_alert_policies(df: pd.DataFrame, thresholds=DEFAULT_THRESHOLDS,
+                         persistences=DEFAULT_PERSISTENCE, score_col="risk_score",
+                         gt_col="ground_truth", time_col="time_sec", group_col=None,
+                         workers=None) -> pd.DataFrame:
+    """One row of metrics per ``(persistence_rows, threshold)`` policy.
+
+    Metrics match ``evaluate_alert_quality.py``: precision / recall with a
+    1e-6 guard, false-alert rate = FP / rows, alert latency = first alert
+    minus first ground-truth row (averaged over patients that have both).
+    """
+    thresholds = np.asarray(thresholds, dtype=float)
+    persistences = list(persistences)
+
+    # Sort once by (patient, time) and number the patients
+    group = pd.factorize(df[group_col])[0] if group_col else np.zeros(len(df), dtype=np.int64)
+    order = np.lexsort((df[time_col].to_numpy(), group))
+    group = group[order]
+    score = df[score_col].to_numpy(dtype=float)[order]
+    gt = df[gt_col].to_numpy(dtype=np.int64)[order]
+    times = df[time_col].to_numpy(dtype=float)[order]
+
+    # Shards of whole patients, one per worker
+    n_groups = int(group.max()) + 1 if len(group) else 0
+    workers = max(min(workers or os.cpu_count() or 1, n_groups), 1)
+    bounds = np.searchsorted(group, np.linspace(0, n_groups, workers + 1).astype(int))
+    shards = [slice(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+    def run(rows):
+        code = group[rows] - group[rows][0]
+        return _shard_counts(score[rows], gt[rows], times[rows], code, thresholds, persistences)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        partials = list(pool.map(run, shards))
+
+    n_rows = len(df)
+    n_gt = int((df[gt_col] == 1).sum())
+    rows = []
+    for p in persistences:
+        alerts = sum(part[p]["alerts"] for part in partials)
+        tp = sum(part[p]["tp"] for part in partials)
+        latency_sum = sum(part[p]["latency_sum"] for part in partials)
+        latency_n = sum(part[p]["latency_n"] for part in partials)
+
+        fp = alerts - tp
+        fn = n_gt - tp
+        with np.errstate(invalid="ignore", divide="ignore"):
+            latency = np.where(latency_n > 0, latency_sum / latency_n, np.nan)
+        rows.append(pd.DataFrame({
+            "persistence_rows": p,
+            "threshold": thresholds,
+            "tp": tp,
+            "fp": fp,
+            "fn": fn,
+            "tn": n_rows - n_gt - fp,
+            "precision": tp / (tp + fp + 1e-6),
+            "recall": tp / (tp + fn + 1e-6),
+            "false_alert_rate": fp / n_rows,
+            "alert_rate": alerts / n_rows,
+            "alert_latency_sec": latency,
+        }))
+    return pd.concat(rows, ignore_index=True)
@@ -0,0 +1,151 @@
+"""Motion-artifact suppression for HR spikes and SpO2 false drops.
+
+Short sensor gaps are filled first. A rolling median baseline is then
+computed, and samples taken during high motion that jump away from it are
+replaced by the baseline. Two variants:
+
+* retrospective (``causal=False``): linear interpolation and a centered
+  window, as used by the offline pipeline stage;
+* causal: gaps are held at the last value and the baseline is a trailing
+  window, so each output only depends on past samples.
+
+``ArtifactFilter`` is the causal variant sample by sample (for live
+streams); ``clean_vitals(df, causal=True)`` is the same filter vectorized
+and gives identical results.
+"""
+from bisect import bisect_left, insort
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from scripts.profiling import profiled
+
+MOTION_THRESHOLD = 0.7
+SPO2_DROP_THRESHOLD = 3          # %
+HR_SPIKE_THRESHOLD = 15          # bpm
+ROLLING_WINDOW = 5               # seconds
+GAP_LIMIT = 5                    # longest run of missing samples to fill
+
+GAP_COLUMNS = ["heart_rate_bpm", "spo2_percent", "bp_systolic", "bp_diastolic"]
+
+
+# =========================================================
+# BATCH
+# =========================================================
+def artifact_masks(df: pd.DataFrame, hr_baseline, spo2_baseline) -> tuple:
+    """``(hr_spike_mask, spo2_artifact_mask)`` against the given baselines."""
+    high_motion = df["motion"] > MOTION_THRESHOLD
+    hr_spike_mask = high_motion & ((df["heart_rate_bpm"] - hr_baseline).abs() > HR_SPIKE_THRESHOLD)
+    spo2_artifact_mask = high_motion & ((spo2_baseline - df["spo2_percent"]) > SPO2_DROP_THRESHOLD)
+    return hr_spike_mask, spo2_artifact_mask
+
+
+@profiled("cleaning")
+def clean_vitals(df: pd.DataFrame, causal: bool = False) -> pd.DataFrame:
+    """Gap filling plus HR spike / SpO2 drop suppression on one recording."""
+    df = df.copy()
+    for col in GAP_COLUMNS:
+        if causal:
+            df[col] = df[col].ffill(limit=GAP_LIMIT)
+        else:
+            df[col] = df[col].interpolate(limit=GAP_LIMIT)
+
+    hr_baseline = df["heart_rate_bpm"].rolling(ROLLING_WINDOW, center=not causal).median()
+    spo2_baseline = df["spo2_percent"].rolling(ROLLING_WINDOW, center=not causal).median()
+    hr_spike_mask, spo2_artifact_mask = artifact_masks(df, hr_baseline, spo2_baseline)
+
+    df.loc[hr_spike_mask, "heart_rate_bpm"] = hr_baseline[hr_spike_mask]
+    df.loc[spo2_artifact_mask, "spo2_percent"] = spo2_baseline[spo2_artifact_mask]
+    return df
+
+
+# =========================================================
+# STREAMING (causal)
+# =========================================================
+class SlidingMedian:
+    """Median of the last ``window`` values, updated in O(window) per sample.
+
+    Keeps the window both in arrival order (to evict) and sorted (to read
+    the median). Like ``rolling(window).median()``, the median is NaN until
+    the window is full or while it contains a NaN.
+    """
+
+    def __init__(self, window: int = ROLLING_WINDOW):
+        self.window = window
+        self._order = deque()
+        self._sorted = []
+        self._nans = 0
+
+    def update(self, value: float) -> float:
+        if len(self._order) == self.window:
+            old = self._order.popleft()
+            if np.isnan(old):
+                self._nans -= 1
+            else:
+                del self._sorted[bisect_left(self._sorted, old)]
+
+        self._order.append(value)
+        if np.isnan(value):
+            self._nans += 1
+        else:
+            insort(self._sorted, value)
+        return self.median
+
+    @property
+    def median(self) -> float:
+        if len(self._order) < self.window or self._nans:
+            return np.nan
+        mid = len(self._sorted) // 2
+        if len(self._sorted) % 2:
+            return self._sorted[mid]
+        return (self._sorted[mid - 1] + self._sorted[mid]) / 2
+
+
+class GapHold:
+    """Carries the last valid value over at most ``limit`` missing samples."""
+
+    def __init__(self, limit: int = GAP_LIMIT):
+        self.limit = limit
+        self._last = np.nan
+        self._missing = 0
+
+    def update(self, value: float) -> float:
+        if not np.isnan(value):
+            self._last, self._missing = value, 0
+            return value
+        self._missing += 1
+        return self._last if self._missing <= self.limit else np.nan
+
+
+class ArtifactFilter:
+    """Causal, per-sample artifact suppression for one live recording."""
+
+    def __init__(self, window: int = ROLLING_WINDOW, gap_limit: int = GAP_LIMIT):
+        self.gaps = {col: GapHold(gap_limit) for col in GAP_COLUMNS}
+        self.hr_median = SlidingMedian(window)
+        self.spo2_median = SlidingMedian(window)
+
+    def update(self, sample: dict) -> dict:
+        """Clean one sample; returns a copy with the vitals replaced.
+
+        Missing keys are treated as NaN. ``hr_artifact`` / ``spo2_artifact``
+        flag which values were replaced by the baseline.
+        """
+        out = dict(sample)
+        for col, gap in self.gaps.items():
+            out[col] = gap.update(float(sample.get(col, np.nan)))
+
+        hr, spo2 = out["heart_rate_bpm"], out["spo2_percent"]
+        hr_baseline = self.hr_median.update(hr)
+        spo2_baseline = self.spo2_median.update(spo2)
+        # NaN comparisons are False, as in the batch masks
+        high_motion = float(sample.get("motion", np.nan)) > MOTION_THRESHOLD
+
+        out["hr_artifact"] = bool(high_motion and abs(hr - hr_baseline) > HR_SPIKE_THRESHOLD)
+        out["spo2_artifact"] = bool(high_motion and (spo2_baseline - spo2) > SPO2_DROP_THRESHOLD)
+        if out["hr_artifact"]:
+            out["heart_rate_bpm"] = hr_baseline
+        if out["spo2_artifact"]:
+            out["spo2_percent"] = spo2_baseline
+        return out
@@ -0,0 +1,132 @@
+"""Streaming feature-drift monitor.
+
+Consumes live samples or table chunks, keeps running moments and fixed-bin
+histograms per feature (bounded memory), and reports mean shift, PSI and a
+binned KS statistic against the training reference at any point.
+"""
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+
+from scripts.running_stats import FixedHistogram, RunningMoments, ks_binned, psi
+
+Z_THRESHOLD = 2.5        # |mean shift| in training standard deviations
+PSI_THRESHOLD = 0.2      # common "significant shift" cut-off
+KS_THRESHOLD = 0.1
+REFERENCE_BINS = 20
+
+
+def normal_reference(mean: float, std: float, bins: int = REFERENCE_BINS):
+    """Bin edges and probabilities assuming a normal reference distribution.
+
+    Used when training stats only carry mean/std (no stored histogram).
+    """
+    if not std > 0:
+        edges = np.linspace(mean - 0.5, mean + 0.5, bins + 1)
+        probs = np.zeros(bins + 2)
+        probs[np.searchsorted(edges, mean, side="right")] = 1.0
+        return edges, probs
+
+    edges = np.linspace(mean - 4 * std, mean + 4 * std, bins + 1)
+    cdf = np.concatenate(([0.0], ndtr((edges - mean) / std), [1.0]))
+    return edges, np.diff(cdf)
+
+
+class DriftMonitor:
+    """Incremental drift statistics for a fixed list of features."""
+
+    def __init__(self, features, ref_mean, ref_std, ref_edges, ref_probs, ref_kind=None):
+        self.features = list(features)
+        # "histogram" (stored at training time) or "normal" (approximated)
+        self.ref_kind = list(ref_kind or ["histogram"] * len(self.features))
+        self.ref_mean = np.asarray(ref_mean, dtype=float)
+        self.ref_std = np.asarray(ref_std, dtype=float)
+        self.ref_probs = [np.asarray(p, dtype=float) for p in ref_probs]
+        self.moments = RunningMoments(len(self.features))
+        self.histogram = FixedHistogram(ref_edges)
+
+    @classmethod
+    def from_training_stats(cls, stats: dict, features=None) -> "DriftMonitor":
+        """Build from ``training_stats.json`` content.
+
+        Stored histograms are used when present; otherwise the reference is
+        approximated as normal from the stored mean/std.
+        """
+        features = [f for f in (features or stats["mean"]) if f in stats["mean"]]
+        histograms = stats.get("histograms", {})
+
+        edges, probs, kinds = [], [], []
+        for col in features:
+            if col in histograms:
+                counts = np.asarray(histograms[col]["counts"], dtype=float)
+                edges.append(histograms[col]["edges"])
+                probs.append(counts / max(counts.sum(), 1.0))
+                kinds.append("histogram")
+            else:
+                e, p = normal_reference(stats["mean"][col], stats["std"][col])
+                edges.append(e)
+                probs.append(p)
+                kinds.append("normal")
+
+        return cls(
+            features,
+            [stats["mean"][c] for c in features],
+            [stats["std"][c] for c in features],
+            edges,
+            probs,
+            kinds,
+        )
+
+    def update(self, data) -> "DriftMonitor":
+        """Add a chunk (DataFrame / 2-D array) or one sample (dict / 1-D array)."""
+        if isinstance(data, pd.DataFrame):
+            values = data.reindex(columns=self.features).to_numpy(dtype=float)
+        elif isinstance(data, dict):
+            values = np.array([[data.get(c, np.nan) for c in self.features]], dtype=float)
+        else:
+            values = np.atleast_2d(np.asarray(data, dtype=float))
+
+        self.moments.update(values)
+        self.histogram.update(values)
+        return self
+
+    def report(self, z_threshold=Z_THRESHOLD, psi_threshold=PSI_THRESHOLD,
+               ks_threshold=KS_THRESHOLD) -> dict:
+        """Per-feature drift statistics for everything seen so far."""
+        mean, std = self.moments.mean, self.moments.std
+        report = {}
+        for j, col in enumerate(self.features):
+            n = int(self.moments.count[j])
+            if n == 0:
+                continue
+            actual = self.histogram.probabilities(j)
+            z_score = abs((mean[j] - self.ref_mean[j]) / (self.ref_std[j] + 1e-8))
+            col_psi = psi(self.ref_probs[j], actual)
+            col_ks = ks_binned(self.ref_probs[j], actual)
+
+            reasons = []
+            if z_score > z_threshold:
+                reasons.append("mean_shift")
+            if col_psi > psi_threshold:
+                reasons.append("psi")
+            if col_ks > ks_threshold:
+                reasons.append("ks")
+
+            report[col] = {
+                "n": n,
+                "mean": float(mean[j]),
+                "std": float(std[j]),
+                "ref_mean": float(self.ref_mean[j]),
+                "ref_std": float(self.ref_std[j]),
+                "z_score": float(z_score),
+                "std_ratio": float(std[j] / (self.ref_std[j] + 1e-8)),
+                "psi": col_psi,
+                "ks": col_ks,
+                "reference": self.ref_kind[j],
+                "drift": bool(reasons),
+                "reasons": reasons,
+            }
+        return report
+
+    def drifted(self, **thresholds) -> list:
+        return [col for col, r in self.report(**thresholds).items() if r["drift"]]
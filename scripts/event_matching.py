@@ -0,0 +1,92 @@
+"""Pair ground-truth onsets with alerts using sorted time arrays.
+
+``failure_analysis.py`` used to scan the whole frame for every onset (once
+for the first later alert, once for an alert inside the response window),
+which is O(onsets x rows). Here alert times are sorted once per recording
+(``group_col``, e.g. ``patient_id``, for fleet history) and every onset
+finds its next alert with one ``searchsorted``, so matching is
+O(rows log rows) overall.
+"""
+import numpy as np
+import pandas as pd
+
+from scripts.profiling import profiled
+
+
+def event_starts(flag, groups=None) -> np.ndarray:
+    """Rows where ``flag`` goes 0 -> 1 (the first row of a recording never counts)."""
+    flag = np.asarray(flag)
+    starts = np.zeros(len(flag), dtype=bool)
+    starts[1:] = (flag[1:] == 1) & (flag[:-1] == 0)
+    if groups is not None:
+        groups = np.asarray(groups)
+        starts[1:] &= groups[1:] == groups[:-1]
+    return starts
+
+
+def next_alert_time(times, alert, onset_rows, groups=None) -> np.ndarray:
+    """Time of the first alert strictly after each onset (NaN if none).
+
+    ``times`` / ``alert`` / ``groups`` are per-row arrays; ``onset_rows`` are
+    positional indices. Alerts are only matched within the onset's group.
+    """
+    times = np.asarray(times, dtype=float)
+    alert_rows = np.flatnonzero(np.asarray(alert) == 1)
+    onset_rows = np.asarray(onset_rows, dtype=np.intp)
+
+    # Exact integer key ordering rows by (group, time): group code * n + time rank
+    _, time_rank = np.unique(times, return_inverse=True)
+    if groups is None:
+        group_code = np.zeros(len(times), dtype=np.int64)
+    else:
+        _, group_code = np.unique(np.asarray(groups), return_inverse=True)
+    key = group_code.astype(np.int64) * (len(times) + 1) + time_rank
+
+    order = np.argsort(key[alert_rows], kind="stable")
+    alert_keys = key[alert_rows][order]
+    alert_times = times[alert_rows][order]
+    alert_groups = group_code[alert_rows][order]
+
+    pos = np.searchsorted(alert_keys, key[onset_rows], side="right")
+    found = pos < len(alert_keys)
+    found[found] = alert_groups[pos[found]] == group_code[onset_rows][found]
+
+    result = np.full(len(onset_rows), np.nan)
+    result[found] = alert_times[pos[found]]
+    return result
+
+
+def _event_table(df: pd.DataFrame, rows) -> pd.DataFrame:
+    # Same layout as a frame built from the matching rows (empty: no columns)
+    return df.iloc[rows].copy() if len(rows) else pd.DataFrame()
+
+
+@profiled("event_matching")
+def match_onsets(df: pd.DataFrame, max_delay: float, onset_col="gt_start",
+                 alert_col="predicted_alert", time_col="time_sec", group_col=None) -> tuple:
+    """``(late_alerts, false_negatives)`` onset tables.
+
+    Late alerts: the first later alert arrives more than ``max_delay``
+    seconds after the onset (``alert_latency_sec`` added). False negatives:
+    no alert within ``(onset, onset + max_delay]``.
+    """
+    groups = df[group_col].to_numpy() if group_col else None
+    onset_rows = np.flatnonzero(df[onset_col].to_numpy())
+    onset_times = df[time_col].to_numpy()[onset_rows]
+
+    next_time = next_alert_time(df[time_col].to_numpy(), df[alert_col].to_numpy(), onset_rows, groups)
+    latency = next_time - onset_times
+
+    has_alert = ~np.isnan(next_time)
+    late = has_alert & (latency > max_delay)
+    missed = ~(has_alert & (latency <= max_delay))
+
+    late_df = _event_table(df, onset_rows[late])
+    if len(late_df):
+        latency = latency[late]
+        # Integer clocks give integer latencies, as before
+        if np.issubdtype(df[time_col].dtype, np.integer):
+            latency = latency.astype(df[time_col].dtype)
+        late_df["alert_latency_sec"] = latency
+
+    return late_df, _event_table(df, onset_rows[missed])
@@ -0,0 +1,131 @@
+"""Vectorized synthetic vitals for a fleet of patients.
+
+Same physiology as ``coding_scripts/generate_vitals.py`` (normal → distress
+→ recovery thirds, vehicle bumps, motion artifacts, sensor dropout), but for
+any number of patients and any transport duration. Each patient draws from
+its own ``np.random.Generator`` seeded from ``(seed, patient_id)``, so output
+does not depend on how patients are split across chunks or workers.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from scripts.storage import part_path, write_table
+
+SAMPLING_RATE_HZ = 1  # 1 value per second
+
+BUMP_FIRST_SEC = 300
+BUMP_EVERY_SEC = 180
+BUMP_LENGTH_SEC = 5
+
+# 40 dropouts per 30 minutes in the single-patient generator
+DROPOUT_RATE = 40 / (30 * 60)
+
+
+def patient_rng(seed: int, patient_id: int) -> np.random.Generator:
+    """Independent, reproducible stream for one patient."""
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(patient_id,)))
+
+
+def _phase_signal(rng, n_normal, n_distress, n_recovery, normal, distress, recovery):
+    """Concatenate normal noise, distress ramp and recovery ramp segments."""
+    return np.concatenate([
+        rng.normal(normal[0], normal[1], n_normal),
+        np.linspace(distress[0], distress[1], n_distress) + rng.normal(0, distress[2], n_distress),
+        np.linspace(recovery[0], recovery[1], n_recovery) + rng.normal(0, recovery[2], n_recovery),
+    ])
+
+
+def generate_patient(patient_id: int, duration_sec: int, seed: int = 42) -> pd.DataFrame:
+    """One patient's 1 Hz vitals over ``duration_sec`` seconds."""
+    rng = patient_rng(seed, patient_id)
+    total = int(duration_sec * SAMPLING_RATE_HZ)
+
+    distress_start = total // 3
+    distress_end = 2 * total // 3
+    n_normal = distress_start
+    n_distress = distress_end - distress_start
+    n_recovery = total - distress_end
+
+    # MOTION SIGNAL (vehicle + patient)
+    motion = rng.normal(0.2, 0.05, total)
+
+    bump_starts = np.arange(BUMP_FIRST_SEC, total, BUMP_EVERY_SEC)
+    bump_idx = (bump_starts[:, None] + np.arange(BUMP_LENGTH_SEC)).ravel()
+    bump_amp = np.repeat(rng.uniform(0.6, 1.0, len(bump_starts)), BUMP_LENGTH_SEC)
+    in_range = bump_idx < total
+    motion[bump_idx[in_range]] += bump_amp[in_range]
+
+    motion[distress_start:distress_end] += rng.normal(0.3, 0.1, n_distress)
+    motion = np.clip(motion, 0, None)
+
+    # HEART RATE (bpm) + motion-induced spikes
+    hr = _phase_signal(rng, n_normal, n_distress, n_recovery,
+                       (75, 3), (85, 120, 4), (100, 80, 3))
+    hr += motion * rng.uniform(5, 10)
+
+    # SpO2 (%) + motion-induced false drops
+    spo2 = _phase_signal(rng, n_normal, n_distress, n_recovery,
+                         (98, 0.5), (96, 90, 0.7), (92, 97, 0.5))
+    spo2[motion > 0.7] -= rng.uniform(3, 8)
+    spo2 = np.clip(spo2, 75, 100)
+
+    # BLOOD PRESSURE (mmHg)
+    sys_bp = _phase_signal(rng, n_normal, n_distress, n_recovery,
+                           (120, 5), (125, 95, 6), (100, 118, 4))
+    dia_bp = _phase_signal(rng, n_normal, n_distress, n_recovery,
+                           (80, 4), (85, 60, 5), (65, 78, 3))
+
+    # MISSING DATA (sensor dropout)
+    n_dropout = min(int(round(total * DROPOUT_RATE)), total)
+    dropout = rng.choice(total, size=n_dropout, replace=False)
+    for signal in (hr, spo2, sys_bp, dia_bp):
+        signal[dropout] = np.nan
+
+    return pd.DataFrame({
+        "patient_id": np.full(total, patient_id, dtype=np.int32),
+        "time_sec": np.arange(total),
+        "heart_rate_bpm": hr,
+        "spo2_percent": spo2,
+        "bp_systolic": sys_bp,
+        "bp_diastolic": dia_bp,
+        "motion": motion
+    })
+
+
+def generate_chunk(chunk_index: int, patient_ids, duration_sec: int, seed: int, out_dir) -> str:
+    """Generate a block of patients and write it as one part file."""
+    df = pd.concat(
+        [generate_patient(pid, duration_sec, seed) for pid in patient_ids],
+        ignore_index=True
+    )
+    return str(write_table(df, part_path(out_dir, chunk_index)))
+
+
+def generate_fleet(n_patients: int, duration_sec: int, out_dir, seed: int = 42,
+                   patients_per_chunk: int = 50, workers=None) -> list:
+    """Write ``n_patients`` patients as chunked part files, in parallel.
+
+    Chunk boundaries depend only on ``patients_per_chunk``, and each patient
+    has its own stream, so the files are identical for any ``workers``.
+    """
+    # Drop parts from a previous, possibly larger, run
+    for old in Path(out_dir).glob("part-*"):
+        old.unlink()
+
+    chunks = [
+        range(start, min(start + patients_per_chunk, n_patients))
+        for start in range(0, n_patients, patients_per_chunk)
+    ]
+
+    if workers == 1:
+        return [generate_chunk(i, ids, duration_sec, seed, out_dir) for i, ids in enumerate(chunks)]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(generate_chunk, i, ids, duration_sec, seed, out_dir)
+            for i, ids in enumerate(chunks)
+        ]
+        return [f.result() for f in futures]
@@ -0,0 +1,30 @@
+"""Content digests and the project cache directory.
+
+Shared by the pipeline runner (stage cache keys, object store) and other
+on-disk caches such as the tuning score cache, without importing the DAG.
+"""
+import hashlib
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+CACHE_DIR = BASE_DIR / ".pipeline_cache"
+
+HASH_CHUNK = 1 << 20
+
+
+def file_digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def tree_digest(root: Path) -> str:
+    """One digest over every file under ``root`` (relative names and contents)."""
+    root = Path(root)
+    h = hashlib.sha256()
+    for path in sorted(p for p in root.rglob("*") if p.is_file()):
+        h.update(path.relative_to(root).as_posix().encode())
+        h.update(file_digest(path).encode())
+    return h.hexdigest()
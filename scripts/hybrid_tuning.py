@@ -0,0 +1,271 @@
+"""Search hybrid weights, thresholds and persistence on cached model scores.
+
+The IF and PCA scores only depend on the fitted models and the feature
+table, so they are computed once per (model version, features file) and
+cached; every candidate policy is then pure array work on the normalized
+scores:
+
+    hybrid   = w * if_norm + (1 - w) * pca_norm
+    rolling  = w * rolling(if_norm) + (1 - w) * rolling(pca_norm)
+
+Rolling means are linear, so each persistence rolls the two normalized
+score columns once and every weight reuses them. For one (persistence,
+weight) pair the rows are sorted by score once and cumulative counts give
+TP / FP for every threshold with one ``searchsorted`` (as in
+``alert_sweep.py``). (persistence, weights) tasks run on a process pool.
+
+Two alerts are tuned, with the decision rules of the pipeline:
+
+* ``hybrid_anomaly``: ``hybrid >= risk_threshold`` (``if_weight``,
+  ``risk_threshold``).
+* ``final_alert``: rolling hybrid >= ``high_risk_threshold`` with rule
+  confirmation (``if_weight``, ``persist_seconds``, ``high_risk_threshold``;
+  ``critical_risk_threshold`` only splits HIGH from CRITICAL and is scored
+  by ``critical_precision``).
+
+Ground truth is the physiology-based label of ``evaluate_alert_quality.py``.
+"""
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from scripts.hashing import CACHE_DIR, file_digest
+from scripts.hybrid_validation import persistent_risk
+from scripts.model_artifacts import hybrid_raw_scores, normalize_scores
+from scripts.rule_engine import apply_rules
+from scripts.storage import find_table, read_table
+
+SCORE_CACHE_DIR = CACHE_DIR / "tuning"
+
+# Default grid (weights of IF; PCA gets the rest)
+SEARCH_SPACE = {
+    "if_weight": np.round(np.arange(0.0, 1.0001, 0.05), 2),
+    "risk_threshold": np.round(np.arange(0.3, 0.9001, 0.05), 2),
+    "persist_seconds": [1, 5, 10, 20, 30, 60],
+    "high_risk_threshold": np.round(np.arange(0.3, 0.9001, 0.05), 2),
+    "critical_risk_threshold": np.round(np.arange(0.3, 0.9001, 0.05), 2),
+}
+
+WEIGHTS_PER_TASK = 4
+
+_DATA = None  # per-worker tuning frame (set by _init_worker)
+_GROUP_COL = None
+_ROLLED = {}  # per-worker rolling means of the last persistence seen
+
+
+# =========================================================
+# SCORE CACHE
+# =========================================================
+def ground_truth(df: pd.DataFrame) -> np.ndarray:
+    """Clinically meaningful deterioration (HR > 100 or SpO2 < 94)."""
+    return ((df["heart_rate_bpm"] > 100) | (df["spo2_percent"] < 94)).to_numpy(dtype=np.int64)
+
+
+def cached_raw_scores(artifacts, features_path, df: pd.DataFrame) -> tuple:
+    """``(if_score, pca_error)`` for ``df``, cached per model version and features file."""
+    digest = file_digest(find_table(features_path))[:16]
+    cache = Path(SCORE_CACHE_DIR) / f"{artifacts.version}-{digest}.npz"
+    if cache.exists():
+        with np.load(cache) as saved:
+            return saved["if_score"], saved["pca_error"]
+
+    if_score, pca_error = hybrid_raw_scores(artifacts, df[artifacts.feature_cols].to_numpy(dtype=float))
+    cache.parent.mkdir(parents=True, exist_ok=True)
+    np.savez(cache, if_score=if_score, pca_error=pca_error)
+    return if_score, pca_error
+
+
+def load_tuning_frame(artifacts, features_path, group_col="patient_id") -> pd.DataFrame:
+    """Normalized scores, rule level and ground truth for every feature row."""
+    df = read_table(features_path)
+    group_col = group_col if group_col in df.columns else None
+
+    if_score, pca_error = cached_raw_scores(artifacts, features_path, df)
+    if_norm, pca_norm, _ = normalize_scores(artifacts.manifest, if_score, pca_error)
+
+    frame = pd.DataFrame({
+        "if_norm": if_norm,
+        "pca_norm": pca_norm,
+        "rule_level": apply_rules(df, group_col)["anomaly_level"].to_numpy(),
+        "ground_truth": ground_truth(df),
+    })
+    if group_col:
+        frame[group_col] = df[group_col].to_numpy()
+    return frame
+
+
+# =========================================================
+# CANDIDATES
+# =========================================================
+def grid_candidates(space=SEARCH_SPACE) -> tuple:
+    """``(hybrid_candidates, final_candidates)`` frames for the full grid."""
+    hybrid = pd.DataFrame(
+        list(itertools.product(space["if_weight"], space["risk_threshold"])),
+        columns=["if_weight", "risk_threshold"],
+    )
+    final = pd.DataFrame(
+        [
+            (w, p, high, crit)
+            for w, p, high, crit in itertools.product(
+                space["if_weight"], space["persist_seconds"],
+                space["high_risk_threshold"], space["critical_risk_threshold"],
+            )
+            if crit >= high
+        ],
+        columns=["if_weight", "persist_seconds", "high_risk_threshold", "critical_risk_threshold"],
+    )
+    return hybrid, final
+
+
+def random_candidates(n: int, space=SEARCH_SPACE, seed=42) -> tuple:
+    """``n`` random settings of each alert, drawn within the grid's ranges."""
+    rng = np.random.default_rng(seed)
+
+    def uniform(name):
+        return rng.uniform(min(space[name]), max(space[name]), n)
+
+    hybrid = pd.DataFrame({"if_weight": uniform("if_weight"), "risk_threshold": uniform("risk_threshold")})
+    high = uniform("high_risk_threshold")
+    final = pd.DataFrame({
+        "if_weight": uniform("if_weight"),
+        "persist_seconds": rng.choice(space["persist_seconds"], n),
+        "high_risk_threshold": high,
+        # CRITICAL is a subset of HIGH: keep critical >= high
+        "critical_risk_threshold": rng.uniform(high, max(space["critical_risk_threshold"])),
+    })
+    return hybrid, final
+
+
+# =========================================================
+# EVALUATION
+# =========================================================
+def counts_at(score: np.ndarray, truth: np.ndarray, thresholds) -> tuple:
+    """``(alerts, tp)`` of ``score >= t`` for every threshold ``t``."""
+    order = np.argsort(score)
+    score_asc = score[order]
+    tp_suffix = np.r_[np.cumsum(truth[order][::-1])[::-1], 0]
+    first_row = np.searchsorted(score_asc, np.asarray(thresholds, dtype=float), side="left")
+    return len(score) - first_row, tp_suffix[first_row]
+
+
+def _init_worker(frame: pd.DataFrame, group_col):
+    global _DATA, _GROUP_COL
+    _DATA, _GROUP_COL = frame, group_col
+    _ROLLED.clear()
+
+
+def _rolled(persist_seconds: int) -> tuple:
+    if persist_seconds not in _ROLLED:
+        _ROLLED.clear()
+        _ROLLED[persist_seconds] = tuple(
+            persistent_risk(_DATA, _GROUP_COL, persist_seconds, col=col)
+            for col in ("if_norm", "pca_norm")
+        )
+    return _ROLLED[persist_seconds]
+
+
+def _evaluate(task) -> list:
+    """Counts for one task: ``(kind, persist_seconds, [(weight, candidates), ...])``."""
+    kind, persist_seconds, batches = task
+    truth = _DATA["ground_truth"].to_numpy()
+    rule_level = _DATA["rule_level"].to_numpy()
+
+    results = []
+    for weight, candidates in batches:
+        if kind == "hybrid_anomaly":
+            score = weight * _DATA["if_norm"].to_numpy() + (1 - weight) * _DATA["pca_norm"].to_numpy()
+            alerts, tp = counts_at(score, truth, candidates["risk_threshold"])
+            out = {"alerts": alerts, "tp": tp}
+        else:
+            if_avg, pca_avg = _rolled(persist_seconds)
+            avg_risk = weight * if_avg + (1 - weight) * pca_avg
+            # HIGH or CRITICAL needs rule confirmation (level >= 1)
+            confirmed = rule_level >= 1
+            alerts, tp = counts_at(avg_risk[confirmed], truth[confirmed], candidates["high_risk_threshold"])
+            critical = rule_level >= 2
+            critical_alerts, critical_tp = counts_at(
+                avg_risk[critical], truth[critical], candidates["critical_risk_threshold"]
+            )
+            out = {"alerts": alerts, "tp": tp,
+                   "critical_alerts": critical_alerts, "critical_tp": critical_tp}
+        results.append((candidates.index.to_numpy(), out))
+    return results
+
+
+def _tasks(kind: str, candidates: pd.DataFrame) -> list:
+    keys = ["if_weight"] if kind == "hybrid_anomaly" else ["persist_seconds", "if_weight"]
+    tasks = []
+    for key, group in candidates.groupby(keys[0], sort=True):
+        if kind == "hybrid_anomaly":
+            batches = [(key, group)]
+            persist_seconds = None
+        else:
+            # One task per persistence chunk: workers roll each persistence once
+            persist_seconds = int(key)
+            batches = list(group.groupby("if_weight", sort=True))
+        for start in range(0, len(batches), WEIGHTS_PER_TASK):
+            tasks.append((kind, persist_seconds, batches[start:start + WEIGHTS_PER_TASK]))
+    return tasks
+
+
+def _metrics(candidates: pd.DataFrame, counts: dict, n_rows: int, n_truth: int) -> pd.DataFrame:
+    out = candidates.copy()
+    out.insert(1, "pca_weight", (1 - out["if_weight"]).round(10))
+    for name, values in counts.items():
+        out[name] = values
+    tp, fp = out["tp"], out["alerts"] - out["tp"]
+    out["fp"] = fp
+    out["fn"] = n_truth - tp
+    out["precision"] = tp / (tp + fp + 1e-6)
+    out["recall"] = tp / (n_truth + 1e-6)
+    out["false_alert_rate"] = fp / n_rows
+    if "critical_tp" in out:
+        out["critical_precision"] = out["critical_tp"] / (out["critical_alerts"] + 1e-6)
+    return out
+
+
+def _collect(candidates: dict, tasks: list, results) -> dict:
+    """Per-kind count arrays (one slot per candidate) from the task results."""
+    collected = {kind: {} for kind in candidates}
+    for (kind, _, _), task_results in zip(tasks, results):
+        for rows, out in task_results:
+            for name, values in out.items():
+                collected[kind].setdefault(name, np.zeros(len(candidates[kind]), dtype=np.int64))[rows] = values
+    return collected
+
+
+def evaluate_candidates(frame: pd.DataFrame, hybrid: pd.DataFrame, final: pd.DataFrame,
+                        group_col="patient_id", workers=None) -> dict:
+    """Metrics for every candidate: ``{"hybrid_anomaly": df, "final_alert": df}``."""
+    group_col = group_col if group_col in frame.columns else None
+    workers = workers or os.cpu_count() or 1
+    candidates = {
+        "hybrid_anomaly": hybrid.reset_index(drop=True),
+        "final_alert": final.reset_index(drop=True),
+    }
+    tasks = [task for kind, cands in candidates.items() for task in _tasks(kind, cands)]
+
+    if workers == 1:
+        _init_worker(frame, group_col)
+        collected = _collect(candidates, tasks, map(_evaluate, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(frame, group_col)) as pool:
+            collected = _collect(candidates, tasks, pool.map(_evaluate, tasks))
+
+    n_rows, n_truth = len(frame), int(frame["ground_truth"].sum())
+    return {
+        kind: _metrics(candidates[kind], collected[kind], n_rows, n_truth)
+        for kind in candidates
+    }
+
+
+def pareto_front(results: pd.DataFrame, x="false_alert_rate", y="recall") -> pd.DataFrame:
+    """Settings not dominated on (lower ``x``, higher ``y``), sorted by ``x``."""
+    ordered = results.sort_values([x, y], ascending=[True, False], kind="stable")
+    best_before = ordered[y].cummax().shift(fill_value=-np.inf)
+    return ordered[ordered[y] > best_before]
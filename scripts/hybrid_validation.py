@@ -0,0 +1,80 @@
+"""Vectorized hybrid IF+PCA validation gate with rule-based confirmation.
+
+Mirrors the original per-row loop in
+``coding_scripts/hybrid_validation_with_rules.py``: the persistence buffer
+is a trailing rolling mean and the decision table is a single ``np.select``.
+"""
+import numpy as np
+import pandas as pd
+
+# -----------------------------
+# PARAMETERS
+# -----------------------------
+HIGH_RISK_THRESHOLD = 0.6      # hybrid risk
+CRITICAL_RISK_THRESHOLD = 0.8
+PERSIST_SECONDS = 10           # alert persistence
+
+ALERT_LEVELS = ["normal", "SUPPRESSED", "HIGH", "CRITICAL"]
+ALERT_REASONS = [
+    "No sustained risk detected",
+    "Hybrid risk without physiological confirmation",
+    "Hybrid elevated risk + early physiological confirmation",
+    "Hybrid high risk + rule-confirmed deterioration",
+]
+
+
+def persistent_risk(df: pd.DataFrame, group_col="patient_id", persist_seconds=PERSIST_SECONDS,
+                    col="hybrid_risk_score") -> np.ndarray:
+    """Mean of ``col`` over the last ``persist_seconds`` rows (fewer at start).
+
+    NaN wherever the window holds a missing score, like ``np.mean`` over the
+    baseline's row buffer (pandas' rolling mean would skip it).
+    """
+    risk = df[col].astype(float)
+    # "missing" rolls to the share of missing scores in each window
+    frame = pd.DataFrame({"avg": risk, "missing": risk.isna().astype(float)}, index=df.index)
+    if group_col is not None and group_col in df.columns:
+        rolled = (
+            frame.groupby(df[group_col], sort=False)
+            .rolling(persist_seconds, min_periods=1)
+            .mean()
+            .reset_index(level=0, drop=True)
+            .reindex(df.index)
+        )
+    else:
+        rolled = frame.rolling(persist_seconds, min_periods=1).mean()
+    return rolled["avg"].mask(rolled["missing"] > 0).to_numpy()
+
+
+def validate_alerts(hybrid_df: pd.DataFrame, rule_level, group_col="patient_id",
+                    high_risk_threshold=HIGH_RISK_THRESHOLD,
+                    critical_risk_threshold=CRITICAL_RISK_THRESHOLD,
+                    persist_seconds=PERSIST_SECONDS) -> pd.DataFrame:
+    """Add ``final_alert``, ``alert_level`` and ``alert_reason`` columns.
+
+    ``rule_level`` is the rule engine's ``anomaly_level``, aligned by row
+    position with ``hybrid_df``. Thresholds default to the module
+    parameters (see ``tune_hybrid.py`` for searching them).
+    """
+    df = hybrid_df.copy()
+    avg_risk = persistent_risk(df, group_col, persist_seconds)
+    rule_level = np.asarray(rule_level)
+
+    # -------------------------
+    # DECISION LOGIC (first matching row wins)
+    # -------------------------
+    decision = np.select(
+        [
+            (avg_risk >= critical_risk_threshold) & (rule_level >= 2),
+            (avg_risk >= high_risk_threshold) & (rule_level >= 1),
+            (avg_risk >= high_risk_threshold) & (rule_level == 0),
+        ],
+        [3, 2, 1],
+        default=0,
+    )
+
+    df["final_alert"] = (decision >= 2).astype(np.int64)
+    df["alert_level"] = pd.Categorical.from_codes(decision, categories=ALERT_LEVELS)
+    df["alert_reason"] = pd.Categorical.from_codes(decision, categories=ALERT_REASONS)
+
+    return df
@@ -0,0 +1,102 @@
+"""Inference-only Isolation Forest scorer over flattened trees.
+
+``IsolationForest.score_samples`` validates its input and calls
+``tree.apply`` once per tree, which dominates the cost of scoring one row.
+``FlatIsolationForest`` packs every fitted tree into shared NumPy arrays
+(feature, threshold, children, NaN direction, per-leaf depth) and walks all
+trees for a micro-batch at once, one vectorized step per tree level.
+
+Scores are bit-identical to scikit-learn: rows are cast to float32 like the
+tree code, per-leaf depth corrections are formed the same way, and depths
+are accumulated tree by tree in the same order.
+"""
+import numpy as np
+from sklearn.ensemble._iforest import _average_path_length
+
+CHUNK_ROWS = 512  # rows per traversal block (bounds the rows x trees index arrays)
+
+
+class FlatIsolationForest:
+    """Packed copy of a fitted ``IsolationForest`` for fast scoring."""
+
+    def __init__(self, iso_forest):
+        features, thresholds, lefts, rights, nan_left, leaf_depth, roots = [], [], [], [], [], [], []
+        offset = 0
+        for tree_idx, (tree, tree_features) in enumerate(
+            zip(iso_forest.estimators_, iso_forest.estimators_features_)
+        ):
+            t = tree.tree_
+            is_leaf = t.children_left == -1
+            roots.append(offset)
+            # Map per-tree (possibly subsampled) feature ids to input columns
+            features.append(np.where(is_leaf, 0, np.asarray(tree_features)[np.maximum(t.feature, 0)]))
+            thresholds.append(t.threshold)
+            # Leaves point at themselves so the walk can run a fixed number of steps
+            self_idx = np.arange(t.node_count) + offset
+            lefts.append(np.where(is_leaf, self_idx, t.children_left + offset))
+            rights.append(np.where(is_leaf, self_idx, t.children_right + offset))
+            nan_left.append(np.asarray(t.missing_go_to_left, dtype=bool))
+            # Same expression as sklearn's _parallel_compute_tree_depths
+            leaf_depth.append(
+                iso_forest._decision_path_lengths[tree_idx]
+                + iso_forest._average_path_length_per_tree[tree_idx]
+                - 1.0
+            )
+            offset += t.node_count
+
+        self.feature = np.concatenate(features).astype(np.intp)
+        self.threshold = np.concatenate(thresholds)
+        # children[2 * node + go_left]: right child, then left child
+        self.children = np.stack(
+            [np.concatenate(rights), np.concatenate(lefts)], axis=1
+        ).ravel().astype(np.intp)
+        self.nan_left = np.concatenate(nan_left)
+        self.leaf_depth = np.concatenate(leaf_depth)
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.max_depth = max(tree.tree_.max_depth for tree in iso_forest.estimators_)
+        self.n_features = iso_forest.n_features_in_
+        self.denominator = float(
+            len(iso_forest.estimators_) * _average_path_length([iso_forest._max_samples])[0]
+        )
+
+    def _depths(self, X: np.ndarray) -> np.ndarray:
+        n_rows, n_features = X.shape
+        values = X.ravel()
+        row_base = (np.arange(n_rows) * n_features)[:, None]
+        has_nan = np.isnan(values).any()
+
+        node = np.broadcast_to(self.roots, (n_rows, len(self.roots))).copy()
+        for _ in range(self.max_depth):
+            x = values.take(row_base + self.feature.take(node))
+            go_left = x <= self.threshold.take(node)
+            if has_nan:
+                go_left = np.where(np.isnan(x), self.nan_left.take(node), go_left)
+            # Leaves loop back to themselves, so extra steps are harmless
+            node = self.children.take(2 * node + go_left)
+        # cumsum adds tree by tree, matching sklearn's sequential `depths +=`
+        return np.cumsum(self.leaf_depth.take(node), axis=1)[:, -1]
+
+    def if_score(self, X) -> np.ndarray:
+        """Anomaly score (``-score_samples``); higher is more anomalous.
+
+        ``X`` is one row (1-D) or a 2-D batch of ``n_features`` columns.
+        """
+        # Round to float32 like the tree code; float64 compares are then exact
+        X = np.atleast_2d(np.asarray(X, dtype=np.float32)).astype(np.float64)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {X.shape[1]}")
+
+        if len(X) == 0:
+            return np.zeros(0)
+        depths = np.concatenate([
+            self._depths(X[start:start + CHUNK_ROWS])
+            for start in range(0, len(X), CHUNK_ROWS)
+        ])
+
+        if self.denominator == 0:
+            return np.ones_like(depths)
+        return 2 ** (-np.divide(depths, self.denominator))
+
+    def score_samples(self, X) -> np.ndarray:
+        """Drop-in for ``IsolationForest.score_samples`` (lower is more abnormal)."""
+        return -self.if_score(X)
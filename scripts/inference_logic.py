@@ -1,5 +1,7 @@
 import math
 
+import numpy as np
+
 
 def compute_risk_score(hr: float, spo2: float) -> float:
     """Compute simple risk score from HR and SpO2 for realtime inference.
@@ -31,3 +33,52 @@ def get_risk_level(risk_score: float) -> str:
 def compute_confidence(risk_score: float) -> float:
     """Heuristic confidence used by the API (unchanged)."""
     return round(min(0.5 + risk_score / 200.0, 0.99), 2)
+
+
+# =========================================================
+# VECTORIZED (BATCH) VARIANTS
+# =========================================================
+RISK_LEVELS = np.array(["GREEN", "AMBER", "RED"])
+
+
+def round_like_python(values: np.ndarray, ndigits: int = 2) -> np.ndarray:
+    """Round an array exactly like the builtin ``round``.
+
+    ``np.round`` scales by 10**ndigits before rounding, which can disagree
+    with ``round`` on values sitting next to a half-way point. Those few
+    values are re-rounded with the builtin so batch output matches the
+    scalar path bit for bit.
+    """
+    values = np.asarray(values, dtype=float)
+    rounded = np.round(values, ndigits)
+
+    scaled = values * 10.0 ** ndigits
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for idx in np.flatnonzero(near_tie):
+        rounded.flat[idx] = round(float(values.flat[idx]), ndigits)
+
+    return rounded
+
+
+def compute_risk_score_batch(hr: np.ndarray, spo2: np.ndarray) -> np.ndarray:
+    """Vectorized ``compute_risk_score`` over arrays of HR / SpO2 readings."""
+    hr = np.asarray(hr, dtype=float)
+    spo2 = np.asarray(spo2, dtype=float)
+
+    hr_risk = np.where(hr > 100, np.minimum((hr - 100) * 0.8, 30), 0.0)
+    spo2_risk = np.where(spo2 < 94, np.minimum((94 - spo2) * 5, 50), 0.0)
+
+    return np.minimum(0.0 + hr_risk + spo2_risk, 100.0)
+
+
+def get_risk_level_batch(risk_score: np.ndarray) -> np.ndarray:
+    """Vectorized ``get_risk_level``; returns an array of level strings."""
+    risk_score = np.asarray(risk_score, dtype=float)
+    level_idx = (risk_score >= 45).astype(np.int8) + (risk_score >= 60)
+    return RISK_LEVELS[level_idx]
+
+
+def compute_confidence_batch(risk_score: np.ndarray) -> np.ndarray:
+    """Vectorized ``compute_confidence``."""
+    risk_score = np.asarray(risk_score, dtype=float)
+    return round_like_python(np.minimum(0.5 + risk_score / 200.0, 0.99), 2)
@@ -0,0 +1,234 @@
+"""Versioned, pre-fitted hybrid IF + PCA model artifacts.
+
+Training fits the scaler, Isolation Forest and PCA once and writes them to
+``models/hybrid/<version>/`` together with a ``manifest.json`` holding the
+feature columns, hybrid weights and the score normalization constants.
+Batch scripts and the API load these instead of refitting.
+"""
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from functools import cached_property
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.decomposition import PCA
+from sklearn.ensemble import IsolationForest
+from sklearn.preprocessing import StandardScaler
+
+from scripts.iforest_scorer import FlatIsolationForest
+from scripts.pca_scorer import PCAResidualScorer
+from scripts.profiling import profiled
+from scripts.risk_calibration import TREND_FEATURES, fit_calibration, trend_severity
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+# GRAY_MODEL_DIR points batch runs (e.g. benchmarks) at another artifact store
+ARTIFACT_ROOT = Path(os.environ.get("GRAY_MODEL_DIR", BASE_DIR / "models" / "hybrid"))
+LATEST_FILE = "LATEST"
+
+FEATURE_COLS = [
+    "hr_mean_30s",
+    "hr_slope_30s",
+    "hr_std_30s",
+    "spo2_mean_30s",
+    "spo2_delta_from_baseline",
+    "spo2_seconds_below_94",
+    "sys_bp_mean_60s",
+    "sys_bp_slope_60s",
+    "motion_mean_10s"
+]
+
+# Same settings as coding_scripts/hybrid_if_pca_anomaly_detection.py
+IF_PARAMS = {"n_estimators": 300, "contamination": 0.05, "random_state": 42}
+PCA_PARAMS = {"n_components": 0.95, "random_state": 42}
+IF_WEIGHT = 0.6
+PCA_WEIGHT = 0.4
+RISK_THRESHOLD = 0.6
+
+
+@dataclass
+class HybridArtifacts:
+    scaler: StandardScaler
+    iso_forest: IsolationForest
+    pca: PCA
+    manifest: dict = field(default_factory=dict)
+
+    @property
+    def feature_cols(self):
+        return self.manifest["feature_cols"]
+
+    @property
+    def version(self):
+        return self.manifest.get("version")
+
+    @cached_property
+    def if_scorer(self) -> FlatIsolationForest:
+        """Flattened copy of ``iso_forest`` for low-latency scoring (same scores)."""
+        return FlatIsolationForest(self.iso_forest)
+
+    @cached_property
+    def pca_scorer(self) -> PCAResidualScorer:
+        """Scaler + PCA residual projector fused into one matmul."""
+        return PCAResidualScorer(self.scaler, self.pca, feature_names=self.feature_cols)
+
+
+def default_normal_mask(df: pd.DataFrame) -> pd.Series:
+    """Training rows treated as normal: first 10 minutes, low motion."""
+    return (df["time_sec"] / 60 < 10) & (df["high_motion_flag"] == 0)
+
+
+def raw_scores(scaler, iso_forest, pca, X) -> tuple:
+    """Un-normalized ``(if_score, pca_error)`` for a feature matrix.
+
+    ``iso_forest`` may be the fitted model or its ``FlatIsolationForest``.
+    """
+    X_scaled = scaler.transform(np.asarray(X, dtype=float))
+    if_score = -iso_forest.score_samples(X_scaled)
+    X_recon = pca.inverse_transform(pca.transform(X_scaled))
+    pca_error = np.mean((X_scaled - X_recon) ** 2, axis=1)
+    return if_score, pca_error
+
+
+def hybrid_raw_scores(artifacts: HybridArtifacts, X) -> tuple:
+    """``raw_scores`` through the fast scorers (flattened IF, fused PCA)."""
+    X = np.asarray(X, dtype=float)
+    # Same arithmetic as StandardScaler.transform, without its validation
+    X_scaled = (X - artifacts.scaler.mean_) / artifacts.scaler.scale_
+    return artifacts.if_scorer.if_score(X_scaled), artifacts.pca_scorer.pca_error(X)
+
+
+@profiled("model_fit")
+def fit_hybrid_models(df: pd.DataFrame, normal_mask=None) -> HybridArtifacts:
+    """Fit scaler on all rows and IF / PCA on the normal rows only."""
+    if normal_mask is None:
+        normal_mask = default_normal_mask(df)
+
+    # Fitted on plain arrays so single-row API calls need no column names
+    X = df[FEATURE_COLS].to_numpy(dtype=float)
+    normal_mask = np.asarray(normal_mask, dtype=bool)
+    scaler = StandardScaler()
+    scaler.fit(X)
+    X_normal_scaled = scaler.transform(X[normal_mask])
+
+    iso_forest = IsolationForest(**IF_PARAMS)
+    iso_forest.fit(X_normal_scaled)
+
+    pca = PCA(**PCA_PARAMS)
+    pca.fit(X_normal_scaled)
+
+    # Normalization constants: score range over the training frame
+    if_score, pca_error = raw_scores(scaler, iso_forest, pca, X)
+
+    manifest = {
+        "feature_cols": list(FEATURE_COLS),
+        "if_params": IF_PARAMS,
+        "pca_params": PCA_PARAMS,
+        "if_weight": IF_WEIGHT,
+        "pca_weight": PCA_WEIGHT,
+        "risk_threshold": RISK_THRESHOLD,
+        "normalization": {
+            "if_score_min": float(if_score.min()),
+            "if_score_max": float(if_score.max()),
+            "pca_error_min": float(pca_error.min()),
+            "pca_error_max": float(pca_error.max()),
+        },
+        "n_train_rows": int(len(df)),
+        "n_normal_rows": int(np.sum(normal_mask)),
+        "sklearn_version": sklearn.__version__,
+    }
+
+    # Frozen ranges for the final risk score (scripts/risk_calibration.py)
+    if any(c in df.columns for c in TREND_FEATURES):
+        _, _, hybrid = normalize_scores(manifest, if_score, pca_error)
+        manifest["risk_calibration"] = fit_calibration(hybrid, trend_severity(df))
+
+    return HybridArtifacts(scaler, iso_forest, pca, manifest)
+
+
+def normalize_scores(manifest: dict, if_score, pca_error) -> tuple:
+    """``(if_norm, pca_norm, hybrid_risk_score)`` with the frozen ranges, clipped to [0, 1]."""
+    norm = manifest["normalization"]
+    if_norm = np.clip(
+        (if_score - norm["if_score_min"])
+        / (norm["if_score_max"] - norm["if_score_min"]), 0.0, 1.0
+    )
+    pca_norm = np.clip(
+        (pca_error - norm["pca_error_min"])
+        / (norm["pca_error_max"] - norm["pca_error_min"]), 0.0, 1.0
+    )
+    hybrid = manifest["if_weight"] * if_norm + manifest["pca_weight"] * pca_norm
+    return if_norm, pca_norm, hybrid
+
+
+def save_artifacts(artifacts: HybridArtifacts, version=None, root=ARTIFACT_ROOT) -> Path:
+    """Write artifacts under ``root/<version>`` and mark them as latest."""
+    version = version or time.strftime("v%Y%m%d-%H%M%S")
+    out_dir = Path(root) / version
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    joblib.dump(artifacts.scaler, out_dir / "scaler.joblib")
+    joblib.dump(artifacts.iso_forest, out_dir / "isolation_forest.joblib")
+    joblib.dump(artifacts.pca, out_dir / "pca.joblib")
+
+    artifacts.manifest["version"] = version
+    with open(out_dir / "manifest.json", "w") as f:
+        json.dump(artifacts.manifest, f, indent=2)
+
+    (Path(root) / LATEST_FILE).write_text(version)
+    return out_dir
+
+
+def version_dir(version=None, root=ARTIFACT_ROOT) -> Path:
+    """Directory of a saved version (defaults to the one recorded in ``LATEST``)."""
+    root = Path(root)
+    if version is None:
+        latest = root / LATEST_FILE
+        if not latest.exists():
+            raise FileNotFoundError(
+                f"No trained hybrid models in {root}. Run train_anomaly_model.py first."
+            )
+        version = latest.read_text().strip()
+    return root / version
+
+
+def load_artifacts(version=None, root=ARTIFACT_ROOT) -> HybridArtifacts:
+    """Load a saved version (defaults to the one recorded in ``LATEST``)."""
+    model_dir = version_dir(version, root)
+    with open(model_dir / "manifest.json", "r") as f:
+        manifest = json.load(f)
+
+    return HybridArtifacts(
+        scaler=joblib.load(model_dir / "scaler.joblib"),
+        iso_forest=joblib.load(model_dir / "isolation_forest.joblib"),
+        pca=joblib.load(model_dir / "pca.joblib"),
+        manifest=manifest,
+    )
+
+
+@profiled("scoring", rows_arg=1)
+def score_hybrid(artifacts: HybridArtifacts, X) -> dict:
+    """Full hybrid scoring with the frozen training normalization.
+
+    ``X`` is a 2-D array (or DataFrame) with columns in ``feature_cols``
+    order. Normalized scores are clipped to [0, 1].
+    """
+    if isinstance(X, pd.DataFrame):
+        X = X[artifacts.feature_cols]
+    X = np.asarray(X, dtype=float)
+
+    if_score, pca_error = hybrid_raw_scores(artifacts, X)
+
+    if_norm, pca_norm, hybrid = normalize_scores(artifacts.manifest, if_score, pca_error)
+
+    return {
+        "if_score": if_score,
+        "if_score_norm": if_norm,
+        "pca_error": pca_error,
+        "pca_score_norm": pca_norm,
+        "hybrid_risk_score": hybrid,
+        "hybrid_anomaly": (hybrid >= artifacts.manifest["risk_threshold"]).astype(int),
+    }
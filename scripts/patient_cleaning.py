@@ -0,0 +1,136 @@
+"""Segmented multi-patient cleaning for fleet exports.
+
+Same steps as the per-patient ``groupby(...).transform(lambda ...)`` chain
+in ``coding_scripts/artifact.py`` (interpolation, centered rolling medians,
+motion-window SpO2 median), but the frame is sorted once by
+``(patient_id, timestamp)`` and every rolling operation runs as one NumPy
+pass over all patients, with windows cut at patient boundaries. Patients
+can be sharded across a process pool.
+"""
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from scripts.profiling import profiled
+
+SMOOTH_WINDOW = 5          # centered median, samples
+MOTION_WINDOW = 10         # trailing median during high motion, samples
+MOTION_THRESHOLD = 0.9     # 0.6
+
+
+# =========================================================
+# SEGMENTED KERNELS (rows sorted, one segment per patient)
+# =========================================================
+def segment_bounds(groups: np.ndarray) -> tuple:
+    """Per-row first and last row index of the row's segment."""
+    n = len(groups)
+    idx = np.arange(n)
+    is_start = np.ones(n, dtype=bool)
+    is_start[1:] = groups[1:] != groups[:-1]
+    is_end = np.ones(n, dtype=bool)
+    is_end[:-1] = is_start[1:]
+    start = np.maximum.accumulate(np.where(is_start, idx, 0))
+    end = np.minimum.accumulate(np.where(is_end, idx, n - 1)[::-1])[::-1]
+    return start, end
+
+
+def interpolate_segments(values: np.ndarray, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """``Series.interpolate()`` per segment: linear inside, last value carried
+    to the end, leading NaNs kept."""
+    n = len(values)
+    idx = np.arange(n)
+    valid = ~np.isnan(values)
+
+    prev = np.maximum.accumulate(np.where(valid, idx, -1))
+    nxt = np.minimum.accumulate(np.where(valid, idx, n)[::-1])[::-1]
+    has_prev = (prev >= start) & ~valid
+    has_next = (nxt <= end) & has_prev
+
+    out = values.copy()
+    p, q = prev[has_next], nxt[has_next]
+    # Same arithmetic as numpy.interp, which pandas uses for "linear"
+    slope = (values[q] - values[p]) / (q - p)
+    out[has_next] = slope * (idx[has_next] - p) + values[p]
+    trailing = has_prev & ~has_next
+    out[trailing] = values[prev[trailing]]
+    return out
+
+
+def centered_median(values: np.ndarray, start: np.ndarray, end: np.ndarray,
+                    window: int = SMOOTH_WINDOW) -> np.ndarray:
+    """``rolling(window, center=True).median()`` per segment (NaN at edges
+    and for windows containing NaN)."""
+    half = window // 2
+    padded = np.concatenate([np.full(half, np.nan), values, np.full(window - 1 - half, np.nan)])
+    out = np.median(sliding_window_view(padded, window), axis=1)
+    idx = np.arange(len(values))
+    out[(idx - half < start) | (idx + window - 1 - half > end)] = np.nan
+    return out
+
+
+def trailing_median(values: np.ndarray, start: np.ndarray, rows: np.ndarray,
+                    window: int = MOTION_WINDOW) -> np.ndarray:
+    """``rolling(window, min_periods=1).median()`` per segment, evaluated
+    only at ``rows``."""
+    padded = np.concatenate([np.full(window - 1, np.nan), values])
+    windows = sliding_window_view(padded, window)[rows].copy()
+    # Window slot k holds row (row - window + 1 + k); blank out other patients
+    src = rows[:, None] - window + 1 + np.arange(window)
+    windows[src < start[rows][:, None]] = np.nan
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN window -> NaN
+        return np.nanmedian(windows, axis=1)
+
+
+# =========================================================
+# CLEANING
+# =========================================================
+def clean_sorted(df: pd.DataFrame) -> pd.DataFrame:
+    """Clean a frame already sorted by ``(patient_id, timestamp)``."""
+    df = df.copy()
+    start, end = segment_bounds(df["patient_id"].to_numpy())
+
+    for raw_col, clean_col in (("HR", "HR_clean"), ("SpO2", "SpO2_clean")):
+        filled = interpolate_segments(df[raw_col].to_numpy(dtype=float), start, end)
+        smooth = centered_median(filled, start, end)
+        df[raw_col] = filled
+        # Edges (incomplete windows) keep the interpolated value
+        df[clean_col] = np.where(np.isnan(smooth), filled, smooth)
+
+    high_motion = np.flatnonzero(df["motion"].to_numpy() > MOTION_THRESHOLD)
+    spo2_clean = df["SpO2_clean"].to_numpy(copy=True)
+    spo2_clean[high_motion] = trailing_median(spo2_clean, start, high_motion)
+    df["SpO2_clean"] = spo2_clean
+    return df
+
+
+def _shards(patient_ids: np.ndarray, n_shards: int) -> list:
+    """Row slices of a sorted frame, split only at patient boundaries."""
+    starts = np.flatnonzero(np.r_[True, patient_ids[1:] != patient_ids[:-1]])
+    cuts = starts[np.linspace(0, len(starts), n_shards + 1).astype(int)[1:-1]]
+    bounds = np.r_[0, cuts, len(patient_ids)]
+    return [slice(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+@profiled("cleaning")
+def clean_patients(df: pd.DataFrame, workers=1) -> pd.DataFrame:
+    """Clean every patient in ``df``; rows come back in their input order.
+
+    ``workers`` > 1 (or None for all CPUs) shards patients across processes.
+    """
+    order = np.lexsort((df["timestamp"].to_numpy(), df["patient_id"].to_numpy()))
+    ordered = df.iloc[order]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        cleaned = clean_sorted(ordered)
+    else:
+        shards = _shards(ordered["patient_id"].to_numpy(), workers * 4)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            cleaned = pd.concat(pool.map(clean_sorted, [ordered.iloc[s] for s in shards]))
+
+    return cleaned.iloc[np.argsort(order)]
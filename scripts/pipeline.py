@@ -0,0 +1,328 @@
+"""Declarative DAG runner with a content-addressed stage cache.
+
+Each stage is one ``coding_scripts`` module plus the tables/files it reads
+and writes. A stage's cache key hashes its input file contents, its source,
+the shared ``scripts/`` helpers and its parameters. On a hit the outputs
+(and the captured console log) are restored from the object store instead
+of re-running the script. Stages whose inputs are ready run in parallel.
+"""
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from scripts.hashing import CACHE_DIR, file_digest, tree_digest
+from scripts.profiling import PROFILE_DIR_ENV, PROFILER_ENV
+from scripts.storage import TABLE_FORMAT, TABLE_SCHEMA, find_table, table_path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+HELPER_DIR = BASE_DIR / "scripts"
+
+
+@dataclass
+class Stage:
+    name: str
+    module: str
+    inputs: list = field(default_factory=list)
+    outputs: list = field(default_factory=list)
+    params: dict = field(default_factory=dict)
+
+    @property
+    def source(self) -> Path:
+        return BASE_DIR / (self.module.replace(".", "/") + ".py")
+
+
+# Extension-less paths under data/ are pipeline tables (Parquet or CSV, see
+# scripts/storage.py); HYBRID_MODELS is the current hybrid model version
+# (hashed by content, wherever GRAY_MODEL_DIR points); everything else is a
+# plain file. A missing input (e.g. models before first training) hashes as
+# absent.
+HYBRID_MODELS = "<hybrid models>"
+
+STAGES = [
+    Stage("generate_vitals", "coding_scripts.generate_vitals",
+          outputs=["data/raw/synthetic_ambulance_vitals"]),
+    Stage("artifact_detection", "coding_scripts.artifact_detection",
+          inputs=["data/raw/synthetic_ambulance_vitals"],
+          outputs=["data/processed/synthetic_ambulance_vitals_cleaned"]),
+    Stage("feature_engineering", "coding_scripts.feature_engineering",
+          inputs=["data/processed/synthetic_ambulance_vitals_cleaned"],
+          outputs=["data/processed/features"]),
+    Stage("rule_engine", "coding_scripts.rule_based_anomaly_detection",
+          inputs=["data/processed/features"],
+          outputs=["data/risk_scores/rule_based_anomaly_output"]),
+    Stage("hybrid_if_pca", "coding_scripts.hybrid_if_pca_anomaly_detection",
+          inputs=["data/processed/features", HYBRID_MODELS],
+          outputs=["data/risk_scores/hybrid_if_pca_output"]),
+    Stage("isolation_forest", "coding_scripts.isolation_forest_anomaly_detection",
+          inputs=["data/processed/features"],
+          outputs=["data/risk_scores/isolation_forest_output"]),
+    Stage("pca", "coding_scripts.pca_anomaly_detection",
+          inputs=["data/processed/features"],
+          outputs=["data/risk_scores/pca_anomaly_output"]),
+    Stage("hybrid_validation", "coding_scripts.hybrid_validation_with_rules",
+          inputs=["data/risk_scores/hybrid_if_pca_output",
+                  "data/risk_scores/rule_based_anomaly_output"],
+          outputs=["data/risk_scores/hybrid_validated_alerts"]),
+    Stage("risk_scoring", "coding_scripts.risk_scoring",
+          inputs=["data/risk_scores/hybrid_validated_alerts", HYBRID_MODELS],
+          outputs=["data/risk_scores/final_decision"]),
+    Stage("compare_models", "coding_scripts.compare_anomaly_models",
+          inputs=["data/risk_scores/rule_based_anomaly_output",
+                  "data/risk_scores/isolation_forest_output",
+                  "data/risk_scores/pca_anomaly_output"],
+          outputs=["analysis/metrics/model_comparison_metrics.csv"]),
+    Stage("evaluate_alert_quality", "coding_scripts.evaluate_alert_quality",
+          inputs=["data/risk_scores/final_decision"],
+          outputs=["analysis/metrics/alert_policy_sweep.csv"]),
+    Stage("failure_analysis", "coding_scripts.failure_analysis",
+          inputs=["data/risk_scores/final_decision"],
+          outputs=["analysis/failure_cases/failure_case_1_transient_false_positive.csv",
+                   "analysis/failure_cases/failure_case_2_late_alert.csv",
+                   "analysis/failure_cases/failure_case_3_false_negative_time_bounded.csv"]),
+]
+
+
+# =========================================================
+# PATHS & HASHING
+# =========================================================
+def _is_table(path: str) -> bool:
+    return path.startswith("data/") and Path(path).suffix == ""
+
+
+def input_file(path: str) -> Path:
+    """Concrete file for a declared input (tables resolve to .parquet/.csv)."""
+    if _is_table(path):
+        return find_table(BASE_DIR / path)
+    return BASE_DIR / path
+
+
+def output_file(path: str) -> Path:
+    """Concrete file a declared output is written to."""
+    if _is_table(path):
+        return table_path(BASE_DIR / path)
+    return BASE_DIR / path
+
+
+def models_digest() -> str:
+    """Contents of the model version ``LATEST`` resolves to under the artifact root."""
+    # Imported here: the runner itself does not need sklearn
+    from scripts.model_artifacts import version_dir
+    try:
+        model_dir = version_dir()
+    except FileNotFoundError:
+        return "<missing>"
+    return tree_digest(model_dir) if model_dir.is_dir() else "<missing>"
+
+
+def helpers_digest() -> str:
+    """One digest over every shared helper module in scripts/ (except this runner)."""
+    h = hashlib.sha256()
+    for path in sorted(HELPER_DIR.glob("*.py")):
+        if path.name == Path(__file__).name:
+            continue
+        h.update(path.name.encode())
+        h.update(file_digest(path).encode())
+    return h.hexdigest()
+
+
+def stage_key(stage: Stage, helpers: str) -> str:
+    """Cache key: stage source + helpers + parameters + input contents."""
+    h = hashlib.sha256()
+    h.update(stage.name.encode())
+    h.update(file_digest(stage.source).encode())
+    h.update(helpers.encode())
+    params = {"table_format": TABLE_FORMAT, "table_schema": TABLE_SCHEMA, **stage.params}
+    h.update(json.dumps(params, sort_keys=True).encode())
+    for path in stage.inputs:
+        h.update(path.encode())
+        if path == HYBRID_MODELS:
+            h.update(models_digest().encode())
+            continue
+        found = input_file(path)
+        h.update((file_digest(found) if found.exists() else "<missing>").encode())
+    return h.hexdigest()
+
+
+# =========================================================
+# CONTENT-ADDRESSED CACHE
+# =========================================================
+def _object_path(digest: str) -> Path:
+    return CACHE_DIR / "objects" / digest[:2] / digest
+
+
+def _store_object(src: Path) -> str:
+    digest = file_digest(src)
+    dest = _object_path(digest)
+    if not dest.exists():
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(src, dest)
+    return digest
+
+
+def _manifest_path(key: str) -> Path:
+    return CACHE_DIR / "stages" / f"{key}.json"
+
+
+def restore_from_cache(stage: Stage, key: str):
+    """Put cached outputs back in place; returns the cached manifest or None."""
+    manifest_file = _manifest_path(key)
+    if not manifest_file.exists():
+        return None
+    with open(manifest_file, "r") as f:
+        manifest = json.load(f)
+
+    if not all(_object_path(d).exists() for d in manifest["outputs"].values()):
+        return None
+
+    for rel, digest in manifest["outputs"].items():
+        dest = BASE_DIR / rel
+        if dest.exists() and file_digest(dest) == digest:
+            continue
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(_object_path(digest), dest)
+    return manifest
+
+
+def save_to_cache(stage: Stage, key: str, log: str, seconds: float) -> dict:
+    outputs = {}
+    for path in stage.outputs:
+        out = output_file(path)
+        outputs[str(out.relative_to(BASE_DIR))] = _store_object(out)
+
+    manifest = {
+        "stage": stage.name,
+        "key": key,
+        "outputs": outputs,
+        "log": log,
+        "seconds": round(seconds, 3),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    _manifest_path(key).parent.mkdir(parents=True, exist_ok=True)
+    with open(_manifest_path(key), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+# =========================================================
+# DAG
+# =========================================================
+def stage_dependencies(stages) -> dict:
+    """Map each stage name to the stages producing its inputs."""
+    producers = {}
+    for stage in stages:
+        for path in stage.outputs:
+            producers[path] = stage.name
+    return {
+        s.name: sorted({producers[p] for p in s.inputs if p in producers})
+        for s in stages
+    }
+
+
+def select_stages(targets=None, stages=STAGES) -> list:
+    """``targets`` plus everything upstream of them (all stages if None)."""
+    if not targets:
+        return list(stages)
+    by_name = {s.name: s for s in stages}
+    unknown = set(targets) - set(by_name)
+    if unknown:
+        raise ValueError(f"Unknown stages: {sorted(unknown)}. Known: {sorted(by_name)}")
+
+    deps = stage_dependencies(stages)
+    wanted, todo = set(), list(targets)
+    while todo:
+        name = todo.pop()
+        if name not in wanted:
+            wanted.add(name)
+            todo.extend(deps[name])
+    return [s for s in stages if s.name in wanted]
+
+
+def _run_stage(stage: Stage, force: bool, profile_dir=None, profiler="none") -> dict:
+    try:
+        key = stage_key(stage, helpers_digest())
+    except FileNotFoundError as exc:
+        return {"stage": stage.name, "status": "failed", "key": None,
+                "seconds": 0.0, "log": str(exc)}
+    if not force:
+        manifest = restore_from_cache(stage, key)
+        if manifest is not None:
+            return {"stage": stage.name, "status": "cached", "key": key,
+                    "seconds": 0.0, "log": manifest["log"]}
+
+    for path in stage.outputs:
+        output_file(path).parent.mkdir(parents=True, exist_ok=True)
+
+    # Headless plotting: plt.show() in the stage scripts becomes a no-op
+    env = dict(os.environ, MPLBACKEND="Agg")
+    command = [sys.executable, "-m", stage.module]
+    if profile_dir is not None:
+        # Timed operations + optional cProfile dump, see scripts/profiling.py
+        env.update({PROFILE_DIR_ENV: str(profile_dir), PROFILER_ENV: profiler})
+        command = [sys.executable, "-m", "scripts.profiling", stage.name, stage.module]
+    start = time.perf_counter()
+    proc = subprocess.run(command, cwd=BASE_DIR, env=env, capture_output=True, text=True)
+    seconds = time.perf_counter() - start
+    log = proc.stdout + proc.stderr
+
+    if proc.returncode != 0:
+        return {"stage": stage.name, "status": "failed", "key": key,
+                "seconds": seconds, "log": log}
+
+    save_to_cache(stage, key, log, seconds)
+    return {"stage": stage.name, "status": "ran", "key": key,
+            "seconds": seconds, "log": log}
+
+
+def run_pipeline(targets=None, force=False, jobs=None, on_result=None,
+                 profile_dir=None, profiler="none") -> list:
+    """Run the selected stages in dependency order, independent ones in parallel.
+
+    Downstream stages of a failed stage are skipped. Returns one result dict
+    per stage in completion order. With ``profile_dir`` each stage that runs
+    writes a timing report (and a ``profiler`` dump) there.
+    """
+    if profile_dir is not None:
+        profile_dir = Path(profile_dir).resolve()
+    stages = select_stages(targets)
+    deps = stage_dependencies(stages)
+    pending = {s.name: s for s in stages}
+    done, failed, results = set(), set(), []
+    jobs = jobs or os.cpu_count() or 1
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        running = {}
+        while pending or running:
+            for name in list(pending):
+                if any(d in failed for d in deps[name]):
+                    failed.add(name)
+                    result = {"stage": name, "status": "skipped", "seconds": 0.0, "log": ""}
+                    results.append(result)
+                    if on_result:
+                        on_result(result)
+                    del pending[name]
+                elif all(d in done for d in deps[name]):
+                    running[pool.submit(_run_stage, pending.pop(name), force,
+                                        profile_dir, profiler)] = name
+
+            if not running:
+                if pending:
+                    raise RuntimeError(f"Unresolvable stage dependencies: {sorted(pending)}")
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                result = future.result()
+                (failed if result["status"] == "failed" else done).add(name)
+                results.append(result)
+                if on_result:
+                    on_result(result)
+
+    return results
@@ -0,0 +1,200 @@
+"""Opt-in timing / profiling for batch pipeline stages.
+
+Off unless ``GRAY_PROFILE_DIR`` is set (``run_pipeline.py --profile DIR``
+sets it for every stage it runs). Shared helpers wrap their main
+operations (table load / save, rolling features, model fit, scoring,
+rules) in ``operation(...)`` or ``@profiled``; each records wall time, CPU time, rows
+processed and the process's peak RSS so far. When disabled an operation
+costs one environment lookup.
+
+A stage runs through this module as
+
+    python -m scripts.profiling <stage_name> <module>
+
+which executes the stage module, optionally under cProfile
+(``GRAY_PROFILER=cprofile``, dump in ``<stage>.prof``), and writes
+``<stage>.json`` with stage totals and the operation list.
+``write_run_report`` merges the stage files into one ``report.json``.
+"""
+import functools
+import json
+import os
+import platform
+import resource
+import runpy
+import sys
+import time
+from pathlib import Path
+
+PROFILE_DIR_ENV = "GRAY_PROFILE_DIR"
+PROFILER_ENV = "GRAY_PROFILER"
+PROFILERS = ["none", "cprofile"]
+
+OPERATIONS = []  # operations recorded in this process
+_depth = 0
+
+
+def enabled() -> bool:
+    return bool(os.environ.get(PROFILE_DIR_ENV))
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class operation:
+    """Time one operation, as ``with operation(name) as op:`` or ``start()`` / ``stop()``.
+
+    Set ``op.rows`` inside the block when the row count is only known
+    afterwards.
+    """
+
+    __slots__ = ("name", "rows", "_start")
+
+    def __init__(self, name: str, rows=None):
+        self.name = name
+        self.rows = rows
+        self._start = None
+
+    def start(self):
+        global _depth
+        if enabled():
+            self._start = (time.perf_counter(), time.process_time())
+            _depth += 1
+        return self
+
+    def stop(self) -> None:
+        global _depth
+        if self._start is None:
+            return
+        wall_start, cpu_start = self._start
+        self._start = None
+        _depth -= 1
+        OPERATIONS.append({
+            "operation": self.name,
+            "depth": _depth,  # 0 = called from the stage itself, >0 = nested
+            "rows": None if self.rows is None else int(self.rows),
+            "wall_s": round(time.perf_counter() - wall_start, 6),
+            "cpu_s": round(time.process_time() - cpu_start, 6),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+        })
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def profiled(name: str, rows_arg=0):
+    """Decorator: time each call as ``name``, with rows = ``len(args[rows_arg])``."""
+    def wrap(func):
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            if not enabled():
+                return func(*args, **kwargs)
+            data = args[rows_arg] if len(args) > rows_arg else None
+            rows = len(data) if hasattr(data, "__len__") else None
+            with operation(name, rows=rows):
+                return func(*args, **kwargs)
+        return timed
+    return wrap
+
+
+def summarize_operations(operations: list) -> dict:
+    """Per-operation-name totals (calls, wall, CPU, rows)."""
+    totals = {}
+    for op in operations:
+        total = totals.setdefault(op["operation"], {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "rows": 0})
+        total["calls"] += 1
+        total["wall_s"] = round(total["wall_s"] + op["wall_s"], 6)
+        total["cpu_s"] = round(total["cpu_s"] + op["cpu_s"], 6)
+        total["rows"] += op["rows"] or 0
+    return totals
+
+
+def run_stage(stage: str, module: str, out_dir, profiler="none") -> dict:
+    """Run ``module`` as ``__main__`` and write ``<stage>.json`` (+ ``.prof``)."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rss_before = peak_rss_mb()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+
+    profile = None
+    if profiler == "cprofile":
+        import cProfile
+        profile = cProfile.Profile()
+        profile.enable()
+    try:
+        runpy.run_module(module, run_name="__main__", alter_sys=True)
+    finally:
+        if profile is not None:
+            profile.disable()
+            profile.dump_stats(out_dir / f"{stage}.prof")
+
+        loads = [op for op in OPERATIONS if op["operation"] == "load" and op["rows"] is not None]
+        saves = [op for op in OPERATIONS if op["operation"] == "save" and op["rows"] is not None]
+        result = {
+            "stage": stage,
+            "module": module,
+            "wall_s": round(time.perf_counter() - wall_start, 6),
+            "cpu_s": round(time.process_time() - cpu_start, 6),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "baseline_rss_mb": round(rss_before, 1),
+            "rows_in": sum(op["rows"] for op in loads),
+            "rows_out": sum(op["rows"] for op in saves),
+            "profile": f"{stage}.prof" if profile is not None else None,
+            "operation_totals": summarize_operations(OPERATIONS),
+            "operations": OPERATIONS,
+        }
+        with open(out_dir / f"{stage}.json", "w") as f:
+            json.dump(result, f, indent=2)
+    return result
+
+
+def write_run_report(out_dir, results: list, profiler="none") -> Path:
+    """Merge per-stage files with the runner's results into ``report.json``."""
+    out_dir = Path(out_dir)
+    stages = []
+    for result in results:
+        entry = {k: result[k] for k in ("stage", "status", "seconds") if k in result}
+        stage_file = out_dir / f"{result['stage']}.json"
+        if result.get("status") == "ran" and stage_file.exists():
+            with open(stage_file) as f:
+                entry.update(json.load(f))
+        stages.append(entry)
+
+    ran = [s for s in stages if "wall_s" in s]
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "profiler": profiler,
+        },
+        # Slowest first: where a slow run spent its time
+        "slowest_stages": [s["stage"] for s in sorted(ran, key=lambda s: -s["wall_s"])],
+        "stages": stages,
+    }
+    path = out_dir / "report.json"
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+if __name__ == "__main__":
+    stage_name, stage_module = sys.argv[1], sys.argv[2]
+    # The stage sees only its own arguments (some stages parse --workers)
+    sys.argv = [sys.argv[0]] + sys.argv[3:]
+    # Call through the imported module: helpers record into *its* OPERATIONS,
+    # not this __main__ copy's
+    from scripts import profiling
+    profiling.run_stage(
+        stage_name,
+        stage_module,
+        os.environ.get(PROFILE_DIR_ENV) or ".",
+        os.environ.get(PROFILER_ENV, "none"),
+    )
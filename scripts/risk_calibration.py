@@ -0,0 +1,110 @@
+"""Frozen calibration for the final risk score.
+
+``risk_scoring.py`` used to min-max normalize ``hybrid_risk_score`` and
+``trend_severity`` against whichever file it was given, so a row's score
+depended on the rest of the batch. The ranges are now learned once at
+training time (stored in the hybrid model manifest under
+``risk_calibration``) and every score is an O(1) function of one row,
+shared by the batch pipeline and the API.
+
+``triage`` is the matching vectorized kernel for the GREEN / AMBER / RED
+level and the rule-gated final alert, for whole files or streaming
+micro-batches.
+"""
+import numpy as np
+import pandas as pd
+
+TREND_FEATURES = ["hr_slope_30s", "spo2_slope_60s", "sys_bp_slope_60s"]
+CALIBRATED = ["hybrid_risk_score", "trend_severity"]
+CALIBRATION_QUANTILES = [0.01, 0.05, 0.5, 0.95, 0.99]
+
+# Weights of the final score (0–100)
+ANOMALY_WEIGHT = 0.6
+TREND_WEIGHT = 0.3
+CONFIDENCE_WEIGHT = 0.1
+
+RED_THRESHOLD = 70
+AMBER_THRESHOLD = 40
+RISK_LEVELS = ["GREEN", "AMBER", "RED"]   # category codes 0, 1, 2
+
+
+def trend_severity(df: pd.DataFrame) -> pd.Series:
+    """Mean absolute trend slope over the trend features present."""
+    present = [c for c in TREND_FEATURES if c in df.columns]
+    return df[present].abs().mean(axis=1)
+
+
+def fit_calibration(hybrid_risk_score, trend) -> dict:
+    """Score ranges (and reference quantiles) on the training frame."""
+    calibration = {}
+    for name, values in zip(CALIBRATED, (hybrid_risk_score, trend)):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        calibration[name] = {
+            "min": float(values.min()),
+            "max": float(values.max()),
+            "quantiles": {
+                str(q): float(v)
+                for q, v in zip(CALIBRATION_QUANTILES, np.quantile(values, CALIBRATION_QUANTILES))
+            },
+        }
+    return calibration
+
+
+def normalize(values, lo: float, hi: float):
+    """0–100 against a frozen ``[lo, hi]`` range, clipped for unseen extremes."""
+    return np.clip(100 * (values - lo) / (hi - lo + 1e-6), 0.0, 100.0)
+
+
+def risk_components(hybrid_risk_score, trend, calibration: dict) -> dict:
+    """Normalized scores, confidence and final risk score.
+
+    Works element-wise on scalars, arrays or Series.
+    """
+    anomaly = calibration["hybrid_risk_score"]
+    trend_range = calibration["trend_severity"]
+    anomaly_norm = normalize(hybrid_risk_score, anomaly["min"], anomaly["max"])
+    trend_norm = normalize(trend, trend_range["min"], trend_range["max"])
+
+    # Confidence proxy: stronger anomaly + consistent trend → higher confidence
+    confidence = (0.6 * anomaly_norm + 0.4 * trend_norm) / 100
+
+    risk_score = (
+        ANOMALY_WEIGHT * anomaly_norm
+        + TREND_WEIGHT * trend_norm
+        + CONFIDENCE_WEIGHT * (confidence * 100)
+    )
+    return {
+        "anomaly_norm": anomaly_norm,
+        "trend_norm": trend_norm,
+        "confidence": confidence,
+        "risk_score": risk_score,
+    }
+
+
+def risk_level(score: float) -> str:
+    if score >= RED_THRESHOLD:
+        return "RED"
+    elif score >= AMBER_THRESHOLD:
+        return "AMBER"
+    return "GREEN"
+
+
+def triage(risk_score, rule_flag) -> tuple:
+    """``(risk_level codes, final_alert_flag)`` for arrays of scores.
+
+    Codes index ``RISK_LEVELS`` (NaN scores are GREEN, as in ``risk_level``).
+    The final alert needs both a non-zero rule flag and a RED level.
+    """
+    risk_score = np.asarray(risk_score, dtype=float)
+    codes = np.select(
+        [risk_score >= RED_THRESHOLD, risk_score >= AMBER_THRESHOLD],
+        [2, 1],
+        default=0,
+    ).astype(np.int8)
+    final_alert = ((np.asarray(rule_flag) != 0) & (codes == 2)).astype(np.int64)
+    return codes, final_alert
+
+
+def risk_level_categorical(codes) -> pd.Categorical:
+    return pd.Categorical.from_codes(codes, categories=RISK_LEVELS)
@@ -0,0 +1,125 @@
+"""Incremental rolling-window kernels shared by batch and streaming code.
+
+The slope engine reproduces ``np.polyfit(range(window), x, 1)[0]`` over a
+trailing window using closed-form running sums instead of a least-squares
+fit per window.
+"""
+from collections import deque
+
+import numpy as np
+
+# Block length for the batch kernel. Running sums are re-anchored at each
+# block so cumulative float error stays bounded on long fleet series.
+SLOPE_BLOCK_SIZE = 4096
+
+
+def _slope_denominator(window: int) -> float:
+    """``n * sum(x^2) - sum(x)^2`` for x = 0..window-1."""
+    return window * window * (window * window - 1) / 12.0
+
+
+def rolling_slope_array(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing least-squares slope for every full window of ``values``.
+
+    Output matches ``Series.rolling(window).apply(polyfit slope)``: the first
+    ``window - 1`` entries and every window containing a NaN are NaN.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    out = np.full(n, np.nan)
+    if window < 2 or n < window:
+        return out
+
+    sum_x = window * (window - 1) / 2.0
+    denom = _slope_denominator(window)
+
+    nan_mask = np.isnan(values)
+    nan_count = np.concatenate(([0], np.cumsum(nan_mask)))
+    filled = np.where(nan_mask, 0.0, values)
+
+    # Each block scores window ends [end_start, end_stop) and reads the
+    # window - 1 samples preceding its first end.
+    for end_start in range(window - 1, n, SLOPE_BLOCK_SIZE):
+        end_stop = min(end_start + SLOPE_BLOCK_SIZE, n)
+        lo = end_start - (window - 1)
+        y = filled[lo:end_stop]
+
+        # Slope is invariant to a constant offset; centring keeps sums small
+        y = y - y.mean()
+        k = np.arange(len(y), dtype=float)
+
+        cs_y = np.concatenate(([0.0], np.cumsum(y)))
+        cs_ky = np.concatenate(([0.0], np.cumsum(k * y)))
+
+        starts = np.arange(end_stop - end_start)
+        stops = starts + window
+        s_y = cs_y[stops] - cs_y[starts]
+        s_xy = (cs_ky[stops] - cs_ky[starts]) - starts * s_y
+
+        slope = (window * s_xy - sum_x * s_y) / denom
+        has_nan = (nan_count[lo + stops] - nan_count[lo + starts]) > 0
+        slope[has_nan] = np.nan
+        out[end_start:end_stop] = slope
+
+    return out
+
+
+class RollingSlope:
+    """Streaming trailing-window slope with O(1) work per sample.
+
+    ``update`` returns the slope of the last ``window`` samples (NaN until the
+    window is full or while it contains a NaN).
+    """
+
+    # Sums are recomputed from the buffer this often to cancel drift
+    RESYNC_EVERY = 4096
+
+    def __init__(self, window: int):
+        if window < 2:
+            raise ValueError("window must be at least 2")
+        self.window = window
+        self._sum_x = window * (window - 1) / 2.0
+        self._denom = _slope_denominator(window)
+        self._buffer = deque(maxlen=window)
+        self._sum_y = 0.0
+        self._sum_xy = 0.0
+        self._nan_count = 0
+        self._since_resync = 0
+
+    def _resync(self):
+        y = np.array([0.0 if np.isnan(v) else v for v in self._buffer])
+        self._sum_y = float(y.sum())
+        self._sum_xy = float(np.arange(len(y)) @ y)
+        self._since_resync = 0
+
+    def update(self, value: float) -> float:
+        value = float(value)
+        is_nan = value != value
+        y_new = 0.0 if is_nan else value
+
+        if len(self._buffer) == self.window:
+            y_old = self._buffer[0]
+            if y_old != y_old:
+                self._nan_count -= 1
+                y_old = 0.0
+            # Drop the oldest sample and shift every x index down by one
+            self._sum_xy -= self._sum_y - y_old
+            self._sum_y -= y_old
+
+        position = len(self._buffer) - (len(self._buffer) == self.window)
+        self._buffer.append(value)
+        self._sum_y += y_new
+        self._sum_xy += position * y_new
+        self._nan_count += is_nan
+
+        self._since_resync += 1
+        if self._since_resync >= self.RESYNC_EVERY:
+            self._resync()
+
+        if len(self._buffer) < self.window or self._nan_count:
+            return float("nan")
+        return (self.window * self._sum_xy - self._sum_x * self._sum_y) / self._denom
+
+    def update_many(self, values) -> np.ndarray:
+        """Feed a chunk of samples; returns the slope after each one."""
+        return np.array([self.update(v) for v in values], dtype=float)
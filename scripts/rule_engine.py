@@ -0,0 +1,100 @@
+"""Vectorized rule-based anomaly engine.
+
+Same rules and fusion as the original row-by-row sliding-window loop in
+``coding_scripts/rule_based_anomaly_detection.py``, expressed as array
+operations so hours of fleet data are scored in one pass.
+"""
+import numpy as np
+import pandas as pd
+
+from scripts.profiling import profiled
+
+# -----------------------------
+# PARAMETERS (EXPLICIT & DEFENSIBLE)
+# -----------------------------
+
+# HR (early warning)
+HR_SLOPE_THRESHOLD = 0.15        # bpm/sec
+HR_PERSIST_SEC = 30              # seconds
+
+# SpO2 (confirmation)
+SPO2_DELTA_THRESHOLD = -3.0      # %
+SPO2_PERSIST_SEC_1 = 30
+SPO2_PERSIST_SEC_2 = 60
+
+# BP (severity)
+BP_SLOPE_THRESHOLD = -0.05       # mmHg/sec
+BP_PERSIST_SEC = 60
+
+REASONS = np.array([
+    "normal",
+    "HR rising trend",
+    "HR rise + sustained SpO2 drop",
+    "HR + SpO2 + BP deterioration",
+])
+
+
+def _group_positions(df: pd.DataFrame, group_col) -> np.ndarray:
+    """Row position within its group (or within the frame if ungrouped)."""
+    if group_col is None or group_col not in df.columns:
+        return np.arange(len(df))
+    return df.groupby(group_col, sort=False).cumcount().to_numpy()
+
+
+def persisted_before(condition: np.ndarray, window: int, positions: np.ndarray) -> np.ndarray:
+    """True where ``condition`` held on all ``window`` rows preceding each row.
+
+    The current row is excluded, matching ``df.iloc[i - window:i]``. Rows
+    with fewer than ``window`` predecessors (per group) are False.
+    """
+    counts = np.concatenate(([0], np.cumsum(condition, dtype=np.int64)))
+    idx = np.arange(len(condition))
+    held = np.zeros(len(condition), dtype=bool)
+    full = positions >= window
+    held[full] = (counts[idx[full]] - counts[idx[full] - window]) == window
+    return held
+
+
+@profiled("rules")
+def apply_rules(df: pd.DataFrame, group_col="patient_id") -> pd.DataFrame:
+    """Add ``hr_anomaly``/``spo2_anomaly``/``bp_anomaly``/``anomaly_level``/``reason``.
+
+    Rows must be time-ordered (and contiguous per ``group_col`` when the
+    frame holds several patients); persistence windows never cross groups.
+    """
+    df = df.copy()
+    positions = _group_positions(df, group_col)
+
+    # HR ANOMALY (TREND-BASED)
+    hr_rising = (df["hr_slope_30s"] > HR_SLOPE_THRESHOLD).to_numpy()
+    hr_anomaly = (
+        persisted_before(hr_rising, HR_PERSIST_SEC, positions)
+        & (df["high_motion_flag"] == 0).to_numpy()
+    )
+
+    # SpO2 ANOMALY (PERSISTENCE)
+    below_94 = df["spo2_seconds_below_94"]
+    spo2_anomaly = (
+        ((df["spo2_delta_from_baseline"] < SPO2_DELTA_THRESHOLD)
+         & (below_94 >= SPO2_PERSIST_SEC_1))
+        | (below_94 >= SPO2_PERSIST_SEC_2)
+    ).to_numpy()
+
+    # BP ANOMALY (SEVERITY)
+    bp_falling = (df["sys_bp_slope_60s"] < BP_SLOPE_THRESHOLD).to_numpy()
+    bp_anomaly = persisted_before(bp_falling, BP_PERSIST_SEC, positions)
+
+    # FUSION LOGIC
+    level2 = hr_anomaly & spo2_anomaly
+    level3 = level2 & bp_anomaly
+    anomaly_level = (
+        hr_anomaly.astype(np.int64) + level2 + level3
+    )
+
+    df["hr_anomaly"] = hr_anomaly.astype(np.int64)
+    df["spo2_anomaly"] = spo2_anomaly.astype(np.int64)
+    df["bp_anomaly"] = bp_anomaly.astype(np.int64)
+    df["anomaly_level"] = anomaly_level
+    df["reason"] = REASONS[anomaly_level]
+
+    return df
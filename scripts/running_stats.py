@@ -0,0 +1,197 @@
+"""One-pass, bounded-memory summaries of feature columns.
+
+``RunningMoments`` keeps per-feature count / mean / M2 (Welford, with Chan's
+merge for chunks) and ``FixedHistogram`` keeps per-feature counts over fixed
+bin edges plus under/overflow bins. ``QuantileSketch`` is a compactor-based
+(KLL-style) quantile sketch for one column. All of them consume chunks or
+single samples, never hold the raw data, and can be merged, so partitions
+can be summarized in parallel and combined.
+"""
+import numpy as np
+
+
+class RunningMoments:
+    """Per-feature running count, mean and variance; NaNs are skipped."""
+
+    def __init__(self, n_features: int):
+        self.count = np.zeros(n_features)
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)
+        self.min = np.full(n_features, np.inf)
+        self.max = np.full(n_features, -np.inf)
+
+    def _merge(self, count, mean, m2, lo, hi):
+        total = self.count + count
+        delta = mean - self.mean
+        with np.errstate(invalid="ignore", divide="ignore"):
+            weight = np.where(total > 0, count / total, 0.0)
+        self.mean = self.mean + delta * weight
+        self.m2 = self.m2 + m2 + delta ** 2 * self.count * weight
+        self.count = total
+        self.min = np.fmin(self.min, lo)
+        self.max = np.fmax(self.max, hi)
+
+    def update(self, values) -> "RunningMoments":
+        """Add a chunk: a 2-D array (rows x features) or a single 1-D sample."""
+        values = np.atleast_2d(np.asarray(values, dtype=float))
+        valid = ~np.isnan(values)
+        count = valid.sum(axis=0).astype(float)
+        if not count.any():
+            return self
+
+        with np.errstate(invalid="ignore"):
+            filled = np.where(valid, values, 0.0)
+            mean = np.where(count > 0, filled.sum(axis=0) / np.maximum(count, 1), 0.0)
+            m2 = np.where(valid, (values - mean) ** 2, 0.0).sum(axis=0)
+            lo = np.where(valid, values, np.inf).min(axis=0)
+            hi = np.where(valid, values, -np.inf).max(axis=0)
+
+        self._merge(count, mean, m2, lo, hi)
+        return self
+
+    def merge(self, other: "RunningMoments") -> "RunningMoments":
+        """Fold in moments computed on another partition."""
+        self._merge(other.count, other.mean, other.m2, other.min, other.max)
+        return self
+
+    @property
+    def var(self) -> np.ndarray:
+        """Sample variance (ddof=1), matching ``DataFrame.std()``."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.count > 1, self.m2 / (self.count - 1), np.nan)
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(self.var)
+
+
+class FixedHistogram:
+    """Per-feature counts over fixed bin edges.
+
+    ``edges`` is a list of 1-D increasing arrays, one per feature. Counts
+    have ``len(edges) + 1`` slots: index 0 is underflow, the last overflow.
+    """
+
+    def __init__(self, edges):
+        self.edges = [np.asarray(e, dtype=float) for e in edges]
+        self.counts = [np.zeros(len(e) + 1) for e in self.edges]
+
+    @classmethod
+    def from_ranges(cls, lows, highs, bins: int = 20) -> "FixedHistogram":
+        """Equal-width bins between per-feature ``lows`` and ``highs``."""
+        edges = []
+        for lo, hi in zip(lows, highs):
+            if not np.isfinite(lo) or not np.isfinite(hi) or hi <= lo:
+                lo, hi = (lo - 0.5, lo + 0.5) if np.isfinite(lo) else (-0.5, 0.5)
+            edges.append(np.linspace(lo, hi, bins + 1))
+        return cls(edges)
+
+    def update(self, values) -> "FixedHistogram":
+        values = np.atleast_2d(np.asarray(values, dtype=float))
+        for j, edges in enumerate(self.edges):
+            column = values[:, j]
+            column = column[~np.isnan(column)]
+            idx = np.searchsorted(edges, column, side="right")
+            self.counts[j] += np.bincount(idx, minlength=len(edges) + 1)
+        return self
+
+    def merge(self, other: "FixedHistogram") -> "FixedHistogram":
+        """Add counts from a histogram with identical edges."""
+        for j, counts in enumerate(other.counts):
+            self.counts[j] += counts
+        return self
+
+    def probabilities(self, j: int) -> np.ndarray:
+        total = self.counts[j].sum()
+        return self.counts[j] / total if total else self.counts[j]
+
+
+class QuantileSketch:
+    """Mergeable streaming quantile sketch for one column.
+
+    Level ``h`` holds items of weight ``2**h``; a level that outgrows
+    ``capacity`` is sorted and every other item (random offset) is promoted.
+    Memory is ``O(capacity * log(n / capacity))`` and rank error is roughly
+    ``log2(n / capacity) / capacity``.
+    """
+
+    def __init__(self, capacity: int = 512, seed: int = 0):
+        self.capacity = capacity
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self._rng = np.random.default_rng(seed)
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            level = self.levels[h]
+            if len(level) > self.capacity:
+                level = np.sort(level)
+                # Keep an odd leftover at this level so weights stay exact
+                keep = level[-1:] if len(level) % 2 else level[:0]
+                pairs = level[:len(level) - len(keep)]
+                promoted = pairs[self._rng.integers(2)::2]
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+                self.levels[h] = keep
+            h += 1
+
+    def update(self, values) -> "QuantileSketch":
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, level in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], level])
+        self.count += other.count
+        self._compress()
+        return self
+
+    def _weighted(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(l), 2.0 ** h) for h, l in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        return items[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs) -> np.ndarray:
+        """Approximate values at probabilities ``qs``."""
+        items, cum = self._weighted()
+        if len(items) == 0:
+            return np.full(len(np.atleast_1d(qs)), np.nan)
+        targets = np.asarray(qs, dtype=float) * cum[-1]
+        idx = np.clip(np.searchsorted(cum, targets, side="left"), 0, len(items) - 1)
+        return items[idx]
+
+    def rank(self, xs) -> np.ndarray:
+        """Approximate fraction of values strictly below each of ``xs``."""
+        items, cum = self._weighted()
+        if len(items) == 0:
+            return np.zeros(len(np.atleast_1d(xs)))
+        below = np.searchsorted(items, np.asarray(xs, dtype=float), side="left")
+        return np.where(below > 0, cum[np.maximum(below - 1, 0)], 0.0) / cum[-1]
+
+
+# =========================================================
+# DISTRIBUTION COMPARISONS (binned)
+# =========================================================
+PSI_EPSILON = 1e-4
+
+
+def psi(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Population stability index between two binned distributions."""
+    p = np.clip(np.asarray(expected, dtype=float), PSI_EPSILON, None)
+    q = np.clip(np.asarray(actual, dtype=float), PSI_EPSILON, None)
+    p, q = p / p.sum(), q / q.sum()
+    return float(np.sum((q - p) * np.log(q / p)))
+
+
+def ks_binned(expected: np.ndarray, actual: np.ndarray) -> float:
+    """KS statistic evaluated at the bin edges (a lower bound on the exact KS)."""
+    return float(np.max(np.abs(np.cumsum(expected) - np.cumsum(actual))))
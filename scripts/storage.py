@@ -0,0 +1,141 @@
+"""Shared table storage for the batch pipeline.
+
+Stages hand tables to each other through typed, compressed Parquet files
+instead of wide CSVs. Paths are given without an extension; readers can ask
+for just the columns they need and fall back to a legacy ``.csv`` when no
+Parquet file exists yet.
+
+A table may also be a directory of part files (``part-00000.parquet``, ...)
+written chunk by chunk; it reads back as one table or part by part.
+
+Set ``GRAY_TABLE_FORMAT=csv`` to write CSV instead (e.g. for hand auditing).
+
+Declared columns are cast to the compact dtypes of ``scripts/table_schema.py``
+on every read and write (float32 values, int8 flags, categorical labels);
+``GRAY_TABLE_SCHEMA=legacy`` keeps the dtypes a stage produced instead.
+"""
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from scripts.profiling import operation
+from scripts.table_schema import apply_schema
+
+TABLE_FORMAT = os.environ.get("GRAY_TABLE_FORMAT", "parquet").lower()
+TABLE_SCHEMA = os.environ.get("GRAY_TABLE_SCHEMA", "compact").lower()
+PARQUET_COMPRESSION = "zstd"
+
+_SUFFIXES = {"parquet": ".parquet", "csv": ".csv"}
+_SCHEMAS = ["compact", "legacy"]
+
+if TABLE_FORMAT not in _SUFFIXES:
+    raise ValueError(f"GRAY_TABLE_FORMAT must be one of {sorted(_SUFFIXES)}, got {TABLE_FORMAT!r}")
+if TABLE_SCHEMA not in _SCHEMAS:
+    raise ValueError(f"GRAY_TABLE_SCHEMA must be one of {_SCHEMAS}, got {TABLE_SCHEMA!r}")
+
+
+def _stem(path) -> Path:
+    path = Path(path)
+    return path.with_suffix("") if path.suffix in _SUFFIXES.values() else path
+
+
+def table_path(path, fmt=None) -> Path:
+    """File path a table is written to for the given (or configured) format."""
+    return _stem(path).with_suffix(_SUFFIXES[fmt or TABLE_FORMAT])
+
+
+def find_table(path) -> Path:
+    """Existing file for a table, preferring the configured format."""
+    stem = _stem(path)
+    preferred = _SUFFIXES[TABLE_FORMAT]
+    for suffix in [preferred] + [s for s in _SUFFIXES.values() if s != preferred]:
+        candidate = stem.with_suffix(suffix)
+        if candidate.exists():
+            return candidate
+    raise FileNotFoundError(f"No table found for {stem} (.parquet or .csv)")
+
+
+def table_parts(path) -> list:
+    """Part files of a partitioned table, or the single file of a plain one."""
+    stem = _stem(path)
+    if stem.is_dir():
+        parts = sorted(stem.glob("part-*.parquet")) or sorted(stem.glob("part-*.csv"))
+        if not parts:
+            raise FileNotFoundError(f"No part files in {stem}")
+        return parts
+    return [find_table(stem)]
+
+
+def _with_schema(df: pd.DataFrame, schema=None) -> pd.DataFrame:
+    return apply_schema(df) if (schema or TABLE_SCHEMA) == "compact" else df
+
+
+def _read_file(found: Path, columns=None) -> pd.DataFrame:
+    if found.suffix == ".parquet":
+        return pd.read_parquet(found, columns=columns)
+    return pd.read_csv(found, usecols=columns)
+
+
+def table_columns(path) -> list:
+    """Column names of a stored table without loading its data."""
+    found = table_parts(path)[0]
+    if found.suffix == ".parquet":
+        import pyarrow.parquet as pq
+        return pq.read_schema(found).names
+    return pd.read_csv(found, nrows=0).columns.tolist()
+
+
+def read_table(path, columns=None, schema=None) -> pd.DataFrame:
+    """Load a table, optionally only ``columns`` (read column-wise for Parquet)."""
+    parts = table_parts(path)
+    with operation("load") as op:
+        if len(parts) == 1:
+            df = _with_schema(_read_file(parts[0], columns), schema)
+        else:
+            # Cast per part (one float64 part in memory at a time), then again:
+            # categoricals whose categories differ between parts concat to object
+            df = pd.concat([_with_schema(_read_file(p, columns), schema) for p in parts], ignore_index=True)
+            df = _with_schema(df, schema)
+        op.rows = len(df)
+    return df
+
+
+def _iter_file(found: Path, columns=None, chunk_rows=None):
+    if chunk_rows is None:
+        yield _with_schema(_read_file(found, columns))
+    elif found.suffix == ".parquet":
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(found).iter_batches(batch_size=chunk_rows, columns=columns):
+            yield _with_schema(batch.to_pandas())
+    else:
+        for chunk in pd.read_csv(found, usecols=columns, chunksize=chunk_rows):
+            yield _with_schema(chunk)
+
+
+def iter_table(path, columns=None, chunk_rows=None):
+    """Yield a table one part at a time (bounded memory for partitioned tables).
+
+    With ``chunk_rows`` each part is further read in row batches, so even a
+    single large file never has to fit in memory.
+    """
+    for part in table_parts(path):
+        yield from _iter_file(part, columns, chunk_rows)
+
+
+def part_path(path, index: int) -> Path:
+    """Stem of the ``index``-th part file of a partitioned table."""
+    return _stem(path) / f"part-{index:05d}"
+
+
+def write_table(df: pd.DataFrame, path, fmt=None, schema=None) -> Path:
+    """Write a table in the configured format (and schema); returns the file written."""
+    out = table_path(path, fmt)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with operation("save", rows=len(df)):
+        df = _with_schema(df, schema)
+        if out.suffix == ".parquet":
+            df.to_parquet(out, index=False, compression=PARQUET_COMPRESSION)
+        else:
+            df.to_csv(out, index=False)
+    return out
@@ -0,0 +1,103 @@
+"""Declared column dtypes for pipeline tables.
+
+Every stage's tables share one column vocabulary (vitals, rolling features,
+model scores, flags, labels), so one schema covers them all:
+
+* vitals, features and scores: ``float32`` (~7 significant digits, far
+  finer than sensor resolution or any alert threshold),
+* 0/1 flags and small levels: ``int8``,
+* text labels (risk level, alert level / reason, rule reason, top PCA
+  feature): ``category``,
+* ids and seconds: ``int32``.
+
+``storage`` applies it whenever a table is read or written, so stages work
+on compact frames end to end. Columns the schema does not declare are left
+alone, and a flag column that contains gaps stays float.
+"""
+import pandas as pd
+
+FLOAT = "float32"
+FLAG = "int8"
+LABEL = "category"
+
+COLUMN_DTYPES = {
+    # Keys
+    "patient_id": "int32",
+    "time_sec": "int32",
+
+    # Vitals (pipeline and fleet-export names)
+    "heart_rate_bpm": FLOAT,
+    "spo2_percent": FLOAT,
+    "bp_systolic": FLOAT,
+    "bp_diastolic": FLOAT,
+    "motion": FLOAT,
+    "HR": FLOAT,
+    "SpO2": FLOAT,
+    "HR_clean": FLOAT,
+    "SpO2_clean": FLOAT,
+
+    # Rolling features
+    "hr_mean_30s": FLOAT,
+    "hr_std_30s": FLOAT,
+    "hr_slope_30s": FLOAT,
+    "spo2_mean_30s": FLOAT,
+    "spo2_delta_from_baseline": FLOAT,
+    "spo2_seconds_below_94": FLOAT,
+    "spo2_slope_60s": FLOAT,
+    "sys_bp_mean_60s": FLOAT,
+    "sys_bp_slope_60s": FLOAT,
+    "motion_mean_10s": FLOAT,
+    "high_motion_flag": FLAG,
+
+    # Rule engine
+    "hr_anomaly": FLAG,
+    "spo2_anomaly": FLAG,
+    "bp_anomaly": FLAG,
+    "anomaly_level": FLAG,
+    "reason": LABEL,
+
+    # Isolation Forest / PCA / hybrid
+    "if_score": FLOAT,
+    "if_anomaly": FLAG,
+    "pca_reconstruction_error": FLOAT,
+    "pca_anomaly": FLAG,
+    "pca_top_feature": LABEL,
+    "if_score_norm": FLOAT,
+    "pca_error": FLOAT,
+    "pca_score_norm": FLOAT,
+    "hybrid_risk_score": FLOAT,
+    "hybrid_anomaly": FLAG,
+
+    # Hybrid validation
+    "final_alert": FLAG,
+    "alert_level": LABEL,
+    "alert_reason": LABEL,
+
+    # Risk scoring
+    "trend_severity": FLOAT,
+    "anomaly_norm": FLOAT,
+    "trend_norm": FLOAT,
+    "confidence": FLOAT,
+    "risk_score": FLOAT,
+    "risk_level": LABEL,
+    "final_alert_flag": FLAG,
+}
+
+
+def column_casts(df: pd.DataFrame) -> dict:
+    """``{column: dtype}`` for the declared columns of ``df`` not yet in schema dtype."""
+    casts = {}
+    for col in df.columns:
+        dtype = COLUMN_DTYPES.get(col)
+        if dtype is None or df[col].dtype == dtype:
+            continue
+        if pd.api.types.is_integer_dtype(dtype) and df[col].isna().any():
+            continue
+        casts[col] = dtype
+    return casts
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """``df`` with declared columns cast to their schema dtype."""
+    casts = column_casts(df)
+    return df.astype(casts) if casts else df
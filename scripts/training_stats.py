@@ -0,0 +1,119 @@
+"""Single-pass, out-of-core training statistics.
+
+Each table part (or row chunk of a single file) is folded into mergeable
+running moments and per-feature quantile sketches, so the training set never
+has to fit in memory and partitions can be summarized in parallel and
+merged. The result is the ``training_stats.json`` layout: ``mean`` / ``std``
+(as before) plus ``count``, ``min``, ``max``, ``quantiles`` and
+``histograms`` (``{edges, counts}``, read by ``DriftMonitor``).
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from scripts.running_stats import QuantileSketch, RunningMoments
+from scripts.storage import iter_table, table_parts
+
+CHUNK_ROWS = 250_000
+SKETCH_CAPACITY = 1024
+HISTOGRAM_BINS = 20
+QUANTILES = [0.01, 0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99]
+
+
+class FeatureSummary:
+    """Running moments plus one quantile sketch per feature."""
+
+    def __init__(self, features, seed: int = 0):
+        self.features = list(features)
+        self.moments = RunningMoments(len(self.features))
+        self.sketches = [
+            QuantileSketch(SKETCH_CAPACITY, seed=seed + j) for j in range(len(self.features))
+        ]
+
+    def update(self, df: pd.DataFrame) -> "FeatureSummary":
+        values = df.reindex(columns=self.features).to_numpy(dtype=float)
+        self.moments.update(values)
+        for j, sketch in enumerate(self.sketches):
+            sketch.update(values[:, j])
+        return self
+
+    def merge(self, other: "FeatureSummary") -> "FeatureSummary":
+        self.moments.merge(other.moments)
+        for sketch, other_sketch in zip(self.sketches, other.sketches):
+            sketch.merge(other_sketch)
+        return self
+
+    def histogram(self, j: int, bins: int = HISTOGRAM_BINS) -> dict:
+        """Equal-frequency bin edges and (sketch-estimated) counts.
+
+        Counts use the ``FixedHistogram`` layout: underflow, one slot per
+        ``[edges[i-1], edges[i])`` bin, then overflow (values >= last edge).
+        """
+        lo, hi, n = self.moments.min[j], self.moments.max[j], self.moments.count[j]
+        inner = self.sketches[j].quantiles(np.linspace(0, 1, bins + 1)[1:-1])
+        edges = np.unique(np.concatenate([[lo], inner, [hi]]))
+        if len(edges) < 2:
+            edges = np.array([lo - 0.5, lo + 0.5])
+
+        cdf = np.concatenate([[0.0], self.sketches[j].rank(edges), [1.0]])
+        counts = np.round(np.diff(cdf) * n)
+        return {"edges": edges.tolist(), "counts": counts.astype(int).tolist()}
+
+    def to_stats(self) -> dict:
+        present = [j for j in range(len(self.features)) if self.moments.count[j] > 0]
+        mean, std = self.moments.mean, self.moments.std
+
+        stats = {"mean": {}, "std": {}, "count": {}, "min": {}, "max": {},
+                 "quantiles": {}, "histograms": {}}
+        for j in present:
+            col = self.features[j]
+            stats["mean"][col] = float(mean[j])
+            stats["std"][col] = float(std[j])
+            stats["count"][col] = int(self.moments.count[j])
+            stats["min"][col] = float(self.moments.min[j])
+            stats["max"][col] = float(self.moments.max[j])
+            # Sketch tails are coarse; the exact extremes come from the moments
+            values = np.clip(self.sketches[j].quantiles(QUANTILES),
+                             self.moments.min[j], self.moments.max[j])
+            stats["quantiles"][col] = {str(q): float(v) for q, v in zip(QUANTILES, values)}
+            stats["histograms"][col] = self.histogram(j)
+        return stats
+
+
+def numeric_features(path) -> list:
+    """Numeric columns of a table, read from its first row chunk."""
+    first = next(iter_table(path, chunk_rows=1))
+    return first.select_dtypes("number").columns.tolist()
+
+
+def summarize_part(part, features, seed: int = 0, chunk_rows: int = CHUNK_ROWS) -> FeatureSummary:
+    """Stream one part file through a fresh summary."""
+    summary = FeatureSummary(features, seed)
+    for chunk in iter_table(part, columns=features, chunk_rows=chunk_rows):
+        summary.update(chunk)
+    return summary
+
+
+def summarize_table(path, features=None, workers=None, chunk_rows: int = CHUNK_ROWS) -> FeatureSummary:
+    """One pass over every part of ``path``, parts summarized in parallel.
+
+    Parts are merged in order and sketch seeds depend only on the part
+    index, so the result does not depend on ``workers``.
+    """
+    features = features or numeric_features(path)
+    parts = table_parts(path)
+    seeds = [i * len(features) for i in range(len(parts))]
+
+    if workers == 1 or len(parts) == 1:
+        partials = [summarize_part(p, features, s, chunk_rows) for p, s in zip(parts, seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            partials = list(pool.map(
+                summarize_part, parts, [features] * len(parts), seeds, [chunk_rows] * len(parts)
+            ))
+
+    total = partials[0]
+    for partial in partials[1:]:
+        total.merge(partial)
+    return total
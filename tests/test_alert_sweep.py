@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+from scripts.alert_sweep import sweep_alert_policies
+
+
+def _fleet(seed=0):
+    """Three patients; patient 2 never deteriorates (no ground-truth rows)."""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for pid, n in [(0, 120), (1, 90), (2, 100)]:
+        risk = rng.uniform(0, 100, n)
+        risk[rng.choice(n, 5, replace=False)] = np.nan
+        gt = (rng.random(n) < 0.3).astype(int) if pid != 2 else np.zeros(n, dtype=int)
+        frames.append(pd.DataFrame({
+            "patient_id": pid,
+            "time_sec": np.arange(n) * 2 + 7,
+            "risk_score": risk,
+            "ground_truth": gt,
+        }))
+    # Shuffled: the sweep must sort by (patient, time) itself
+    return pd.concat(frames, ignore_index=True).sample(frac=1, random_state=seed)
+
+
+def _policy_alerts(df, threshold, persistence):
+    """Row-by-row policy: risk >= threshold on the last ``persistence`` rows of the patient."""
+    above = (df["risk_score"] >= threshold).astype(float)
+    held = above.groupby(df["patient_id"]).transform(
+        lambda s: s.rolling(persistence, min_periods=persistence).min()
+    )
+    return (held == 1).astype(int)
+
+
+def _script_metrics(df, alert):
+    """Metric definitions of coding_scripts/evaluate_alert_quality.py, latency per patient."""
+    gt = df["ground_truth"]
+    tp = int(((alert == 1) & (gt == 1)).sum())
+    fp = int(((alert == 1) & (gt == 0)).sum())
+    fn = int(((alert == 0) & (gt == 1)).sum())
+
+    latencies = []
+    for _, patient in df.assign(alert=alert).groupby("patient_id"):
+        gt_times = patient.loc[patient["ground_truth"] == 1, "time_sec"]
+        alert_times = patient.loc[patient["alert"] == 1, "time_sec"]
+        if not gt_times.empty and not alert_times.empty:
+            latencies.append(alert_times.min() - gt_times.min())
+    return {
+        "tp": tp,
+        "fp": fp,
+        "fn": fn,
+        "precision": tp / (tp + fp + 1e-6),
+        "recall": tp / (tp + fn + 1e-6),
+        "false_alert_rate": fp / len(df),
+        "alert_latency_sec": np.mean(latencies) if latencies else np.nan,
+    }
+
+
+def test_sweep_matches_single_policy_with_patient_without_ground_truth():
+    df = _fleet()
+    ordered = df.sort_values(["patient_id", "time_sec"])
+    thresholds = [0, 20, 50, 80, 99]
+    persistences = [1, 2, 3, 5]
+    sweep = sweep_alert_policies(df, thresholds=thresholds, persistences=persistences,
+                                 group_col="patient_id", workers=2)
+
+    assert np.isfinite(sweep["alert_latency_sec"].dropna()).all()
+    for p in persistences:
+        for t in thresholds:
+            expected = _script_metrics(ordered, _policy_alerts(ordered, t, p))
+            row = sweep[(sweep["persistence_rows"] == p) & (sweep["threshold"] == t)].iloc[0]
+            for key, value in expected.items():
+                np.testing.assert_allclose(row[key], value, err_msg=f"{key} at t={t}, p={p}")
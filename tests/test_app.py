@@ -0,0 +1,32 @@
+from fastapi.testclient import TestClient
+
+from api.app import app
+
+client = TestClient(app)
+
+HYBRID_FEATURES = {
+    "hr_mean_30s": 92.0,
+    "hr_slope_30s": 0.2,
+    "hr_std_30s": 1.5,
+    "spo2_mean_30s": 95.0,
+    "spo2_delta_from_baseline": -2.0,
+    "spo2_seconds_below_94": 10.0,
+    "sys_bp_mean_60s": 118.0,
+    "sys_bp_slope_60s": -0.03,
+    "motion_mean_10s": 0.1,
+    "spo2_slope_60s": -0.05,
+}
+
+
+def test_predict_hybrid_requires_every_trend_slope():
+    # The calibrated trend averages all three slopes, as at training time
+    features = {k: v for k, v in HYBRID_FEATURES.items() if k != "spo2_slope_60s"}
+    response = client.post("/predict/hybrid", json=features)
+    assert response.status_code == 422
+    assert any(err["loc"][-1] == "spo2_slope_60s" for err in response.json()["detail"])
+
+
+def test_predict_hybrid_accepts_full_features():
+    response = client.post("/predict/hybrid", json=HYBRID_FEATURES)
+    # 503 when no hybrid model version is trained in this tree
+    assert response.status_code in (200, 503)
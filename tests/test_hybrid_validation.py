@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from scripts.hybrid_validation import (
+    CRITICAL_RISK_THRESHOLD,
+    HIGH_RISK_THRESHOLD,
+    PERSIST_SECONDS,
+    validate_alerts,
+)
+
+
+def _baseline_validation(hybrid_df, rule_level):
+    """Row loop of coding_scripts/hybrid_validation_with_rules.py before vectorization."""
+    df = hybrid_df.copy()
+    df["final_alert"] = 0
+    df["alert_level"] = "normal"
+    df["alert_reason"] = ""
+    risk_buffer = []
+    for i in range(len(df)):
+        risk_buffer.append(df.loc[i, "hybrid_risk_score"])
+        if len(risk_buffer) > PERSIST_SECONDS:
+            risk_buffer.pop(0)
+        avg_risk = np.mean(risk_buffer)
+
+        if avg_risk >= CRITICAL_RISK_THRESHOLD and rule_level[i] >= 2:
+            df.loc[i, ["final_alert", "alert_level", "alert_reason"]] = [
+                1, "CRITICAL", "Hybrid high risk + rule-confirmed deterioration"]
+        elif avg_risk >= HIGH_RISK_THRESHOLD and rule_level[i] >= 1:
+            df.loc[i, ["final_alert", "alert_level", "alert_reason"]] = [
+                1, "HIGH", "Hybrid elevated risk + early physiological confirmation"]
+        elif avg_risk >= HIGH_RISK_THRESHOLD and rule_level[i] == 0:
+            df.loc[i, ["final_alert", "alert_level", "alert_reason"]] = [
+                0, "SUPPRESSED", "Hybrid risk without physiological confirmation"]
+        else:
+            df.loc[i, ["final_alert", "alert_level", "alert_reason"]] = [
+                0, "normal", "No sustained risk detected"]
+    return df
+
+
+def test_validate_alerts_matches_row_loop():
+    rng = np.random.default_rng(0)
+    n = 800
+    # Slowly drifting risk so the 10-row mean crosses both thresholds
+    risk = np.clip(np.repeat(rng.uniform(0.3, 1.0, n // 40), 40) + rng.normal(0, 0.1, n), 0, 1)
+    # Missing scores: the baseline's mean is NaN while they are in the buffer
+    missing = rng.choice(n, 8, replace=False)
+    risk[missing] = np.nan
+    hybrid_df = pd.DataFrame({"hybrid_risk_score": risk})
+    rule_level = rng.integers(0, 4, n)
+
+    expected = _baseline_validation(hybrid_df, rule_level)
+    got = validate_alerts(hybrid_df, rule_level, group_col=None)
+
+    assert set(expected["alert_level"]) == {"normal", "SUPPRESSED", "HIGH", "CRITICAL"}
+    assert (got.loc[missing, "final_alert"] == 0).all()
+    np.testing.assert_array_equal(got["final_alert"].to_numpy(), expected["final_alert"].astype(int).to_numpy())
+    for col in ["alert_level", "alert_reason"]:
+        np.testing.assert_array_equal(got[col].astype(str).to_numpy(),
+                                      expected[col].astype(str).to_numpy(), err_msg=col)
@@ -0,0 +1,28 @@
+import numpy as np
+from sklearn.ensemble import IsolationForest
+
+from scripts.iforest_scorer import CHUNK_ROWS, FlatIsolationForest
+
+
+def _data(seed=0):
+    rng = np.random.default_rng(seed)
+    train = rng.normal(0, 1, (1000, 6))
+    # More rows than one traversal chunk, plus outliers
+    test = np.vstack([rng.normal(0, 1, (CHUNK_ROWS + 100, 6)), rng.normal(0, 6, (50, 6))])
+    return train, test
+
+
+def test_scores_are_bit_identical_to_sklearn():
+    train, test = _data()
+    for params in [{}, {"bootstrap": True, "max_features": 0.7}, {"max_samples": 64}]:
+        iso = IsolationForest(n_estimators=50, random_state=0, **params).fit(train)
+        flat = FlatIsolationForest(iso)
+        np.testing.assert_array_equal(flat.score_samples(test), iso.score_samples(test), err_msg=str(params))
+        np.testing.assert_array_equal(flat.if_score(test[0]), -iso.score_samples(test[:1]))
+
+
+def test_scores_with_missing_values_match_sklearn():
+    train, test = _data(seed=1)
+    test[::7, 2] = np.nan
+    iso = IsolationForest(n_estimators=50, random_state=0).fit(train)
+    np.testing.assert_array_equal(FlatIsolationForest(iso).score_samples(test), iso.score_samples(test))
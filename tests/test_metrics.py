@@ -0,0 +1,53 @@
+import json
+import os
+
+from api.metrics import RISK_LEVELS, merged_totals, retire_snapshots, snapshot_name, write_snapshot
+
+LABELS = ("/test", "RED")
+
+
+def _write_worker(directory, name, count):
+    with open(directory / name, "w") as f:
+        json.dump({RISK_LEVELS.name: [[list(LABELS), count]]}, f)
+
+
+def _count(directory):
+    return merged_totals(directory)[RISK_LEVELS.name].get(LABELS, 0)
+
+
+def test_snapshot_name_carries_pid_and_token():
+    assert snapshot_name().startswith(f"worker-{os.getpid()}-")
+    assert snapshot_name() == snapshot_name()
+
+
+def test_retired_worker_counts_survive_pid_reuse(tmp_path):
+    _write_worker(tmp_path, "worker-123-aaaa.json", 5)
+    _write_worker(tmp_path, "worker-456-cccc.json", 1)
+    assert _count(tmp_path) == 6
+
+    retire_snapshots(123, tmp_path)
+    assert not (tmp_path / "worker-123-aaaa.json").exists()
+    assert _count(tmp_path) == 6
+
+    # A replacement worker reusing pid 123 starts from zero
+    _write_worker(tmp_path, "worker-123-bbbb.json", 2)
+    assert _count(tmp_path) == 8
+
+    retire_snapshots(123, tmp_path)
+    retire_snapshots(456, tmp_path)
+    assert _count(tmp_path) == 8
+    assert sorted(os.listdir(tmp_path)) == ["retired.json"]
+
+
+def test_absorbed_snapshot_is_not_counted_twice(tmp_path):
+    _write_worker(tmp_path, "worker-123-aaaa.json", 5)
+    retire_snapshots(123, tmp_path)
+    # A scrape between writing retired.json and removing the snapshot
+    _write_worker(tmp_path, "worker-123-aaaa.json", 5)
+    assert _count(tmp_path) == 5
+
+
+def test_live_snapshot_is_merged(tmp_path):
+    RISK_LEVELS.inc(("/live", "GREEN"), 3)
+    write_snapshot(tmp_path)
+    assert merged_totals(tmp_path)[RISK_LEVELS.name][("/live", "GREEN")] == 3
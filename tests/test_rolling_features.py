@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from scripts.rolling_features import SLOPE_BLOCK_SIZE, RollingSlope, rolling_slope_array
+
+
+def _polyfit_slope(values, window):
+    """Baseline of coding_scripts/feature_engineering.py: polyfit per window."""
+    return pd.Series(values).rolling(window).apply(
+        lambda x: np.polyfit(range(len(x)), x, 1)[0], raw=True
+    ).to_numpy()
+
+
+def _vitals(n, seed=0):
+    """Random-walk vitals around 80 with a few sensor gaps."""
+    rng = np.random.default_rng(seed)
+    values = 80 + np.cumsum(rng.normal(0, 0.5, n))
+    values[rng.choice(n, 20, replace=False)] = np.nan
+    return values
+
+
+def test_rolling_slope_array_matches_polyfit():
+    # Longer than one block, so block edges are covered
+    values = _vitals(SLOPE_BLOCK_SIZE + 500)
+    for window in (30, 60):
+        expected = _polyfit_slope(values, window)
+        got = rolling_slope_array(values, window)
+        np.testing.assert_array_equal(np.isnan(got), np.isnan(expected))
+        np.testing.assert_allclose(got, expected, rtol=0, atol=1e-9)
+
+
+def test_streaming_slope_matches_polyfit():
+    values = _vitals(RollingSlope.RESYNC_EVERY + 500, seed=1)
+    for window in (30, 60):
+        expected = _polyfit_slope(values, window)
+        slope = RollingSlope(window)
+        got = np.concatenate([slope.update_many(chunk) for chunk in np.array_split(values, 7)])
+        np.testing.assert_array_equal(np.isnan(got), np.isnan(expected))
+        np.testing.assert_allclose(got, expected, rtol=0, atol=1e-9)
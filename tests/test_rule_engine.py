@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+
+from scripts.rule_engine import (
+    BP_PERSIST_SEC,
+    BP_SLOPE_THRESHOLD,
+    HR_PERSIST_SEC,
+    HR_SLOPE_THRESHOLD,
+    SPO2_DELTA_THRESHOLD,
+    SPO2_PERSIST_SEC_1,
+    SPO2_PERSIST_SEC_2,
+    apply_rules,
+)
+
+
+def _features(n=600, seed=0):
+    """Feature rows with long HR-rise / BP-fall runs so every level occurs."""
+    rng = np.random.default_rng(seed)
+    runs = rng.integers(20, 120, n)
+    hr_rising = np.repeat(rng.random(len(runs)) < 0.6, runs)[:n]
+    bp_falling = np.repeat(rng.random(len(runs)) < 0.6, runs)[:n]
+    return pd.DataFrame({
+        "hr_slope_30s": np.where(hr_rising, 0.3, 0.0) + rng.normal(0, 0.05, n),
+        "high_motion_flag": (rng.random(n) < 0.05).astype(int),
+        "spo2_delta_from_baseline": rng.uniform(-6, 1, n),
+        "spo2_seconds_below_94": rng.integers(0, 90, n),
+        "sys_bp_slope_60s": np.where(bp_falling, -0.1, 0.0) + rng.normal(0, 0.02, n),
+    })
+
+
+def _baseline_rules(df):
+    """Row loop of coding_scripts/rule_based_anomaly_detection.py before vectorization."""
+    df = df.copy()
+    df["hr_anomaly"] = 0
+    df["spo2_anomaly"] = 0
+    df["bp_anomaly"] = 0
+    df["anomaly_level"] = 0
+    df["reason"] = "normal"
+    for i in range(len(df)):
+        hr_window = df.iloc[max(0, i - HR_PERSIST_SEC):i]
+        if len(hr_window) >= HR_PERSIST_SEC:
+            if (
+                (hr_window["hr_slope_30s"] > HR_SLOPE_THRESHOLD).all()
+                and df.loc[i, "high_motion_flag"] == 0
+            ):
+                df.loc[i, "hr_anomaly"] = 1
+
+        if (
+            (df.loc[i, "spo2_delta_from_baseline"] < SPO2_DELTA_THRESHOLD
+             and df.loc[i, "spo2_seconds_below_94"] >= SPO2_PERSIST_SEC_1)
+            or
+            (df.loc[i, "spo2_seconds_below_94"] >= SPO2_PERSIST_SEC_2)
+        ):
+            df.loc[i, "spo2_anomaly"] = 1
+
+        bp_window = df.iloc[max(0, i - BP_PERSIST_SEC):i]
+        if len(bp_window) >= BP_PERSIST_SEC:
+            if (bp_window["sys_bp_slope_60s"] < BP_SLOPE_THRESHOLD).all():
+                df.loc[i, "bp_anomaly"] = 1
+
+        if df.loc[i, "hr_anomaly"] == 1:
+            df.loc[i, "anomaly_level"] = 1
+            df.loc[i, "reason"] = "HR rising trend"
+        if df.loc[i, "hr_anomaly"] == 1 and df.loc[i, "spo2_anomaly"] == 1:
+            df.loc[i, "anomaly_level"] = 2
+            df.loc[i, "reason"] = "HR rise + sustained SpO2 drop"
+        if (
+            df.loc[i, "hr_anomaly"] == 1
+            and df.loc[i, "spo2_anomaly"] == 1
+            and df.loc[i, "bp_anomaly"] == 1
+        ):
+            df.loc[i, "anomaly_level"] = 3
+            df.loc[i, "reason"] = "HR + SpO2 + BP deterioration"
+    return df
+
+
+def test_apply_rules_matches_row_loop():
+    df = _features()
+    expected = _baseline_rules(df)
+    got = apply_rules(df, group_col=None)
+
+    assert set(expected["anomaly_level"]) == {0, 1, 2, 3}
+    for col in ["hr_anomaly", "spo2_anomaly", "bp_anomaly", "anomaly_level"]:
+        np.testing.assert_array_equal(got[col].to_numpy(), expected[col].to_numpy(), err_msg=col)
+    np.testing.assert_array_equal(got["reason"].astype(str).to_numpy(),
+                                  expected["reason"].astype(str).to_numpy())
+
+
+def test_apply_rules_windows_stay_within_patient():
+    first, second = _features(seed=1), _features(seed=2)
+    fleet = pd.concat([first.assign(patient_id=0), second.assign(patient_id=1)], ignore_index=True)
+    got = apply_rules(fleet)
+
+    for pid, frame in [(0, first), (1, second)]:
+        expected = _baseline_rules(frame)
+        np.testing.assert_array_equal(
+            got.loc[got["patient_id"] == pid, "anomaly_level"].to_numpy(),
+            expected["anomaly_level"].to_numpy(),
+        )
@@ -1,24 +1,45 @@
-import pandas as pd
+import argparse
 import json
 from pathlib import Path
 
-# Get project root (one level above coding_scripts)
-BASE_DIR = Path(__file__).resolve().parent.parent
+from scripts.model_artifacts import FEATURE_COLS, fit_hybrid_models, save_artifacts
+from scripts.risk_calibration import TREND_FEATURES
+from scripts.storage import read_table
+from scripts.training_stats import summarize_table
 
-DATA_PATH = BASE_DIR / "data" / "features.csv"
+# Project root (this script lives at the top level)
+BASE_DIR = Path(__file__).resolve().parent
+
+DATA_PATH = BASE_DIR / "data" / "features"
 MODEL_DIR = BASE_DIR / "models"
 MODEL_DIR.mkdir(exist_ok=True)
 
-df = pd.read_csv(DATA_PATH)
-
-stats = {
-    "mean": df.mean().to_dict(),
-    "std": df.std().to_dict()
-}
-
-with open(MODEL_DIR / "training_stats.json", "w") as f:
-    json.dump(stats, f)
-
-print("✅ Training statistics saved")
-
-
+# Guarded: partitions are summarized in worker processes
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train drift stats and hybrid IF + PCA models")
+    parser.add_argument("--version", default=None, help="artifact version name (default: timestamp)")
+    parser.add_argument("--workers", type=int, default=None, help="processes for partitioned input (default: all CPUs)")
+    args = parser.parse_args()
+
+    # -------------------------
+    # TRAINING STATISTICS (one streaming pass, mergeable per partition)
+    # -------------------------
+    stats = summarize_table(DATA_PATH, workers=args.workers).to_stats()
+
+    with open(MODEL_DIR / "training_stats.json", "w") as f:
+        json.dump(stats, f)
+
+    print("✅ Training statistics saved")
+
+    # -------------------------
+    # HYBRID IF + PCA ARTIFACTS
+    # -------------------------
+    # sklearn fits in memory: load only the columns the models (and the
+    # frozen risk-score calibration) use
+    columns = FEATURE_COLS + ["time_sec", "high_motion_flag"]
+    columns += [c for c in TREND_FEATURES if c not in columns]
+    df = read_table(DATA_PATH, columns=columns)
+    models = fit_hybrid_models(df)
+    out_dir = save_artifacts(models, version=args.version)
+
+    print(f"✅ Hybrid models saved to {out_dir}")
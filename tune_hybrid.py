@@ -0,0 +1,60 @@
+import argparse
+from pathlib import Path
+
+from scripts.hybrid_tuning import (
+    evaluate_candidates,
+    grid_candidates,
+    load_tuning_frame,
+    pareto_front,
+    random_candidates,
+)
+from scripts.model_artifacts import load_artifacts
+
+# Project root (this script lives at the top level)
+BASE_DIR = Path(__file__).resolve().parent
+
+FEATURES_PATH = BASE_DIR / "data" / "processed" / "features"
+OUTPUT_DIR = BASE_DIR / "analysis" / "tuning"
+
+# Guarded: candidates are evaluated in worker processes
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Search hybrid weights, thresholds and persistence on cached IF / PCA scores"
+    )
+    parser.add_argument("--features", default=str(FEATURES_PATH), help="feature table to score")
+    parser.add_argument("--model-version", default=None, help="hybrid model version (default: LATEST)")
+    parser.add_argument("--random", type=int, default=None, metavar="N",
+                        help="evaluate N random settings per alert instead of the full grid")
+    parser.add_argument("--seed", type=int, default=42, help="random search seed")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all CPUs)")
+    args = parser.parse_args()
+
+    # -------------------------
+    # SCORES (computed once per model version + features file, then cached)
+    # -------------------------
+    models = load_artifacts(args.model_version)
+    frame = load_tuning_frame(models, args.features)
+    print(f"Loaded {len(frame)} scored rows (models {models.version})")
+
+    # -------------------------
+    # SEARCH
+    # -------------------------
+    if args.random:
+        hybrid, final = random_candidates(args.random, seed=args.seed)
+    else:
+        hybrid, final = grid_candidates()
+    results = evaluate_candidates(frame, hybrid, final, workers=args.workers)
+
+    # -------------------------
+    # PARETO FRONT (recall vs false-alert rate)
+    # -------------------------
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    for kind, df in results.items():
+        front = pareto_front(df)
+        df.to_csv(OUTPUT_DIR / f"{kind}_search.csv", index=False)
+        front.to_csv(OUTPUT_DIR / f"{kind}_pareto.csv", index=False)
+
+        print(f"\n=== {kind}: {len(df)} settings, {len(front)} on the Pareto front ===")
+        print(front.drop(columns=["alerts", "tp", "fp", "fn"], errors="ignore").to_string(index=False))
+
+    print(f"\n📁 Search results saved to {OUTPUT_DIR}")